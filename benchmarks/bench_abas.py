@@ -0,0 +1,81 @@
+"""
+Custo de um rerun completo do app conforme a aba aberta.
+
+Abre o pim_avaliador.py no AppTest com uma avaliação preenchida (sugestões e
+notas em todas as dimensões) e, para cada aba, seleciona a aba (a chave
+"aba" do st.tabs, informada a cada rerun, já que o AppTest não a devolve ao
+app como o navegador) e mede --repeticoes reruns completos. Informa a mediana do
+rerun e quantos widgets e elementos foram montados.
+
+Uso:
+    python benchmarks/bench_abas.py
+    python benchmarks/bench_abas.py --repeticoes 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'abas.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'abas.jsonl'))
+os.environ.setdefault('SATA_CACHE_PDF', '')
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import Widget
+
+from sata import ler_progresso, serializar_progresso
+from sintetico import gerar_avaliacoes
+
+APP = str(RAIZ / 'pim_avaliador.py')
+ABAS = [
+    "🏠 Início", "📄 Apresentação", "📖 Introdução", "📚 Desenvolvimento", "💬 Discussão",
+    "✅ Conclusão", "📚 Referências", "🎤 Parte Oral", "📋 Relatório", "📈 Turma"
+]
+
+
+def _contar(no):
+    """(widgets, elementos) na árvore de elementos do AppTest"""
+    filhos = getattr(no, 'children', None)
+    if not filhos:
+        return int(isinstance(no, Widget)), 1
+    widgets = elementos = 0
+    for filho in filhos.values():
+        w, e = _contar(filho)
+        widgets, elementos = widgets + w, elementos + e
+    return widgets, elementos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    # Uma avaliação completa, restaurada como pelo botão "Restaurar Dados"
+    estado = next(iter(gerar_avaliacoes(1)))
+    at.session_state['restauracao_pendente'] = (ler_progresso(serializar_progresso(estado)), None, False)
+    at.run()
+
+    print(f"{'aba':<20} {'rerun p50 (ms)':>15} {'widgets':>8} {'elementos':>10}")
+    for aba in ABAS:
+        at.session_state['aba'] = aba
+        at.run()
+        tempos = []
+        for _ in range(args.repeticoes):
+            at.session_state['aba'] = aba  # o AppTest não devolve a aba aberta, como o navegador
+            inicio = time.perf_counter()
+            at.run()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        widgets, elementos = _contar(at._tree)
+        print(f"{aba:<20} {statistics.median(tempos):>15.1f} {widgets:>8} {elementos:>10}")
+
+
+if __name__ == "__main__":
+    main()
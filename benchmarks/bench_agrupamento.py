@@ -0,0 +1,136 @@
+"""
+Agrupamento de comentários quase iguais (sata.agrupamento): tempo e qualidade em um semestre sintético.
+
+Gera --comentarios comentários de uma dimensão a partir de --modelos frases
+(palavras sorteadas do vocabulário do banco de sugestões), cada um uma variação da sua
+frase: palavra a menos, duas palavras trocadas de lugar, erro de digitação,
+maiúsculas, acentos e pontuação. Mede as etapas de agrupar (assinaturas
+MinHash, LSH e componentes) e a qualidade contra a frase de origem:
+    - pureza: fração dos comentários no agrupamento da sua frase majoritária;
+    - completude: fração dos comentários de cada frase no maior agrupamento dela.
+Para comparar, a comparação de todos os pares (Jaccard exato dos 5-gramas)
+numa amostra de --amostra comentários distintos, extrapolada para o total.
+
+Uso:
+    python benchmarks/bench_agrupamento.py
+    python benchmarks/bench_agrupamento.py --comentarios 300000 --modelos 5000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import SUGESTOES_BANCO, agrupamento
+from sata.agrupamento import TAMANHO_GRAMA, _chave, agrupar
+
+_VOCABULARIO = sorted({palavra for sugestoes in SUGESTOES_BANCO.values()
+                       for grupo in (sugestoes.values() if isinstance(sugestoes, dict) else [sugestoes])
+                       for texto in grupo for palavra in re.findall(r'\w{3,}', texto.lower())})
+_ACENTOS = str.maketrans("aeiouc", "áéíóúç")
+
+
+def _variacao(rng, palavras):
+    palavras = list(palavras)
+    for _ in range(rng.randint(0, 2)):
+        mudanca = rng.random()
+        if mudanca < 0.25 and len(palavras) > 4:
+            del palavras[rng.randrange(len(palavras))]
+        elif mudanca < 0.5:
+            i = rng.randrange(len(palavras) - 1)
+            palavras[i], palavras[i + 1] = palavras[i + 1], palavras[i]
+        elif mudanca < 0.75:
+            i = rng.randrange(len(palavras))
+            palavra = palavras[i]
+            j = rng.randrange(len(palavra))
+            palavras[i] = palavra[:j] + rng.choice('aeiorstn') + palavra[j + 1:]
+        else:
+            i = rng.randrange(len(palavras))
+            palavras[i] = palavras[i].translate(_ACENTOS)
+    texto = ' '.join(palavras)
+    texto = texto.capitalize() if rng.random() < 0.7 else texto
+    return texto + rng.choice(['.', '', '!', ' .'])
+
+
+def gerar_comentarios(quantidade, modelos, seed=3):
+    """[(comentário, índice da frase de origem)], com as frases em frequência de Zipf"""
+    rng = random.Random(seed)
+    frases = [rng.sample(_VOCABULARIO, rng.randint(6, 14)) for _ in range(modelos)]
+    pesos = [1 / (i + 1) for i in range(modelos)]
+    origens = rng.choices(range(modelos), weights=pesos, k=quantidade)
+    return [(_variacao(rng, frases[origem]), origem) for origem in origens]
+
+
+def _jaccard_todos_os_pares(chaves, limiar):
+    """Pares com Jaccard exato >= limiar, comparando todos com todos"""
+    conjuntos = [{f" {c} "[i:i + TAMANHO_GRAMA] for i in range(len(c) + 3 - TAMANHO_GRAMA)} for c in chaves]
+    pares = 0
+    for i, a in enumerate(conjuntos):
+        for b in conjuntos[i + 1:]:
+            if len(a & b) >= limiar * len(a | b):
+                pares += 1
+    return pares
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--comentarios', type=int, default=100000)
+    parser.add_argument('--modelos', type=int, default=2000)
+    parser.add_argument('--amostra', type=int, default=1500)
+    args = parser.parse_args(argv)
+
+    comentarios = gerar_comentarios(args.comentarios, args.modelos)
+    contagem = Counter(texto for texto, _ in comentarios)
+    origem_do_texto = {texto: origem for texto, origem in comentarios}
+    chaves = list(dict.fromkeys(_chave(texto) for texto in contagem))
+    print(f"{args.comentarios} comentários, {len(contagem)} textos distintos, {len(chaves)} após normalização, "
+          f"{args.modelos} frases de origem")
+
+    inicio = time.perf_counter()
+    assinatura = agrupamento.assinaturas(chaves)
+    t_assinaturas = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    ligacoes = agrupamento._ligacoes(assinatura, agrupamento.BANDAS, agrupamento.LIMIAR_SIMILARIDADE)
+    t_lsh = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    agrupamento.componentes(len(chaves), *ligacoes)
+    t_componentes = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    candidatas = agrupar("Introdução", contagem)
+    t_total = time.perf_counter() - inicio
+    print(f"\n{'etapa':<34} {'s':>7}")
+    for nome, duracao in [("assinaturas MinHash", t_assinaturas), ("LSH e confirmação", t_lsh),
+                          ("componentes conexos", t_componentes), ("agrupar (tudo, com as candidatas)", t_total)]:
+        print(f"{nome:<34} {duracao:>7.2f}")
+
+    # Qualidade: cada texto tem a frase de origem; o agrupamento é identificado pela sua variante principal
+    agrupamento_do_texto = {}
+    for numero, candidata in enumerate(candidatas):
+        for texto in [candidata.texto] + candidata.exemplos:
+            agrupamento_do_texto[_chave(texto)] = numero
+    por_agrupamento, por_origem = {}, {}
+    for texto, frequencia in contagem.items():
+        numero, origem = agrupamento_do_texto[_chave(texto)], origem_do_texto[texto]
+        por_agrupamento.setdefault(numero, Counter())[origem] += frequencia
+        por_origem.setdefault(origem, Counter())[numero] += frequencia
+    pureza = sum(max(c.values()) for c in por_agrupamento.values()) / args.comentarios
+    completude = sum(max(c.values()) for c in por_origem.values()) / args.comentarios
+    print(f"\n{len(candidatas)} agrupamentos para {len(por_origem)} frases usadas: "
+          f"pureza {pureza:.1%}, completude {completude:.1%}")
+
+    amostra = random.Random(1).sample(chaves, min(args.amostra, len(chaves)))
+    inicio = time.perf_counter()
+    _jaccard_todos_os_pares(amostra, agrupamento.LIMIAR_SIMILARIDADE)
+    duracao = time.perf_counter() - inicio
+    estimativa = duracao * (len(chaves) / len(amostra)) ** 2
+    print(f"\ntodos os pares (Jaccard exato): {duracao:.2f}s para {len(amostra)} textos; "
+          f"~{estimativa / 60:.0f} min estimados para os {len(chaves)}")
+
+
+if __name__ == "__main__":
+    main()
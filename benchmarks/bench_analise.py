@@ -0,0 +1,108 @@
+"""
+Painel da turma (sata.analise) com dezenas de milhares de avaliações gravadas.
+
+Grava N avaliações sintéticas em um banco SQLite temporário e mede:
+    - carga completa da tabela colunar (primeiro atualizar());
+    - agregados (resumo das notas, histograma e frequência das sugestões)
+      sem cache e com cache;
+    - atualizar() sem alterações no banco e após gravar avaliações novas
+      e alterar algumas existentes;
+    - referência: ler tudo do banco e agregar com laços em Python, que é o
+      que seria preciso refazer a cada abertura do painel sem a tabela.
+
+Uso:
+    python benchmarks/bench_analise.py
+    python benchmarks/bench_analise.py --quantidade 50000
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import DIMENSOES
+from sata.analise import PainelTurma, AGRUPAMENTOS
+from sata.armazenamento import ArmazemAvaliacoes
+from sintetico import gerar_avaliacoes
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def agregados(painel):
+    """Todas as consultas que a aba Turma pode fazer"""
+    for por in (None,) + AGRUPAMENTOS:
+        painel.resumo_notas(por)
+        painel.frequencia_sugestoes(por)
+        for dimensao in ('Nota Total', *DIMENSOES):
+            painel.histograma(dimensao, por)
+
+
+def agregados_em_python(armazem):
+    """Referência sem tabela colunar: lê tudo do banco e agrega com dicionários"""
+    notas = defaultdict(list)
+    sugestoes = Counter()
+    for _, estado in armazem.iterar_avaliacoes():
+        for dimensao, nota in estado['notas_tabela'].items():
+            for por in (None,) + AGRUPAMENTOS:
+                notas[(estado.get(por) if por else 'Todas', dimensao)].append(nota)
+        for dimensao, avaliacao in estado['avaliacoes'].items():
+            for obs in avaliacao['observacoes']:
+                for por in (None,) + AGRUPAMENTOS:
+                    sugestoes[(estado.get(por) if por else 'Todas', dimensao, obs)] += 1
+    return {chave: (len(v), statistics.fmean(v), statistics.quantiles(v, n=4)) for chave, v in notas.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quantidade', type=int, default=20000)
+    parser.add_argument('--novas', type=int, default=20, help="Avaliações novas na rodada incremental")
+    parser.add_argument('--alteradas', type=int, default=20, help="Avaliações alteradas na rodada incremental")
+    args = parser.parse_args(argv)
+
+    avaliacoes = gerar_avaliacoes(args.quantidade + args.novas)
+    with tempfile.TemporaryDirectory() as pasta:
+        armazem = ArmazemAvaliacoes(Path(pasta) / 'bench_analise.db')
+        print(f"... gravando {args.quantidade} avaliações", file=sys.stderr)
+        ids = [armazem.salvar(None, avaliacao)[0] for avaliacao in avaliacoes[:args.quantidade]]
+
+        painel = PainelTurma()
+        ms_carga, _ = cronometrar(painel.atualizar, armazem)
+        ms_frio, _ = cronometrar(agregados, painel)
+        ms_quente, _ = cronometrar(agregados, painel)
+        ms_ocioso, _ = cronometrar(painel.atualizar, armazem)
+
+        # Rodada incremental
+        for avaliacao in avaliacoes[args.quantidade:]:
+            armazem.salvar(None, avaliacao)
+        for grupo_id, avaliacao in zip(ids[:args.alteradas], avaliacoes):
+            avaliacao['notas_tabela']['Introdução'] = 1.0 - avaliacao['notas_tabela']['Introdução']
+            armazem.salvar(grupo_id, avaliacao)
+        ms_incremental, lidas = cronometrar(painel.atualizar, armazem)
+        ms_reagregar, _ = cronometrar(agregados, painel)
+
+        ms_python, _ = cronometrar(agregados_em_python, armazem)
+        armazem.fechar()
+
+    consultas = (1 + len(AGRUPAMENTOS)) * (2 + 1 + len(DIMENSOES))
+    print(f"{len(painel)} avaliações, {consultas} consultas por rodada de agregados\n")
+    print(f"{'carga completa da tabela':<44} {ms_carga:>10.1f} ms")
+    print(f"{'agregados sem cache':<44} {ms_frio:>10.1f} ms")
+    print(f"{'agregados com cache':<44} {ms_quente:>10.3f} ms")
+    print(f"{'atualizar() sem alterações':<44} {ms_ocioso:>10.2f} ms")
+    print(f"{f'atualizar() com {args.novas} novas e {args.alteradas} alteradas':<44} "
+          f"{ms_incremental:>10.2f} ms ({lidas} linhas)")
+    print(f"{'agregados após a atualização':<44} {ms_reagregar:>10.1f} ms")
+    print(f"{'referência: ler tudo e agregar em Python':<44} {ms_python:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Tamanho e tempo de leitura dos backups: formato v2.1 (JSON indentado, textos
+completos) versus v3 (identificadores de sugestão, JSON compacto), com e sem gzip.
+
+O corpus são N avaliações sintéticas (benchmarks/sintetico.py). O v2.1 é
+gerado aqui do mesmo jeito que o salvar_progresso antigo fazia; a leitura de
+todos os formatos usa sata.ler_progresso, como o botão Continuar Trabalho.
+
+Uso:
+    python benchmarks/bench_backup.py
+    python benchmarks/bench_backup.py --quantidade 5000
+"""
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import serializar_progresso, ler_progresso
+from sintetico import gerar_avaliacoes
+
+
+def serializar_v21(estado):
+    """Backup como o salvar_progresso gravava na versão 2.1"""
+    dados = dict(estado, versao='2.1', timestamp='2026-06-01T12:00:00',
+                 data_avaliacao=estado['data_avaliacao'].isoformat())
+    return json.dumps(dados, indent=2, ensure_ascii=False)
+
+
+FORMATOS = {
+    'v2.1': lambda av: serializar_v21(av).encode('utf-8'),
+    'v2.1 + gzip': lambda av: gzip.compress(serializar_v21(av).encode('utf-8'), mtime=0),
+    'v3': lambda av: serializar_progresso(av).encode('utf-8'),
+    'v3 + gzip': lambda av: serializar_progresso(av, compactar=True),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quantidade', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    avaliacoes = gerar_avaliacoes(args.quantidade)
+
+    print(f"{args.quantidade} backups sintéticos\n")
+    print(f"{'formato':<12} {'total (KiB)':>12} {'média (B)':>10} {'mediana (B)':>12} "
+          f"{'gravar (µs)':>12} {'ler (µs)':>10}")
+    base = None
+    for formato, serializar in FORMATOS.items():
+        inicio = time.perf_counter()
+        arquivos = [serializar(av) for av in avaliacoes]
+        gravar_us = (time.perf_counter() - inicio) / len(avaliacoes) * 1e6
+
+        inicio = time.perf_counter()
+        for conteudo in arquivos:
+            ler_progresso(conteudo)
+        ler_us = (time.perf_counter() - inicio) / len(avaliacoes) * 1e6
+
+        tamanhos = [len(conteudo) for conteudo in arquivos]
+        total = sum(tamanhos)
+        base = base or total
+        print(f"{formato:<12} {total / 1024:>12.1f} {statistics.fmean(tamanhos):>10.0f} "
+              f"{statistics.median(tamanhos):>12.0f} {gravar_us:>12.1f} {ler_us:>10.1f}"
+              f"   ({total / base:.0%} do v2.1)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Quanto de geração de PDF o cache por conteúdo (sata.cache_pdf) evita.
+
+Simula uma sequência de cliques em "Gerar PDF" sobre um conjunto de
+relatórios distintos, com repetição (professores regenerando o mesmo
+relatório, revisitando grupos): o relatório de cada clique é sorteado com
+distribuição de Zipf (poucos relatórios concentram a maioria). Cada cenário
+roda a mesma sequência com um limite de memória diferente (0 = sem cache) e
+informa acertos, faltas, descartes e o tempo total de geração.
+
+Uso:
+    python benchmarks/bench_cache_pdf.py
+    python benchmarks/bench_cache_pdf.py --cliques 500 --relatorios 100
+"""
+import argparse
+import random
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import dados_pdf_de_progresso
+from sata.cache_pdf import CachePDF, chave_relatorio
+from sata.pdf import gerar_pdf_relatorio
+from sintetico import gerar_avaliacoes
+
+
+def _gerar(dados_pdf):
+    buffer = BytesIO()
+    gerar_pdf_relatorio(dados_pdf, buffer)
+    return buffer.getvalue()
+
+
+def sequencia_cliques(relatorios, cliques, semente=0):
+    """Índices dos relatórios pedidos em cada clique (Zipf, s=1)"""
+    aleatorio = random.Random(semente)
+    pesos = [1 / (i + 1) for i in range(relatorios)]
+    return aleatorio.choices(range(relatorios), weights=pesos, k=cliques)
+
+
+def rodar(pedidos, sequencia, limite_memoria):
+    """Retorna (segundos, estatísticas do cache)"""
+    cache = CachePDF(limite_memoria=limite_memoria, pasta=None)
+    inicio = time.perf_counter()
+    for i in sequencia:
+        chave = chave_relatorio(pedidos[i])
+        if cache.obter(chave) is None:
+            cache.guardar(chave, _gerar(pedidos[i]))
+    return time.perf_counter() - inicio, cache.estatisticas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cliques', type=int, default=200)
+    parser.add_argument('--relatorios', type=int, default=40)
+    parser.add_argument('--limites-kib', type=int, nargs='+', default=[0, 32, 128, 65536])
+    args = parser.parse_args(argv)
+
+    pedidos = [dados_pdf_de_progresso(av) for av in gerar_avaliacoes(args.relatorios)]
+    sequencia = sequencia_cliques(args.relatorios, args.cliques)
+    tamanho_medio = sum(len(_gerar(d)) for d in pedidos[:5]) / 5
+
+    inicio = time.perf_counter()
+    for d in pedidos:
+        chave_relatorio(d)
+    hash_us = (time.perf_counter() - inicio) / len(pedidos) * 1e6
+
+    print(f"{args.cliques} cliques sobre {args.relatorios} relatórios distintos "
+          f"({len(set(sequencia))} pedidos ao menos uma vez); PDF médio {tamanho_medio / 1024:.1f} KiB; "
+          f"hash do conteúdo {hash_us:.0f} µs\n")
+    print(f"{'memória (KiB)':>13} {'acertos':>8} {'faltas':>7} {'descartes':>10} {'acerto':>7} {'tempo (s)':>10}")
+    for limite in args.limites_kib:
+        duracao, est = rodar(pedidos, sequencia, limite * 1024)
+        print(f"{limite:>13} {est['acertos_memoria']:>8} {est['faltas']:>7} {est['descartes']:>10} "
+              f"{est['taxa_acerto']:>7.0%} {duracao:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Índice dos comentários já usados (sata.comentarios): carga, busca e gravação incremental.
+
+Grava --grupos avaliações sintéticas em um banco temporário (sata.armazenamento)
+e mede:
+    - atualizar: a primeira contagem de todos os comentários do banco;
+    - abertura: um índice novo sobre o mesmo banco (como ao reiniciar o app),
+      com a montagem da trie e do índice de palavras de cada dimensão na primeira busca;
+    - sugerir: latência por busca (p50/p99) para começos de comentários já
+      usados, de 0 a 30 caracteres (na primeira vez e repetidas, com o cache
+      dos nós da trie já montado), e para palavras soltas, comparada a uma
+      varredura de todos os comentários da dimensão;
+    - registrar: a gravação de um grupo com o comentário alterado.
+
+Uso:
+    python benchmarks/bench_comentarios.py
+    python benchmarks/bench_comentarios.py --grupos 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata.armazenamento import ArmazemAvaliacoes
+from sata.comentarios import IndiceComentarios, normalizar
+from sintetico import _PALAVRAS, gerar_avaliacoes
+
+
+def _varredura(comentarios, busca, limite=5):
+    """A alternativa sem índice: compara a busca com todos os comentários da dimensão"""
+    chave = normalizar(busca)
+    encontrados = [(contagem, texto) for texto, contagem in comentarios if normalizar(texto).startswith(chave)]
+    return [texto for _, texto in sorted(encontrados, key=lambda par: -par[0])[:limite]]
+
+
+def _latencias(funcao, buscas):
+    tempos = []
+    for dimensao, busca in buscas:
+        inicio = time.perf_counter()
+        funcao(dimensao, busca)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.99)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grupos', type=int, default=20000)
+    parser.add_argument('--buscas', type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    avaliacoes = gerar_avaliacoes(args.grupos, max_caracteres=300)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'avaliacoes.db')
+        armazem = ArmazemAvaliacoes(caminho)
+        grupos = [armazem.salvar(None, avaliacao)[0] for avaliacao in avaliacoes]
+
+        indice = IndiceComentarios(caminho)
+        inicio = time.perf_counter()
+        contados = indice.atualizar(armazem)
+        print(f"atualizar (todos os {args.grupos} grupos): {time.perf_counter() - inicio:.2f}s, {contados} comentários contados")
+        indice.fechar()
+
+        indice = IndiceComentarios(caminho)
+        dimensoes = list(avaliacoes[0]['avaliacoes'])
+        inicio = time.perf_counter()
+        for dimensao in dimensoes:
+            indice.sugerir(dimensao)
+        distintos = {dimensao: list(indice._conexao.execute(
+            "SELECT texto, contagem FROM comentarios WHERE dimensao = ?", (dimensao,))) for dimensao in dimensoes}
+        print(f"abertura: trie e índice de palavras de {len(dimensoes)} dimensões em {time.perf_counter() - inicio:.2f}s, "
+              f"{sum(map(len, distintos.values()))} comentários distintos")
+
+        prefixos, palavras = [], []
+        for _ in range(args.buscas):
+            dimensao = rng.choice(dimensoes)
+            texto = rng.choice(distintos[dimensao])[0]
+            prefixos.append((dimensao, texto[:rng.randint(0, 30)]))
+            palavras.append((dimensao, ' '.join(rng.sample(_PALAVRAS, 2))))
+
+        print(f"\n{'sugerir (5 sugestões)':<32} {'p50 (µs)':>10} {'p99 (µs)':>10}")
+        for nome, funcao, buscas in [
+            ("começo do comentário", indice.sugerir, prefixos),
+            ("idem, de novo (nós em cache)", indice.sugerir, prefixos),
+            ("palavras soltas", indice.sugerir, palavras),
+            ("varredura, começo", lambda d, b: _varredura(distintos[d], b), prefixos[:200]),
+        ]:
+            p50, p99 = _latencias(funcao, buscas)
+            print(f"{nome:<32} {p50:>10.0f} {p99:>10.0f}")
+
+        tempos = []
+        for grupo_id, avaliacao in zip(grupos[:500], avaliacoes):
+            dimensao = rng.choice(dimensoes)
+            avaliacao['avaliacoes'][dimensao]['comentario'] += f"\n{' '.join(rng.sample(_PALAVRAS, 4)).capitalize()}."
+            inicio = time.perf_counter()
+            indice.registrar(grupo_id, avaliacao)
+            tempos.append((time.perf_counter() - inicio) * 1e6)
+        print(f"\nregistrar (grupo com um comentário novo): {statistics.median(tempos):.0f} µs (p50)")
+        indice.fechar()
+        armazem.fechar()
+
+
+if __name__ == "__main__":
+    main()
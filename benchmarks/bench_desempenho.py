@@ -0,0 +1,91 @@
+"""
+Custo da instrumentação dos reruns (sata.desempenho), ligada e desligada.
+
+Mede o tempo por chamada de:
+    - medir() desligado (SATA_PERF vazio): o contexto vazio compartilhado;
+    - uma seção dentro de um rastro aberto (o caso das seções de um rerun);
+    - um rastro completo com 15 seções (aproximadamente um rerun do app),
+      com e sem gravação do JSONL.
+e compara com o tempo típico de um rerun completo do app (~50-100 ms).
+
+Uso:
+    python benchmarks/bench_desempenho.py
+    python benchmarks/bench_desempenho.py --repeticoes 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import desempenho
+from sata.desempenho import MonitorDesempenho
+
+SECOES_POR_RERUN = 15
+
+
+def _por_chamada(funcao, repeticoes):
+    """Microssegundos por chamada (melhor de 3)"""
+    melhor = float('inf')
+    for _ in range(3):
+        inicio = time.perf_counter()
+        funcao(repeticoes)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / repeticoes * 1e6
+
+
+def _medir_desligado(repeticoes):
+    for _ in range(repeticoes):
+        with desempenho.medir("seção"):
+            pass
+
+
+def _secao(monitor):
+    def rodar(repeticoes):
+        with monitor.medir("rerun"):
+            for _ in range(repeticoes):
+                with monitor.medir("seção"):
+                    pass
+    return rodar
+
+
+def _rerun(monitor):
+    nomes = [f"seção {i}" for i in range(SECOES_POR_RERUN)]
+
+    def rodar(repeticoes):
+        for _ in range(repeticoes):
+            with monitor.medir("rerun completo"):
+                for nome in nomes:
+                    with monitor.medir(nome):
+                        pass
+    return rodar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=100000)
+    args = parser.parse_args(argv)
+    n = args.repeticoes
+
+    desempenho.MONITOR = None  # como com SATA_PERF desligado
+    with tempfile.TemporaryDirectory() as pasta:
+        em_memoria = MonitorDesempenho(arquivo=None)
+        com_arquivo = MonitorDesempenho(arquivo=Path(pasta) / 'desempenho.jsonl')
+        cenarios = [
+            ("medir() desligado", _medir_desligado, n),
+            ("seção (ligado)", _secao(em_memoria), n),
+            (f"rerun de {SECOES_POR_RERUN} seções, sem JSONL", _rerun(em_memoria), n // SECOES_POR_RERUN),
+            (f"rerun de {SECOES_POR_RERUN} seções, com JSONL", _rerun(com_arquivo), n // SECOES_POR_RERUN),
+        ]
+        print(f"{'cenário':<36} {'µs/chamada':>11} {'% de um rerun de 50 ms':>23}")
+        for nome, funcao, repeticoes in cenarios:
+            us = _por_chamada(funcao, repeticoes)
+            print(f"{nome:<36} {us:>11.2f} {us / 50000 * 100:>22.3f}%")
+        com_arquivo._saida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Diário de avaliações (sata.diario): gravação, leitura em fluxo e compactação.
+
+Simula um semestre: --grupos avaliações sintéticas, cada uma gravada
+--gravacoes vezes no diário (acrescentar, em rodadas intercaladas, como
+quando o professor volta aos grupos). Mede:
+    - gravação: registros por segundo com acrescentar;
+    - leitura: ler_diario só com o registro mais recente de cada grupo e com
+      todos, e, para comparar, a leitura do arquivo inteiro na memória
+      (json.loads de todas as linhas e só depois a escolha do mais recente);
+      com o pico de memória (tracemalloc) de cada uma;
+    - compactação: compactar_diario, com o tamanho antes e depois.
+
+Uso:
+    python benchmarks/bench_diario.py
+    python benchmarks/bench_diario.py --grupos 500 --gravacoes 40
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import ler_progresso
+from sata.armazenamento import CAMPOS_IDENTIFICACAO
+from sata.diario import acrescentar, compactar_diario, ler_diario
+from sintetico import gerar_avaliacoes
+
+
+def _tudo_na_memoria(caminho):
+    """A alternativa sem o diário em fluxo: decodifica o arquivo inteiro e depois escolhe"""
+    registros = [json.loads(linha) for linha in Path(caminho).read_bytes().splitlines() if linha.strip()]
+    recentes = {tuple(r.get(campo, '') for campo in CAMPOS_IDENTIFICACAO): r for r in registros}
+    return [ler_progresso(json.dumps(r)) for r in recentes.values()]
+
+
+def _medir(funcao):
+    """(segundos, pico de memória em MiB, resultado) da chamada"""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return duracao, pico, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grupos', type=int, default=200)
+    parser.add_argument('--gravacoes', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    avaliacoes = list(gerar_avaliacoes(args.grupos))
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'semestre.jsonl')
+        inicio = time.perf_counter()
+        for rodada in range(args.gravacoes):
+            for avaliacao in avaliacoes:
+                avaliacao['parte_oral'] = round(rodada / args.gravacoes * 3, 1)
+                acrescentar(caminho, [avaliacao])
+        duracao = time.perf_counter() - inicio
+        registros = args.grupos * args.gravacoes
+        tamanho = os.path.getsize(caminho)
+        print(f"gravação: {registros} registros ({tamanho / 2**20:.1f} MiB) em {duracao:.2f}s "
+              f"({registros / duracao:.0f} registros/s, um acrescentar por registro)")
+
+        print(f"\n{'leitura':<40} {'s':>6} {'pico (MiB)':>11} {'avaliações':>11}")
+        for nome, funcao in [
+            ("ler_diario, mais recente de cada grupo", lambda: list(ler_diario(caminho))),
+            ("ler_diario, todos os registros", lambda: sum(1 for _ in ler_diario(caminho, False))),
+            ("ler_diario em fluxo, sem guardar", lambda: sum(1 for _ in ler_diario(caminho))),
+            ("arquivo inteiro na memória", lambda: _tudo_na_memoria(caminho)),
+        ]:
+            duracao, pico, resultado = _medir(funcao)
+            quantidade = resultado if isinstance(resultado, int) else len(resultado)
+            print(f"{nome:<40} {duracao:>6.2f} {pico:>11.1f} {quantidade:>11}")
+
+        compactado = os.path.join(pasta, 'compactado.jsonl')
+        inicio = time.perf_counter()
+        quantidade = compactar_diario(caminho, compactado)
+        duracao = time.perf_counter() - inicio
+        print(f"\ncompactação: {quantidade} registros em {duracao:.2f}s, "
+              f"{tamanho / 2**20:.1f} MiB -> {os.path.getsize(compactado) / 2**20:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Documento do relatório (sata.documento): montagem, memorização e renderizações.
+
+Para --avaliacoes avaliações sintéticas, mede por avaliação (p50):
+    - montar_documento: a passada única pela avaliação;
+    - chave_relatorio: o hash do conteúdo (já calculado pela aba Relatório para o cache de PDFs);
+    - documento_relatorio com a chave: um rerun sem mudança (documento já guardado);
+    - texto_parecer a partir do documento e gerar_parecer_resumido (monta e renderiza);
+    - historia_relatorio com o documento já montado e sem ele.
+
+Uso:
+    python benchmarks/bench_documento.py
+    python benchmarks/bench_documento.py --avaliacoes 2000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import dados_pdf_de_progresso, gerar_parecer_resumido
+from sata.cache_pdf import chave_relatorio
+from sata.documento import documento_relatorio, montar_documento
+from sata.parecer import texto_parecer
+from sata.pdf import historia_relatorio
+from sintetico import gerar_avaliacoes
+
+
+def _p50(funcao, argumentos):
+    tempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--avaliacoes', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    lote = [dados_pdf_de_progresso(avaliacao) for avaliacao in gerar_avaliacoes(args.avaliacoes)]
+    chaves = [chave_relatorio(dados) for dados in lote]
+    documentos = [montar_documento(dados) for dados in lote]
+    ultimo = lote[-1], chaves[-1]
+    documento_relatorio(*ultimo)
+
+    print(f"{'etapa (por avaliação)':<44} {'p50 (µs)':>10}")
+    for nome, funcao, argumentos in [
+        ("montar_documento", montar_documento, [(dados,) for dados in lote]),
+        ("chave_relatorio", chave_relatorio, [(dados,) for dados in lote]),
+        ("documento_relatorio (já guardado)", documento_relatorio, [ultimo] * len(lote)),
+        ("texto_parecer (documento montado)", texto_parecer, [(documento,) for documento in documentos]),
+        ("gerar_parecer_resumido (monta e renderiza)", gerar_parecer_resumido, [(dados,) for dados in lote]),
+        ("historia_relatorio (documento montado)", historia_relatorio, list(zip(lote, documentos))),
+        ("historia_relatorio (monta o documento)", historia_relatorio, [(dados,) for dados in lote]),
+    ]:
+        print(f"{nome:<44} {_p50(funcao, argumentos):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Memória e vazão da exportação das notas (sata.exportacao) conforme o tamanho da turma.
+
+Grava avaliações sintéticas em um banco temporário e exporta as primeiras
+N (lidas do banco em lotes por iterar_avaliacoes) em CSV e XLSX, medindo o
+tempo e o pico de memória alocada durante a exportação (tracemalloc). Com a
+exportação em fluxo, o pico deve ficar praticamente igual para qualquer N.
+
+Uso:
+    python benchmarks/bench_exportacao.py
+    python benchmarks/bench_exportacao.py --tamanhos 100 1000 10000 50000
+"""
+import argparse
+import itertools
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import openpyxl  # importado antes das medições, para não entrar no pico de memória
+
+from sata.armazenamento import ArmazemAvaliacoes
+from sata.exportacao import exportar, FORMATOS_EXPORTACAO
+from sintetico import gerar_avaliacoes
+
+
+def _exportar(armazem, n, formato):
+    """Exporta as primeiras n avaliações do banco; retorna (segundos, bytes gravados)"""
+    avaliacoes = (estado for _, estado in itertools.islice(armazem.iterar_avaliacoes(), n))
+    with tempfile.TemporaryFile() as destino:
+        inicio = time.perf_counter()
+        exportar(avaliacoes, destino, formato)
+        return time.perf_counter() - inicio, destino.tell()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1000, 10000])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        armazem = ArmazemAvaliacoes(Path(pasta) / 'bench_exportacao.db')
+        print(f"... gravando {max(args.tamanhos)} avaliações", file=sys.stderr)
+        for avaliacao in gerar_avaliacoes(max(args.tamanhos)):
+            armazem.salvar(None, avaliacao)
+
+        print(f"{'formato':<8} {'n':>7} {'tempo (s)':>10} {'linhas/s':>10} {'arquivo (KiB)':>14} {'pico (KiB)':>11}")
+        for formato in FORMATOS_EXPORTACAO:
+            for n in args.tamanhos:
+                duracao, tamanho = _exportar(armazem, n, formato)
+                # Segunda passada com tracemalloc, para não distorcer o tempo
+                tracemalloc.start()
+                _exportar(armazem, n, formato)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{formato:<8} {n:>7} {duracao:>10.2f} {n / duracao:>10.0f} "
+                      f"{tamanho / 1024:>14.0f} {pico / 1024:>11.0f}")
+        armazem.fechar()
+
+
+if __name__ == "__main__":
+    main()
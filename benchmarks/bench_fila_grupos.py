@@ -0,0 +1,137 @@
+"""
+Fila de grupos (sata.fila_grupos): validação em lote e troca de grupo.
+
+Gera --grupos backups sintéticos (.json.gz) em um .zip, com alguns backups
+inválidos misturados, e mede:
+    - validação: montar_fila sobre o .zip (tempo total e por backup);
+    - troca de grupo fora do app: FilaGrupos.abrir com o estado do vizinho
+      já preparado (preparar_vizinhos) e sem ele (leitura do backup ou do
+      banco, para um grupo já aberto e gravado);
+    - troca de grupo no app (AppTest): o rerun do clique em "Próximo ➡️",
+      comparado a um rerun sem troca de grupo.
+
+Uso:
+    python benchmarks/bench_fila_grupos.py
+    python benchmarks/bench_fila_grupos.py --grupos 200 --repeticoes 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'fila_grupos.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'fila_grupos.jsonl'))
+os.environ.setdefault('SATA_CACHE_PDF', '')
+
+from streamlit.testing.v1 import AppTest
+
+from sata import serializar_progresso
+from sata.armazenamento import ArmazemAvaliacoes
+from sata.fila_grupos import montar_fila
+from sintetico import gerar_avaliacoes
+
+APP = str(RAIZ / 'pim_avaliador.py')
+INVALIDOS = {
+    'quebrado.json': b'{"versao": "3", "lider": ',
+    'nota_fora_da_faixa.json': json.dumps({'versao': '3', 'avaliacoes': {'Introdução': {'nota': 7}}}).encode(),
+    'versao_nova.json': b'{"versao": "9"}',
+}
+
+
+def montar_zip(grupos):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for i, estado in enumerate(gerar_avaliacoes(grupos)):
+            zf.writestr(f"SATA_{i:04d}.json.gz", serializar_progresso(estado, compactar=True))
+        for nome, conteudo in INVALIDOS.items():
+            zf.writestr(nome, conteudo)
+    return buffer.getvalue()
+
+
+def _trocar(fila, armazem, posicao, preparar, repeticoes):
+    """Mediana (µs) de FilaGrupos.abrir(posicao) a partir do terceiro grupo"""
+    tempos = []
+    for _ in range(repeticoes):
+        fila.posicao, fila._preparados = 2, {}
+        if preparar:
+            fila.preparar_vizinhos(armazem)
+        inicio = time.perf_counter()
+        fila.abrir(posicao, armazem)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+
+def medir_fila(conteudo_zip, repeticoes):
+    inicio = time.perf_counter()
+    fila, falhas = montar_fila([('turma.zip', conteudo_zip)])
+    validacao = time.perf_counter() - inicio
+    print(f"validação: {len(fila)} válidos, {len(falhas)} inválidos em {validacao * 1000:.1f} ms "
+          f"({validacao / (len(fila) + len(falhas)) * 1e6:.0f} µs/backup)")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        armazem = ArmazemAvaliacoes(Path(pasta) / 'fila.db')
+        for posicao in (0, 1):  # os dois primeiros já abertos e gravados no banco
+            fila.entradas[posicao].grupo_id, _ = armazem.salvar(None, fila.ler(posicao))
+
+        print(f"\n{'troca de grupo (fora do app)':<36} {'µs (p50)':>9}")
+        for nome, posicao, preparar in [
+            ("vizinho preparado", 3, True),
+            ("sem preparo, do backup", 3, False),
+            ("sem preparo, do banco", 1, False),
+        ]:
+            print(f"{nome:<36} {_trocar(fila, armazem, posicao, preparar, repeticoes):>9.0f}")
+        armazem.fechar()
+
+
+def _rodar(at, elemento=None):
+    at.session_state['aba'] = "📄 Apresentação"  # o AppTest não devolve a aba aberta, como o navegador
+    inicio = time.perf_counter()
+    (elemento or at).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def medir_app(conteudo_zip, repeticoes):
+    at = AppTest.from_file(APP, default_timeout=120)
+    _rodar(at)
+    fila, _ = montar_fila([('turma.zip', conteudo_zip)])
+    at.session_state['fila_grupos'] = fila
+    at.session_state['restauracao_pendente'] = (*fila.abrir(0), True)
+    _rodar(at)
+
+    proximo = []
+    for _ in range(min(repeticoes, len(fila) - 1)):
+        esperado = fila.entradas[fila.posicao + 1].empresa
+        proximo.append(_rodar(at, next(b for b in at.button if b.label == "Próximo ➡️").click()))
+        if at.session_state['empresa'] != esperado:
+            raise RuntimeError("o clique em Próximo não abriu o grupo seguinte")
+
+    sem_troca = [_rodar(at) for _ in range(repeticoes)]
+
+    print(f"\n{'troca de grupo (no app)':<36} {'ms (p50)':>9}")
+    print(f"{'Próximo ➡️':<36} {statistics.median(proximo):>9.1f}")
+    print(f"{'rerun sem troca':<36} {statistics.median(sem_troca):>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grupos', type=int, default=65)
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    conteudo_zip = montar_zip(args.grupos)
+    medir_fila(conteudo_zip, max(args.repeticoes, 100))
+    medir_app(conteudo_zip, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
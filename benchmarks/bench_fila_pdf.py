@@ -0,0 +1,109 @@
+"""
+Responsividade do servidor com vários professores gerando PDF ao mesmo tempo.
+
+Simula N sessões (threads, como as threads de script do Streamlit) pedindo um
+PDF cada, ao mesmo tempo:
+    - síncrono: cada thread chama gerar_pdf_relatorio, como o botão fazia;
+    - fila:     cada thread envia à FilaPDF e consulta o estado a cada 100 ms.
+
+Durante o teste, uma thread sonda dorme 5 ms em laço e registra o atraso
+para voltar a executar: é o tempo que um rerun de outra sessão esperaria pelo
+interpretador. Informa também a latência de cada pedido (clique -> bytes).
+
+Uso:
+    python benchmarks/bench_fila_pdf.py
+    python benchmarks/bench_fila_pdf.py --sessoes 32 --processos 4
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import dados_pdf_de_progresso
+from sata.fila_pdf import FilaPDF
+from sata.pdf import gerar_pdf_relatorio
+from sintetico import gerar_avaliacoes
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def _sincrono(dados_pdf):
+    buffer = BytesIO()
+    gerar_pdf_relatorio(dados_pdf, buffer)
+    return buffer.getvalue()
+
+
+def _pela_fila(fila, sessao, dados_pdf):
+    trabalho_id = fila.enviar(sessao, dados_pdf)
+    while not fila.consultar(trabalho_id).terminado:
+        time.sleep(0.1)
+    return fila.retirar(trabalho_id).pdf
+
+
+def rodar(pedidos, pedir):
+    """Dispara os pedidos em threads simultâneas; retorna (latências em s, atrasos da sonda em ms, total em s)"""
+    latencias, atrasos = [], []
+    parar = threading.Event()
+
+    def sonda():
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            time.sleep(0.005)
+            atrasos.append((time.perf_counter() - inicio - 0.005) * 1000)
+
+    def sessao(i, dados_pdf):
+        inicio = time.perf_counter()
+        pedir(i, dados_pdf)
+        latencias.append(time.perf_counter() - inicio)
+
+    thread_sonda = threading.Thread(target=sonda)
+    thread_sonda.start()
+    threads = [threading.Thread(target=sessao, args=(i, d)) for i, d in enumerate(pedidos)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - inicio
+    parar.set()
+    thread_sonda.join()
+    return latencias, atrasos, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessoes', type=int, default=16)
+    parser.add_argument('--processos', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    pedidos = [dados_pdf_de_progresso(av) for av in gerar_avaliacoes(args.sessoes)]
+    _sincrono(pedidos[0])  # aquecimento
+
+    fila = FilaPDF(processos=args.processos)
+    _pela_fila(fila, 'aquecimento', pedidos[0])  # sobe os processos do pool
+
+    cenarios = {
+        'síncrono': lambda i, d: _sincrono(d),
+        f'fila ({args.processos} proc.)': lambda i, d: _pela_fila(fila, f"sessao{i}", d),
+    }
+    print(f"{args.sessoes} sessões pedindo um PDF ao mesmo tempo\n")
+    print(f"{'modo':<16} {'total (s)':>9} {'pedido p50 (s)':>15} {'pedido máx (s)':>15} "
+          f"{'sonda p50 (ms)':>15} {'sonda p99 (ms)':>15} {'sonda máx (ms)':>15}")
+    for nome, pedir in cenarios.items():
+        latencias, atrasos, total = rodar(pedidos, pedir)
+        print(f"{nome:<16} {total:>9.2f} {statistics.median(latencias):>15.2f} {max(latencias):>15.2f} "
+              f"{statistics.median(atrasos):>15.2f} {_percentil(atrasos, 99):>15.2f} {max(atrasos):>15.2f}")
+    fila.encerrar()
+
+
+if __name__ == "__main__":
+    main()
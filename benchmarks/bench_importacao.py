@@ -0,0 +1,63 @@
+"""
+Tempo de importação a frio e memória (RSS) do núcleo sata versus o app Streamlit.
+
+Cada medição roda em um processo Python novo, que importa o módulo e informa
+o tempo de importação e o pico de RSS do processo (ru_maxrss).
+
+Uso:
+    python benchmarks/bench_importacao.py
+    python benchmarks/bench_importacao.py --modulos sata pim_avaliador --repeticoes 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Executado no processo filho: importa o módulo e imprime tempo e RSS em JSON
+_SONDA = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+__import__(sys.argv[1])
+duracao = time.perf_counter() - inicio
+rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'segundos': duracao, 'rss_kib': rss_kib}))
+"""
+
+MODULOS_PADRAO = ['sata', 'sata.pdf', 'pim_avaliador']
+
+
+def medir(modulo, repeticoes):
+    """Importa o módulo em processos novos e retorna (mediana em segundos, mediana de RSS em MiB)"""
+    env = dict(os.environ, PYTHONPATH=str(RAIZ), PYTHONDONTWRITEBYTECODE='1')
+    tempos, rss = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, '-c', _SONDA, modulo],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        resultado = json.loads(saida)
+        tempos.append(resultado['segundos'])
+        rss.append(resultado['rss_kib'] / 1024)
+    return statistics.median(tempos), statistics.median(rss)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modulos', nargs='+', default=MODULOS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    _, rss_base = medir('sys', args.repeticoes)
+    print(f"{'módulo':<16} {'importação (ms)':>16} {'RSS (MiB)':>10} {'RSS acima do python (MiB)':>26}")
+    for modulo in args.modulos:
+        segundos, rss = medir(modulo, args.repeticoes)
+        print(f"{modulo:<16} {segundos * 1000:>16.1f} {rss:>10.1f} {rss - rss_base:>26.1f}")
+
+
+if __name__ == "__main__":
+    main()
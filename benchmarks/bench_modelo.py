@@ -0,0 +1,65 @@
+"""
+Benchmark do modelo de relatório compartilhado (ModeloRelatorio).
+
+Mede relatórios/s de gerar_pdf_relatorio reaproveitando o modelo montado uma
+única vez ("depois") e descartando o modelo antes de cada relatório, o que
+equivale a remontar estilos e tabelas a cada chamada ("antes").
+
+Uso:
+    python benchmarks/bench_modelo.py
+    python benchmarks/bench_modelo.py --relatorios 500
+"""
+import argparse
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sata import dados_pdf_de_progresso
+from sata.pdf import gerar_pdf_relatorio, modelo_relatorio
+from sintetico import gerar_avaliacoes
+
+
+def medir(lote, remontar_modelo):
+    """Gera todos os relatórios do lote e retorna relatórios/s"""
+    inicio = time.perf_counter()
+    for dados in lote:
+        if remontar_modelo:
+            modelo_relatorio.cache_clear()
+        gerar_pdf_relatorio(dados, BytesIO())
+    return len(lote) / (time.perf_counter() - inicio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--relatorios', type=int, default=200)
+    parser.add_argument('--rodadas', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    lote = [dados_pdf_de_progresso(a) for a in gerar_avaliacoes(args.relatorios, seed=args.seed)]
+
+    medir(lote[:10], remontar_modelo=False)  # aquecimento (fontes, imports do ReportLab)
+
+    # Rodadas intercaladas, ficando com a melhor de cada modo, para reduzir ruído
+    antes = depois = 0.0
+    for _ in range(args.rodadas):
+        antes = max(antes, medir(lote, remontar_modelo=True))
+        depois = max(depois, medir(lote, remontar_modelo=False))
+
+    inicio = time.perf_counter()
+    for _ in range(100):
+        modelo_relatorio.cache_clear()
+        modelo_relatorio()
+    custo_modelo = (time.perf_counter() - inicio) / 100
+
+    print(f"montagem do modelo: {custo_modelo * 1000:.3f} ms por relatório economizados")
+    print(f"antes  (modelo remontado a cada relatório): {antes:8.1f} relatórios/s")
+    print(f"depois (modelo compartilhado):              {depois:8.1f} relatórios/s")
+    print(f"ganho: {(depois / antes - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Teste de estresse da paginação "Página X de Y" (NumberedCanvas).
+
+Compara o pico de memória (tracemalloc) ao gerar documentos de 1 a 1.000
+páginas com o NumberedCanvas atual e com a versão antiga, que guardava uma
+cópia de self.__dict__ de cada página até o save().
+
+A coluna "paginação" é o pico acima do mesmo documento desenhado com o
+canvas.Canvas puro, sem rodapé, ou seja, a memória gasta só com a numeração.
+O restante do pico é o próprio documento, que o ReportLab mantém em memória
+até gravar o arquivo.
+
+Uso:
+    python benchmarks/bench_paginacao.py
+    python benchmarks/bench_paginacao.py --paginas 1 10 100 1000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+from sata.pdf import NumberedCanvas
+
+
+class NumberedCanvasAntigo(canvas.Canvas):
+    """Implementação anterior, mantida aqui apenas como referência de comparação"""
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self._page_num = 0
+        self._pages = []
+
+    def showPage(self):
+        self._page_num += 1
+        self._pages.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total_pages = self._page_num
+        for i, page_dict in enumerate(self._pages, 1):
+            self.__dict__.update(page_dict)
+            self.setFont("Helvetica", 8)
+            self.drawString(7.5 * inch, 0.5 * inch, f"Página {i} de {total_pages}")
+            canvas.Canvas.showPage(self)
+        canvas.Canvas.save(self)
+
+
+def medir(canvasmaker, paginas, linhas_por_pagina=60):
+    """Desenha o número de páginas pedido e retorna (pico em bytes, segundos)"""
+    texto = "Observação de avaliação do PIM com texto de tamanho típico para o relatório."
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+
+    saida = BytesIO()
+    c = canvasmaker(saida, pagesize=A4)
+    for _ in range(paginas):
+        c.setFont("Helvetica", 8)
+        for linha in range(linhas_por_pagina):
+            c.drawString(0.6 * inch, 11 * inch - linha * 10, texto)
+        c.showPage()
+    c.save()
+
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico, duracao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paginas', type=int, nargs='+', default=[1, 10, 100, 1000])
+    args = parser.parse_args(argv)
+
+    print(f"{'páginas':>8} {'canvas':>8} {'pico (MiB)':>11} {'paginação (MiB)':>16} {'tempo (s)':>10}")
+    for paginas in args.paginas:
+        pico_base, _ = medir(canvas.Canvas, paginas)
+        for rotulo, canvasmaker in (("antigo", NumberedCanvasAntigo), ("atual", NumberedCanvas)):
+            pico, duracao = medir(canvasmaker, paginas)
+            print(f"{paginas:>8} {rotulo:>8} {pico / 2**20:>11.2f} "
+                  f"{(pico - pico_base) / 2**20:>16.2f} {duracao:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+PDF de um relatório com comentários e notas adicionais muito grandes (teste de estresse de sata.pdf).
+
+Para cada tamanho em --tamanhos (caracteres), gera o PDF de uma avaliação
+sintética com um comentário desse tamanho em --dimensoes dimensões e nas
+notas adicionais, em duas formas:
+    - linhas: o texto em linhas de ~300 caracteres, como um comentário colado de um documento;
+    - única: o texto inteiro em uma linha só, sem quebras.
+Informa o tempo do PDF, as páginas e o tempo por 1.000 caracteres, que deve
+ficar constante se o tempo cresce linearmente com o tamanho do texto.
+
+Também confere que textos com <, > e & (ex.: "<b>", "P&D", "a < b") entram
+no PDF como foram digitados: sem quebrar a geração e sem virar marcação.
+
+Uso:
+    python benchmarks/bench_pdf_grande.py
+    python benchmarks/bench_pdf_grande.py --tamanhos 25000 100000 --dimensoes 3
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import dados_pdf_de_progresso
+from sata.pdf import gerar_pdf_relatorio, historia_relatorio
+from sintetico import _PALAVRAS, gerar_avaliacoes
+
+CARACTERES_POR_LINHA = 300
+
+
+def gerar_texto(tamanho, em_linhas, seed=0):
+    """Frases sintéticas somando tamanho caracteres, em linhas de ~CARACTERES_POR_LINHA ou em uma só"""
+    rng = random.Random(seed)
+    frases, total = [], 0
+    while total < tamanho:
+        frase = ' '.join(rng.choices(_PALAVRAS, k=rng.randint(6, 16))).capitalize() + '.'
+        frases.append(frase)
+        total += len(frase) + 1
+    if not em_linhas:
+        return ' '.join(frases)[:tamanho]
+    linhas, linha = [], []
+    for frase in frases:
+        linha.append(frase)
+        if sum(map(len, linha)) >= CARACTERES_POR_LINHA:
+            linhas.append(' '.join(linha))
+            linha = []
+    linhas.append(' '.join(linha))
+    return '\n'.join(linhas)[:tamanho]
+
+
+def dados_com_texto(base, texto, dimensoes):
+    dados = dict(base, avaliacoes={dimensao: dict(avaliacao) for dimensao, avaliacao in base['avaliacoes'].items()})
+    for dimensao in list(dados['avaliacoes'])[:dimensoes]:
+        dados['avaliacoes'][dimensao]['comentario'] = texto
+    dados['comentarios_adicionais'] = texto
+    return dados
+
+
+def gerar(dados):
+    """(segundos, páginas) do PDF"""
+    buffer = BytesIO()
+    inicio = time.perf_counter()
+    gerar_pdf_relatorio(dados, buffer)
+    duracao = time.perf_counter() - inicio
+    return duracao, len(re.findall(rb'/Type /Page\b(?!s)', buffer.getvalue()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[12500, 25000, 50000, 100000])
+    parser.add_argument('--dimensoes', type=int, default=1, help="Dimensões com o comentário grande (padrão: 1)")
+    args = parser.parse_args(argv)
+
+    base = dados_pdf_de_progresso(gerar_avaliacoes(1)[0])
+    gerar(base)  # modelo do relatório e fontes já carregados
+
+    print(f"{'forma':<7} {'caracteres':>10} {'páginas':>8} {'PDF (s)':>8} {'ms/1.000 car.':>14}")
+    for em_linhas, forma in [(True, "linhas"), (False, "única")]:
+        for tamanho in args.tamanhos:
+            texto = gerar_texto(tamanho, em_linhas)
+            duracao, paginas = gerar(dados_com_texto(base, texto, args.dimensoes))
+            caracteres = tamanho * (args.dimensoes + 1)
+            print(f"{forma:<7} {caracteres:>10} {paginas:>8} {duracao:>8.2f} {duracao / caracteres * 1e6:>14.2f}")
+
+    especiais = ["Ver <b>seção 2</b> & anexos", "P&D", "a < b > c", "&nbsp; &#60;", "<br/>",
+                 "<font color=red>x</font>", "x <a href=1>y", "<Ltda>"]
+    dados = dados_com_texto(dict(base, empresa="Silva & Filhos <Ltda>"), '\n'.join(especiais), args.dimensoes)
+    try:
+        gerar(dados)
+        textos = '\n'.join(''.join(getattr(frag, 'text', '') for frag in flowable.frags)
+                           for flowable in historia_relatorio(dados) if hasattr(flowable, 'frags'))
+        alterados = [texto for texto in especiais if texto not in textos]
+        print("\ntexto com <, > e &: " + (f"alterado no PDF: {alterados}" if alterados else "igual ao digitado"))
+    except Exception as e:  # ValueError do parser de parágrafos do ReportLab
+        print(f"\ntexto com <, > e &: erro na geração ({type(e).__name__})")
+
+
+if __name__ == "__main__":
+    main()
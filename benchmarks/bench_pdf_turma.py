@@ -0,0 +1,71 @@
+"""
+Memória e tempo do PDF da turma (sata.pdf.gerar_pdf_turma) conforme a quantidade de grupos.
+
+Para cada N, gera o PDF único com N relatórios de duas formas:
+    - em partes:  gerar_pdf_turma (cada relatório é paginado e descartado antes do próximo);
+    - história única: todos os relatórios em uma só lista de flowables e um
+      único doc.build, como se faria juntando as histórias de gerar_pdf_relatorio.
+e informa o tempo, o tamanho do arquivo e o pico de memória alocada
+(tracemalloc, em uma segunda passada para não distorcer o tempo). Em partes,
+o pico acompanha só o tamanho do PDF (serializado inteiro no save() do
+ReportLab); na história única, soma-se a ele a história inteira.
+
+Uso:
+    python benchmarks/bench_pdf_turma.py
+    python benchmarks/bench_pdf_turma.py --tamanhos 10 100 400
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from reportlab.platypus import PageBreak, SimpleDocTemplate
+
+from sata import dados_pdf_de_progresso
+from sata.pdf import NumberedCanvas, gerar_pdf_turma, historia_relatorio, modelo_relatorio
+from sintetico import gerar_avaliacoes
+
+
+def _em_partes(avaliacoes, destino):
+    gerar_pdf_turma(lambda: (dados_pdf_de_progresso(av) for av in avaliacoes), destino)
+
+
+def _historia_unica(avaliacoes, destino):
+    historia = []
+    for av in avaliacoes:
+        historia.extend(historia_relatorio(dados_pdf_de_progresso(av)))
+        historia.append(PageBreak())
+    SimpleDocTemplate(destino, **modelo_relatorio().margens).build(historia, canvasmaker=NumberedCanvas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10, 50, 200])
+    args = parser.parse_args(argv)
+
+    todas = list(gerar_avaliacoes(max(args.tamanhos)))
+    modelo_relatorio()  # montado antes das medições
+    print(f"{'modo':<15} {'grupos':>6} {'tempo (s)':>10} {'ms/grupo':>9} {'arquivo (KiB)':>14} {'pico (KiB)':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = str(Path(pasta) / 'turma.pdf')
+        for nome, gerar in (('em partes', _em_partes), ('história única', _historia_unica)):
+            for n in args.tamanhos:
+                avaliacoes = todas[:n]
+                inicio = time.perf_counter()
+                gerar(avaliacoes, destino)
+                duracao = time.perf_counter() - inicio
+                tracemalloc.start()
+                gerar(avaliacoes, destino)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{nome:<15} {n:>6} {duracao:>10.2f} {duracao / n * 1000:>9.1f} "
+                      f"{Path(destino).stat().st_size / 1024:>14.0f} {pico / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
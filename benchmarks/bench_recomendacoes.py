@@ -0,0 +1,81 @@
+"""
+Motor de recomendações (sata.recomendacoes): uma avaliação por rerun e um semestre inteiro em lote.
+
+Mede, sobre --avaliacoes avaliações sintéticas:
+    - por rerun: MotorRecomendacoes.recomendar_avaliacao sobre o modelo
+      compacto da sessão (o que o app paga quando a avaliação muda);
+    - em lote: recomendar_em_lotes (matrizes numpy, um lote por vez),
+      comparado às mesmas regras avaliadas em Python, uma avaliação e uma
+      regra por vez; os dois resultados são conferidos.
+
+Uso:
+    python benchmarks/bench_recomendacoes.py
+    python benchmarks/bench_recomendacoes.py --avaliacoes 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata.avaliacao import avaliacoes_de_dict
+from sata.recomendacoes import motor_recomendacoes, recomendar_em_lotes
+from sata.rubrica import rubrica_de
+from sintetico import gerar_avaliacoes
+
+
+def _regra_a_regra(estado):
+    """As regras da rubrica avaliadas em Python puro, para comparar (mesma pontuação e desempate)"""
+    rubrica = rubrica_de(estado)
+    motor = motor_recomendacoes(rubrica)
+    pontos = dict.fromkeys(motor.recomendacoes, 0.0)
+    for dimensao, limiar, sugestoes, peso, recomendacoes in rubrica.regras:
+        nota = float(estado['notas_tabela'].get(dimensao) or 0)
+        marcadas = len(set(sugestoes) & set(estado['avaliacoes'].get(dimensao, {}).get('observacoes', [])))
+        if (limiar is not None and nota >= limiar) or (sugestoes and not marcadas):
+            continue
+        valor = peso * (1 + ((limiar - nota) / limiar if limiar is not None else 0)) * (marcadas if sugestoes else 1)
+        for rec in recomendacoes:
+            pontos[rec] += valor
+    ordem = sorted(pontos, key=lambda rec: -pontos[rec])[:rubrica.max_recomendacoes]
+    return [rec for rec in ordem if pontos[rec] > 0] or [rubrica.recomendacao_padrao]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--avaliacoes', type=int, default=50000)
+    parser.add_argument('--repeticoes', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    estados = gerar_avaliacoes(args.avaliacoes, max_caracteres=0)
+
+    motor = motor_recomendacoes(rubrica_de(estados[0]))
+    sessoes = [avaliacoes_de_dict(estado['avaliacoes'], motor.rubrica) for estado in estados[:args.repeticoes]]
+    tempos = []
+    for avaliacoes in sessoes:
+        inicio = time.perf_counter()
+        motor.recomendar_avaliacao(avaliacoes)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    print(f"por rerun (uma avaliação, modelo compacto): {statistics.median(tempos):.0f} µs (p50), "
+          f"{sorted(tempos)[int(len(tempos) * 0.99)]:.0f} µs (p99)")
+
+    inicio = time.perf_counter()
+    em_lote = [recs for _, recs in recomendar_em_lotes(estados)]
+    lote = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    referencia = [_regra_a_regra(estado) for estado in estados]
+    python = time.perf_counter() - inicio
+    if em_lote != referencia:
+        raise RuntimeError("recomendar_em_lotes difere da avaliação regra a regra")
+
+    print(f"\n{args.avaliacoes} avaliações {'s':>10} {'avaliações/s':>14}")
+    print(f"{'em lote (numpy)':<24} {lote:>10.2f} {args.avaliacoes / lote:>14.0f}")
+    print(f"{'regra a regra (Python)':<24} {python:>10.2f} {args.avaliacoes / python:>14.0f}")
+    print(f"ganho: {python / lote:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Latência dos reruns do app ao marcar uma sugestão, medida com o AppTest do Streamlit.
+
+Mede o tempo de rerun ao alternar um checkbox da aba Apresentação:
+    - app inteiro: o que acontece quando o widget não está em um fragmento
+      (e o que o AppTest faz por padrão);
+    - fragmento: rerun restrito ao fragmento da dimensão, como o navegador
+      pede ao interagir com um widget dentro de @st.fragment.
+
+O AppTest não expõe reruns de fragmento; aqui o RerunData do
+LocalScriptRunner é trocado temporariamente para incluir o fragmento,
+exatamente como a sessão real faz. Também não devolve a aba aberta ao
+app como o navegador: ela é informada pela chave "aba" a cada rerun.
+
+Uso:
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --cliques 100
+"""
+import argparse
+import contextlib
+import functools
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'bench_reruns.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'bench_reruns.jsonl'))
+
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+ABA = "📄 Apresentação"
+
+
+@contextlib.contextmanager
+def rerun_do_fragmento(fragment_id):
+    """Faz os reruns do AppTest dentro do bloco serem restritos ao fragmento informado"""
+    original = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(
+        RerunData, fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True
+    )
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = original
+
+
+def medir_cliques(at, cliques, fragment_id=None):
+    """Alterna o primeiro checkbox da aba Apresentação e retorna as latências em ms"""
+    latencias = []
+    for i in range(cliques):
+        checkbox = at.checkbox[0]
+        checkbox.check() if i % 2 == 0 else checkbox.uncheck()
+        contexto = rerun_do_fragmento(fragment_id) if fragment_id else contextlib.nullcontext()
+        at.session_state['aba'] = ABA
+        with contexto:
+            inicio = time.perf_counter()
+            at.run()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if at.checkbox[0].value != (i % 2 == 0):
+            raise RuntimeError("o clique no checkbox se perdeu no rerun")
+    return latencias
+
+
+def _fragmento_da_primeira_dimensao(at):
+    """Id do primeiro fragmento registrado (a aba Apresentação), se o app usar fragmentos"""
+    fragmentos = list(getattr(at._fragment_storage, '_fragments', {}))
+    return fragmentos[0] if fragmentos else None
+
+
+def resumo(latencias):
+    latencias = sorted(latencias)
+    return (f"p50 {statistics.median(latencias):7.1f} ms   "
+            f"p95 {latencias[int(len(latencias) * 0.95) - 1]:7.1f} ms   "
+            f"média {statistics.fmean(latencias):7.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cliques', type=int, default=40)
+    args = parser.parse_args(argv)
+
+    at = AppTest.from_file(str(RAIZ / 'pim_avaliador.py'), default_timeout=60)
+    at.session_state['aba'] = ABA
+    at.run()
+    medir_cliques(at, 4)  # aquecimento
+
+    print(f"app inteiro: {resumo(medir_cliques(at, args.cliques))}")
+
+    fragment_id = _fragmento_da_primeira_dimensao(at)
+    if fragment_id is None:
+        print("fragmento:   (o app não usa fragmentos)")
+    else:
+        print(f"fragmento:   {resumo(medir_cliques(at, args.cliques, fragment_id))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Rubrica externa (sata.rubrica): custo de obter a rubrica a cada rerun e da recarga.
+
+Copia rubricas/ para uma pasta temporária, com uma variante de exemplo, e mede:
+    - obter_rubrica já compilada (o que cada rerun paga), padrão e variante;
+    - compilação: leitura e validação dos arquivos e montagem da Rubrica,
+      o que seria pago a cada rerun sem o cache;
+    - recarga: depois de editar a variante, o tempo até obter_rubrica devolver
+      a versão nova (limitado por INTERVALO_VERIFICACAO).
+
+Uso:
+    python benchmarks/bench_rubrica.py
+    python benchmarks/bench_rubrica.py --chamadas 200000
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+PASTA = Path(tempfile.mkdtemp())
+shutil.copy(RAIZ / 'rubricas' / 'padrao.json', PASTA)
+shutil.copy(RAIZ / 'rubricas' / 'exemplos' / 'logistica_pim_iv.json', PASTA)
+os.environ['SATA_RUBRICAS'] = str(PASTA)
+
+from sata import rubrica
+
+
+def _por_chamada(funcao, chamadas):
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        funcao()
+    return (time.perf_counter() - inicio) / chamadas * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chamadas', type=int, default=100000)
+    parser.add_argument('--recargas', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'obter_rubrica':<40} {'µs/chamada':>11}")
+    for nome, funcao in [
+        ("padrão, já compilada", lambda: rubrica.obter_rubrica()),
+        ("Logística, PIM IV, já compilada", lambda: rubrica.obter_rubrica('Logística', 'IV')),
+        ("rubrica_de(estado)", lambda: rubrica.rubrica_de({'curso': 'Logística', 'pim': 'IV'})),
+    ]:
+        print(f"{nome:<40} {_por_chamada(funcao, args.chamadas):>11.2f}")
+
+    def compilar():
+        arquivos = rubrica._Rubricas(PASTA)
+        return arquivos.obter('Logística', 'IV')
+    print(f"{'compilação (ler, validar e montar)':<40} {_por_chamada(compilar, 200):>11.0f}")
+
+    variante = PASTA / 'logistica_pim_iv.json'
+    dados = json.loads(variante.read_text(encoding='utf-8'))
+    tempos = []
+    for i in range(args.recargas):
+        anterior = rubrica.obter_rubrica('Logística', 'IV')
+        dados['max_recomendacoes'] = i + 1
+        variante.write_text(json.dumps(dados, ensure_ascii=False), encoding='utf-8')
+        inicio = time.perf_counter()
+        while rubrica.obter_rubrica('Logística', 'IV').versao == anterior.versao:
+            time.sleep(0.01)
+        tempos.append(time.perf_counter() - inicio)
+    print(f"\nrecarga após editar a variante: {statistics.median(tempos):.2f}s (mediana, "
+          f"verificação a cada {rubrica.INTERVALO_VERIFICACAO:g}s), erro: {rubrica.erro_rubrica()}")
+    shutil.rmtree(PASTA)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Memória de uma sessão do app depois de várias correções seguidas.
+
+Abre o pim_avaliador.py no AppTest e faz --correcoes correções: em cada uma,
+abre a aba de cada dimensão, marca duas sugestões e dá a nota, dá a nota oral
+e clica em "🔄 Nova Correção". O AppTest não devolve ao app a aba aberta,
+como o navegador: ela é informada pela chave "aba" a cada rerun. A cada --passo correções, informa:
+    - chaves: quantidade de chaves no estado da sessão (valores dos widgets e
+      do app, no SessionState do Streamlit);
+    - widgets: quantas dessas chaves são de widgets das abas (sug_, nota_, ...);
+    - estado (KiB): tamanho profundo do SessionState, sem contar os textos do
+      banco de sugestões e os objetos do Streamlit compartilhados entre sessões;
+    - avaliações (B): tamanho profundo só de st.session_state.avaliacoes.
+
+Uso:
+    python benchmarks/bench_sessao.py
+    python benchmarks/bench_sessao.py --correcoes 100 --passo 25
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'sessao.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'sessao.jsonl'))
+os.environ.setdefault('SATA_CACHE_PDF', '')
+
+from streamlit.testing.v1 import AppTest
+
+from sata.rubrica import CATALOGO_SUGESTOES, DIMENSOES, SUGESTOES_BANCO
+
+APP = str(RAIZ / 'pim_avaliador.py')
+ABAS_DIMENSOES = dict(zip(DIMENSOES, [
+    "📄 Apresentação", "📖 Introdução", "📚 Desenvolvimento", "💬 Discussão", "✅ Conclusão", "📚 Referências"
+]))
+PREFIXOS_WIDGETS = ('sug_', 'nota_', 'comentario_', 'campo_')
+_NAO_PERCORRER = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, type)
+
+
+def tamanho_profundo(obj, compartilhados, vistos=None):
+    """Bytes de obj e do que ele referencia, sem repetir objetos nem contar os compartilhados"""
+    vistos = set() if vistos is None else vistos
+    pilha, total = [obj], 0
+    while pilha:
+        atual = pilha.pop()
+        if id(atual) in vistos or id(atual) in compartilhados or isinstance(atual, _NAO_PERCORRER):
+            continue
+        vistos.add(id(atual))
+        total += sys.getsizeof(atual)
+        if isinstance(atual, dict):
+            pilha.extend(atual.keys())
+            pilha.extend(atual.values())
+        elif isinstance(atual, (list, tuple, set, frozenset)):
+            pilha.extend(atual)
+        else:
+            if hasattr(atual, '__dict__'):
+                pilha.append(vars(atual))
+            for nome in getattr(type(atual), '__slots__', ()):
+                if hasattr(atual, nome):
+                    pilha.append(getattr(atual, nome))
+    return total
+
+
+def _compartilhados():
+    """Objetos que existem uma vez por processo: textos do banco de sugestões, nomes das dimensões"""
+    ids = {id(texto) for item in CATALOGO_SUGESTOES for texto in item if texto is not None}
+    for dimensao, sugestoes in SUGESTOES_BANCO.items():
+        ids.add(id(dimensao))
+        grupos = sugestoes.values() if isinstance(sugestoes, dict) else [sugestoes]
+        ids.update(id(texto) for itens in grupos for texto in itens)
+    return ids
+
+
+def medir(at, compartilhados):
+    estado = at.session_state._state._state  # SessionState do Streamlit
+    chaves = set(estado.filtered_state)
+    widgets = sum(1 for chave in chaves if chave.startswith(PREFIXOS_WIDGETS))
+    total = tamanho_profundo(estado, compartilhados)
+    avaliacoes = tamanho_profundo(at.session_state['avaliacoes'], compartilhados)
+    return len(chaves), widgets, total, avaliacoes
+
+
+def _rodar(at, aba, elemento=None):
+    at.session_state['aba'] = aba
+    (elemento or at).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def corrigir(at, aleatorio):
+    for dimensao, nota_maxima in DIMENSOES.items():
+        _rodar(at, ABAS_DIMENSOES[dimensao])
+        sugestoes = SUGESTOES_BANCO[dimensao]
+        prefixo = f"sug_{dimensao}"
+        if isinstance(sugestoes, dict):  # Discussão: grupo Problema, o padrão do rádio
+            sugestoes, prefixo = next(iter(sugestoes.values())), f"sug_{dimensao}_problema"
+        for i in aleatorio.sample(range(len(sugestoes)), 2):
+            at.checkbox(key=f"{prefixo}_{i}").check()
+        at.number_input(key=f"nota_{dimensao}").set_value(round(aleatorio.uniform(0, nota_maxima), 1))
+        _rodar(at, ABAS_DIMENSOES[dimensao])
+    _rodar(at, "🎤 Parte Oral")
+    at.number_input(key="campo_parte_oral").set_value(2.0)
+    _rodar(at, "🎤 Parte Oral")
+    _rodar(at, "🎤 Parte Oral", next(b for b in at.button if "Nova Correção" in b.label).click())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--correcoes', type=int, default=50)
+    parser.add_argument('--passo', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    compartilhados = _compartilhados()
+    aleatorio = random.Random(0)
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    print(f"{'correções':>9} {'chaves':>7} {'widgets':>8} {'estado (KiB)':>13} {'avaliações (B)':>15}")
+    for feitas in range(args.correcoes + 1):
+        if feitas % args.passo == 0:
+            chaves, widgets, total, avaliacoes = medir(at, compartilhados)
+            print(f"{feitas:>9} {chaves:>7} {widgets:>8} {total / 1024:>13.1f} {avaliacoes:>15}")
+        if feitas < args.correcoes:
+            corrigir(at, aleatorio)
+
+
+if __name__ == "__main__":
+    main()
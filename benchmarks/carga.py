@@ -0,0 +1,324 @@
+"""
+Teste de carga do app com várias sessões simultâneas, usando o AppTest do Streamlit.
+
+Cada sessão é um AppTest do pim_avaliador.py rodando em uma thread própria,
+no mesmo processo (como as sessões de um servidor, que compartilham o
+st.cache_resource: banco, fila e cache de PDFs). Cada uma percorre o fluxo de
+correção de --grupos grupos:
+    - preenche a barra lateral (professor, curso, PIM, empresa, líder);
+    - abre a aba de cada dimensão, marca sugestões e dá a nota;
+    - abre a Parte Oral e dá a nota oral e a justificativa;
+    - abre o Relatório, clica em "💾 Gerar PDF" e acompanha o pedido até o PDF ficar pronto;
+    - clica em "🔄 Nova Correção".
+com uma pausa aleatória entre as ações (--pausa, o tempo de leitura do professor).
+
+Para cada quantidade de sessões, informa a latência dos reruns (p50/p95/p99,
+no total e por ação), o tempo do clique ao PDF pronto, o uso de CPU do
+servidor e do pool de PDFs, e o crescimento da memória (RSS) por sessão.
+Tudo roda offline: banco temporário, cache de PDFs só em memória.
+
+Observações: o AppTest reexecuta o script inteiro a cada interação, mesmo nos
+widgets dentro de fragmentos, então as latências aqui são o pior caso de um
+rerun. O AppTest também não devolve ao app a aba aberta, como o navegador
+faz: ela é informada pela chave "aba" a cada rerun. E cada run() do AppTest instala e depois remove um Runtime falso global,
+o que quebra os runs simultâneos das outras sessões; durante o teste todas
+usam o mesmo Runtime falso (runtime_compartilhado), como as sessões de um
+servidor usam o mesmo Runtime. Também a compilação do script, que cada AppTest
+faz no seu próprio cache, passa por um lock: o ast.parse simultâneo em várias
+threads falha no Python 3.11 ("AST constructor recursion depth mismatch"), e
+um servidor compila o script uma vez só.
+
+runtime_compartilhado depende de partes internas do Streamlit (Runtime e
+ScriptCache, e do que AppTest.run monta). Só com a API pública, um AppTest
+por thread, as sessões falham já com 4 simultâneas (widgets que somem no meio
+do rerun e o erro do ast.parse acima). Por isso o teste só roda na versão do
+Streamlit em que foi conferido (STREAMLIT_CONFERIDO); em outra, ele para com
+uma mensagem em vez de medir algo diferente sem avisar.
+
+Uso:
+    python benchmarks/carga.py
+    python benchmarks/carga.py --sessoes 1 4 8 16 --grupos 2 --pausa 0.5
+    python benchmarks/carga.py --sessoes 8 --saida carga.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from unittest.mock import MagicMock
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'carga.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'carga.jsonl'))
+os.environ.setdefault('SATA_CACHE_PDF', '')  # só em memória: nada fica em ~/.sata
+
+import streamlit
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import script_cache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test
+
+from sata.rubrica import DIMENSOES, SUGESTOES_BANCO
+
+APP = str(RAIZ / 'pim_avaliador.py')
+# Versão (maior.menor) do Streamlit em que runtime_compartilhado foi conferido.
+# Ao atualizar o Streamlit, confira-o com o AppTest.run da versão nova e atualize aqui.
+STREAMLIT_CONFERIDO = '1.65'
+ABAS_DIMENSOES = dict(zip(DIMENSOES, [
+    "📄 Apresentação", "📖 Introdução", "📚 Desenvolvimento", "💬 Discussão", "✅ Conclusão", "📚 Referências"
+]))
+PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def rss_mib():
+    """Memória residente atual do processo (Linux); fora dele, o pico (ru_maxrss)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * PAGINA / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cpu_pool_s():
+    """Tempo de CPU (s) dos processos filhos vivos, como o pool de PDFs (Linux)"""
+    total = 0.0
+    for filho in multiprocessing.active_children():
+        try:
+            with open(f'/proc/{filho.pid}/stat') as stat:
+                campos = stat.read().rsplit(')', 1)[1].split()
+            total += (int(campos[11]) + int(campos[12])) / os.sysconf('SC_CLK_TCK')
+        except (OSError, IndexError, ValueError):
+            pass
+    return total
+
+
+def conferir_streamlit():
+    """Erro (texto) se o Streamlit não é o conferido ou mudou o que runtime_compartilhado substitui; senão None"""
+    versao = '.'.join(streamlit.__version__.split('.')[:2])
+    if versao != STREAMLIT_CONFERIDO:
+        return (f"teste de carga conferido com o Streamlit {STREAMLIT_CONFERIDO}, instalado {streamlit.__version__}: "
+                "confira runtime_compartilhado com o AppTest desta versão e atualize STREAMLIT_CONFERIDO")
+    internas = [
+        (Runtime, 'instance'), (Runtime, 'exists'), (script_cache.ScriptCache, 'get_bytecode'),
+        (app_test, 'MediaFileManager'), (app_test, 'MemoryMediaFileStorage'), (app_test, 'DataframeSourceManager'),
+        (app_test, 'MemoryCacheStorageManager'), (app_test, 'BidiComponentManager'), (app_test, 'patch_config_options'),
+    ]
+    faltando = [f"{getattr(dono, '__name__', dono)}.{nome}" for dono, nome in internas if not hasattr(dono, nome)]
+    if faltando:
+        return f"partes internas do Streamlit usadas por runtime_compartilhado não existem mais: {', '.join(faltando)}"
+    return None
+
+
+@contextlib.contextmanager
+def runtime_compartilhado():
+    """Um único Runtime falso (montado como o do AppTest) para todas as sessões do teste"""
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+
+    instance, exists = Runtime.__dict__['instance'], Runtime.__dict__['exists']
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+    get_bytecode, compilando = script_cache.ScriptCache.get_bytecode, threading.Lock()
+
+    def get_bytecode_serial(self, caminho):
+        with compilando:
+            return get_bytecode(self, caminho)
+
+    script_cache.ScriptCache.get_bytecode = get_bytecode_serial
+    try:
+        # Ligado o tempo todo: os patch_config_options de cada run() não o desligam no meio de outro
+        with app_test.patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        Runtime.instance, Runtime.exists = instance, exists
+        script_cache.ScriptCache.get_bytecode = get_bytecode
+
+
+class Sessao:
+    """Um professor corrigindo grupos: um AppTest e as latências dos seus reruns, por ação"""
+    def __init__(self, nome, pausa, semente):
+        self.nome = nome
+        self.pausa = pausa
+        self.aleatorio = random.Random(semente)
+        self.latencias = defaultdict(list)
+        self.pdf_pronto = []
+        self.erros = []
+        self.at = None
+        self.aba = "🏠 Início"
+
+    def _rerun(self, acao, elemento=None):
+        if self.pausa:
+            time.sleep(self.pausa * self.aleatorio.uniform(0.5, 1.5))
+        self.at.session_state['aba'] = self.aba
+        inicio = time.perf_counter()
+        (elemento or self.at).run()
+        self.latencias[acao].append((time.perf_counter() - inicio) * 1000)
+        if self.at.exception:
+            raise RuntimeError(f"{acao}: {self.at.exception[0].message}")
+
+    def _abrir_aba(self, aba):
+        self.aba = aba
+        self._rerun("trocar de aba")
+
+    def corrigir(self, grupo):
+        at = self.at
+        self._rerun("barra lateral", at.text_input(key="professor").input(f"Professor {self.nome}"))
+        self._rerun("barra lateral", at.selectbox(key="curso").select_index(self.aleatorio.randint(1, 4)))
+        self._rerun("barra lateral", at.selectbox(key="pim").select_index(self.aleatorio.randint(1, 4)))
+        self._rerun("barra lateral", at.text_input(key="empresa").input(f"Carga {self.nome}-{grupo}"))
+        self._rerun("barra lateral", at.text_input(key="lider").input(f"Líder {grupo}"))
+
+        for dimensao, nota_maxima in DIMENSOES.items():
+            self._abrir_aba(ABAS_DIMENSOES[dimensao])
+            sugestoes = SUGESTOES_BANCO[dimensao]
+            if isinstance(sugestoes, dict):  # Discussão: grupo Problema, o padrão do rádio
+                sugestoes = next(iter(sugestoes.values()))
+                prefixo = f"sug_{dimensao}_problema"
+            else:
+                prefixo = f"sug_{dimensao}"
+            for i in self.aleatorio.sample(range(len(sugestoes)), min(2, len(sugestoes))):
+                self._rerun("sugestão", at.checkbox(key=f"{prefixo}_{i}").check())
+            nota = round(self.aleatorio.uniform(0, nota_maxima), 1)
+            self._rerun("nota", at.number_input(key=f"nota_{dimensao}").set_value(nota))
+
+        self._abrir_aba("🎤 Parte Oral")
+        self._rerun("parte oral", at.number_input(key="campo_parte_oral").set_value(2.0))
+        self._rerun("parte oral", at.selectbox(key="campo_justificativa_oral").select_index(2))
+
+        self._abrir_aba("📋 Relatório")
+        botao = next(b for b in at.button if "Gerar PDF" in b.label)
+        inicio = time.perf_counter()
+        self._rerun("gerar pdf", botao.click())
+        while at.session_state['pedido_pdf'] is not None:
+            time.sleep(0.5)
+            self._rerun("acompanhar pdf")
+            if time.perf_counter() - inicio > 300:
+                raise RuntimeError("PDF não ficou pronto em 5 min")
+        if at.session_state['pdf_gerado'] is None:
+            raise RuntimeError(f"PDF com erro: {at.session_state['erro_pdf']}")
+        self.pdf_pronto.append((time.perf_counter() - inicio) * 1000)
+
+        botao = next(b for b in at.button if "Nova Correção" in b.label)
+        self._rerun("nova correção", botao.click())
+
+    def rodar(self, grupos, abertas):
+        try:
+            inicio = time.perf_counter()
+            self.at = AppTest.from_file(APP, default_timeout=120).run()
+            self.latencias["abrir"].append((time.perf_counter() - inicio) * 1000)
+            abertas.wait()  # todas as sessões abertas antes do fluxo: a carga começa junta
+            for grupo in range(grupos):
+                self.corrigir(grupo)
+        except Exception as e:
+            abertas.abort()  # se falhou ao abrir, as outras sessões não ficam esperando por esta
+            self.erros.append(f"{type(e).__name__}: {e}")
+
+
+def rodar_carga(n, grupos, pausa, rodada):
+    """Roda n sessões simultâneas; retorna o dicionário de resultados"""
+    gc.collect()
+    rss_inicial = rss_mib()
+    cpu_inicial, pool_inicial = time.process_time(), cpu_pool_s()
+    sessoes = [Sessao(f"{rodada}.{i}", pausa, semente=i) for i in range(n)]
+    abertas = threading.Barrier(n)
+    threads = [threading.Thread(target=s.rodar, args=(grupos, abertas)) for s in sessoes]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicial
+    gc.collect()
+    rss_final = rss_mib()  # com as sessões ainda vivas (os AppTest guardam o estado)
+
+    por_acao = defaultdict(list)
+    for s in sessoes:
+        for acao, valores in s.latencias.items():
+            por_acao[acao].extend(valores)
+    reruns = [v for acao, valores in por_acao.items() if acao != "abrir" for v in valores]
+    pdf = [v for s in sessoes for v in s.pdf_pronto]
+    resultado = {
+        'sessoes': n,
+        'reruns': len(reruns),
+        'duracao_s': round(duracao, 2),
+        'rerun_ms': {p: round(_percentil(reruns, p), 1) for p in (50, 95, 99)} if reruns else {},
+        'por_acao_ms': {
+            acao: {'n': len(v), 'p50': round(statistics.median(v), 1), 'p95': round(_percentil(v, 95), 1)}
+            for acao, v in por_acao.items()
+        },
+        'pdf_pronto_ms': {'p50': round(statistics.median(pdf), 1), 'max': round(max(pdf), 1)} if pdf else {},
+        'cpu_servidor_pct': round(cpu / duracao * 100, 1),
+        'cpu_pool_s': round(cpu_pool_s() - pool_inicial, 2),
+        'rss_mib': round(rss_final, 1),
+        'mib_por_sessao': round((rss_final - rss_inicial) / n, 2),
+        'erros': [erro for s in sessoes for erro in s.erros],
+    }
+    del sessoes, threads
+    return resultado
+
+
+def _rodar(args):
+    print("... aquecimento (1 sessão)", file=sys.stderr)
+    rodar_carga(1, 1, 0, 'aquecimento')
+
+    resultados = []
+    print(f"{'sessões':>7} {'reruns':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'PDF p50 (s)':>12} "
+          f"{'CPU serv.':>10} {'CPU pool (s)':>13} {'RSS (MiB)':>10} {'MiB/sessão':>11}")
+    for rodada, n in enumerate(args.sessoes):
+        r = rodar_carga(n, args.grupos, args.pausa, rodada)
+        resultados.append(r)
+        print(f"{n:>7} {r['reruns']:>7} {r['rerun_ms'].get(50, 0):>9.1f} {r['rerun_ms'].get(95, 0):>9.1f} "
+              f"{r['rerun_ms'].get(99, 0):>9.1f} {r['pdf_pronto_ms'].get('p50', 0) / 1000:>12.2f} "
+              f"{r['cpu_servidor_pct']:>9.0f}% {r['cpu_pool_s']:>13.2f} {r['rss_mib']:>10.0f} {r['mib_por_sessao']:>11.2f}")
+        for erro in r['erros']:
+            print(f"    ❌ {erro}", file=sys.stderr)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--grupos', type=int, default=1, help="Grupos corrigidos por sessão")
+    parser.add_argument('--pausa', type=float, default=0.2, help="Pausa média entre as ações, em segundos")
+    parser.add_argument('--saida', help="Grava os resultados em JSON")
+    args = parser.parse_args(argv)
+    erro = conferir_streamlit()
+    if erro:
+        parser.error(erro)
+
+    with runtime_compartilhado():
+        resultados = _rodar(args)
+
+    ultimo = resultados[-1]
+    print(f"\nPor ação, com {ultimo['sessoes']} sessões (ms):")
+    for acao, v in sorted(ultimo['por_acao_ms'].items(), key=lambda item: -item[1]['p50']):
+        print(f"    {acao:<15} n={v['n']:<5} p50 {v['p50']:>8.1f}   p95 {v['p95']:>8.1f}")
+
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\nResultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
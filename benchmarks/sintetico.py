@@ -0,0 +1,94 @@
+"""
+Gerador de avaliações sintéticas para os benchmarks.
+
+Cada avaliação tem o mesmo formato retornado por sata.ler_progresso:
+observações sorteadas do SUGESTOES_BANCO (com os prefixos [Problema]/[Solução]
+na Discussão), notas dentro dos máximos de DIMENSOES e comentários do
+professor de tamanhos variados.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sata import SUGESTOES_BANCO, DIMENSOES, RECOMENDACOES_GERAIS
+
+CURSOS = ["Gestão Financeira", "Gestão RH", "Logística", "Marketing"]
+PIMS = ["I", "II", "III", "IV"]
+JUSTIFICATIVAS_ORAIS = [
+    "Grupo não realizou apresentação",
+    "Grupo aguardando para realizar apresentação",
+    "Apresentação realizada"
+]
+
+_PALAVRAS = (
+    "o grupo apresentou bem a empresa porém faltou aprofundar análise dos dados "
+    "revisar normas ABNT citação referência tabela figura conclusão objetivo "
+    "metodologia problema solução indicadores cronograma viabilidade disciplinas "
+    "teoria prática contexto organização relatório seção texto clareza coesão"
+).split()
+
+_GRUPOS_DISCUSSAO = {
+    "Problema (PIM I ou II)": ("Problema (para PIM I ou PIM II)", "[Problema] "),
+    "Solução (PIM III ou IV)": ("Solução (para PIM III ou PIM IV)", "[Solução] "),
+}
+
+
+def gerar_comentario(rng, max_caracteres=600):
+    """Comentário com 0 a max_caracteres caracteres, em uma ou mais linhas"""
+    tamanho = int(rng.paretovariate(1.2) * 40) - 40
+    if tamanho <= 0:
+        return ''
+    tamanho = min(tamanho, max_caracteres)
+
+    linhas, linha, total = [], [], 0
+    while total < tamanho:
+        palavra = rng.choice(_PALAVRAS)
+        linha.append(palavra)
+        total += len(palavra) + 1
+        if rng.random() < 0.08:
+            linhas.append(' '.join(linha).capitalize() + '.')
+            linha = []
+    if linha:
+        linhas.append(' '.join(linha).capitalize() + '.')
+    return '\n'.join(linhas)
+
+
+def gerar_avaliacao(rng, max_caracteres=600):
+    """Gera uma avaliação aleatória no formato de sata.ler_progresso"""
+    tipo_discussao = rng.choice(list(_GRUPOS_DISCUSSAO))
+
+    avaliacoes = {}
+    for dimensao, nota_maxima in DIMENSOES.items():
+        sugestoes = SUGESTOES_BANCO[dimensao]
+        prefixo = ''
+        if isinstance(sugestoes, dict):
+            grupo, prefixo = _GRUPOS_DISCUSSAO[tipo_discussao]
+            sugestoes = sugestoes[grupo]
+
+        quantidade = rng.randint(0, min(4, len(sugestoes)))
+        avaliacoes[dimensao] = {
+            'nota': round(rng.uniform(0, nota_maxima), 1),
+            'comentario': gerar_comentario(rng, max_caracteres),
+            'observacoes': [prefixo + s for s in rng.sample(sugestoes, quantidade)]
+        }
+
+    return {
+        'curso': rng.choice(CURSOS),
+        'lider': f"Líder {rng.randint(1, 9999)}",
+        'pim': rng.choice(PIMS),
+        'empresa': f"Empresa {rng.randint(1, 999)}",
+        'professor': f"Professor {rng.randint(1, 50)}",
+        'data_avaliacao': datetime(2026, 6, 1) + timedelta(days=rng.randint(0, 180)),
+        'avaliacoes': avaliacoes,
+        'notas_tabela': {dim: av['nota'] for dim, av in avaliacoes.items()},
+        'recomendacoes_selecionadas': rng.sample(RECOMENDACOES_GERAIS, rng.randint(0, 3)),
+        'comentarios_adicionais': gerar_comentario(rng, max_caracteres),
+        'parte_oral': round(rng.uniform(0, 3.0), 1),
+        'justificativa_oral': rng.choice(JUSTIFICATIVAS_ORAIS),
+        'tipo_discussao': tipo_discussao
+    }
+
+
+def gerar_avaliacoes(quantidade, seed=42, max_caracteres=600):
+    """Lista reprodutível de avaliações sintéticas"""
+    rng = random.Random(seed)
+    return [gerar_avaliacao(rng, max_caracteres) for _ in range(quantidade)]
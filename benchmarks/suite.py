@@ -0,0 +1,177 @@
+"""
+Suíte de benchmarks do núcleo do SATA.
+
+Mede, para 1, 100 e 10.000 avaliações sintéticas (benchmarks/sintetico.py):
+    - notas:   calcular_notas
+    - parecer: gerar_parecer_resumido
+    - json:    ida e volta do backup (serializar_progresso + ler_progresso)
+    - pdf:     gerar_pdf_relatorio
+
+Para cada operação e tamanho informa latência por chamada (p50/p90/p99/máx),
+vazão (chamadas/s) e pico de memória (tracemalloc, em uma segunda passada
+para não distorcer as latências). Os resultados são gravados em JSON; use
+--comparar para ver a variação em relação a uma execução anterior.
+
+O PDF com 10.000 avaliações leva alguns minutos; use --tamanhos 1 100 ou
+--operacoes para rodadas mais curtas.
+
+Uso:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --tamanhos 1 100 --saida antes.json
+    python benchmarks/suite.py --tamanhos 1 100 --saida depois.json --comparar antes.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from sata import (
+    calcular_notas, gerar_parecer_resumido, serializar_progresso, ler_progresso, dados_pdf_de_progresso
+)
+from sintetico import gerar_avaliacoes
+
+
+def _notas(avaliacao):
+    calcular_notas(avaliacao['notas_tabela'])
+
+
+def _parecer(avaliacao):
+    gerar_parecer_resumido(avaliacao)
+
+
+def _json(avaliacao):
+    ler_progresso(serializar_progresso(avaliacao))
+
+
+def _pdf(avaliacao):
+    from sata.pdf import gerar_pdf_relatorio
+    gerar_pdf_relatorio(dados_pdf_de_progresso(avaliacao), BytesIO())
+
+
+OPERACOES = {
+    'notas': _notas,
+    'parecer': _parecer,
+    'json': _json,
+    'pdf': _pdf,
+}
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por interpolação linear (valores já ordenados)"""
+    if len(valores_ordenados) == 1:
+        return valores_ordenados[0]
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] * (1 - fracao) + valores_ordenados[superior] * fracao
+
+
+def medir(funcao, avaliacoes):
+    """Executa a operação sobre todas as avaliações e retorna as estatísticas"""
+    latencias = []
+    inicio_total = time.perf_counter()
+    for avaliacao in avaliacoes:
+        inicio = time.perf_counter_ns()
+        funcao(avaliacao)
+        latencias.append(time.perf_counter_ns() - inicio)
+    total = time.perf_counter() - inicio_total
+
+    tracemalloc.start()
+    for avaliacao in avaliacoes:
+        funcao(avaliacao)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias.sort()
+    us = [v / 1000 for v in latencias]
+    return {
+        'chamadas': len(avaliacoes),
+        'total_s': total,
+        'vazao_por_s': len(avaliacoes) / total if total else None,
+        'p50_us': percentil(us, 50),
+        'p90_us': percentil(us, 90),
+        'p99_us': percentil(us, 99),
+        'max_us': us[-1],
+        'pico_memoria_kib': pico / 1024,
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados, anteriores=None):
+    """Tabela com os resultados; com anteriores, inclui a variação do p50 e da vazão"""
+    cabecalho = (f"{'operação':<8} {'n':>6} {'p50 (µs)':>10} {'p90 (µs)':>10} {'p99 (µs)':>10} "
+                 f"{'máx (µs)':>10} {'vazão/s':>10} {'pico (KiB)':>11}")
+    if anteriores:
+        cabecalho += f" {'Δ p50':>8} {'Δ vazão':>8}"
+    print(cabecalho)
+
+    for chave, r in resultados.items():
+        operacao, n = chave.split(':')
+        linha = (f"{operacao:<8} {n:>6} {r['p50_us']:>10.1f} {r['p90_us']:>10.1f} {r['p99_us']:>10.1f} "
+                 f"{r['max_us']:>10.1f} {r['vazao_por_s']:>10.1f} {r['pico_memoria_kib']:>11.1f}")
+        anterior = (anteriores or {}).get(chave)
+        if anterior:
+            linha += (f" {(r['p50_us'] / anterior['p50_us'] - 1) * 100:>+7.1f}%"
+                      f" {(r['vazao_por_s'] / anterior['vazao_por_s'] - 1) * 100:>+7.1f}%")
+        print(linha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--operacoes', nargs='+', choices=list(OPERACOES), default=list(OPERACOES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', default='bench_resultados.json',
+                        help="Arquivo JSON de resultados (padrão: bench_resultados.json)")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    avaliacoes = gerar_avaliacoes(max(args.tamanhos), seed=args.seed)
+
+    # Aquecimento: imports preguiçosos (ReportLab) e caches não entram na medição
+    for operacao in args.operacoes:
+        OPERACOES[operacao](avaliacoes[0])
+
+    resultados = {}
+    for operacao in args.operacoes:
+        for n in args.tamanhos:
+            print(f"... {operacao} x {n}", file=sys.stderr)
+            resultados[f"{operacao}:{n}"] = medir(OPERACOES[operacao], avaliacoes[:n])
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)['resultados']
+    imprimir(resultados, anteriores)
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'commit': _commit_atual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'seed': args.seed,
+            'resultados': resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
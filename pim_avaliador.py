@@ -1,509 +1,877 @@
 import streamlit as st
-import pandas as pd
-import os
-from pathlib import Path
-import webbrowser
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-import json
+import functools
+import tempfile
+import uuid
 from datetime import datetime
 
-st.set_page_config(page_title="Avaliador PIM", layout="wide", initial_sidebar_state="expanded")
-
-SUGESTOES_BANCO = {
-    "Apresentação Geral": [
-        "Seção não apresentada no relatório",
-        "A capa não apresenta o nome da instituição, curso, nome dos alunos com RA, título, subtítulo, local e ano de forma clara e organizada",
-        "As margens não estão configuradas em 3 cm (esquerda e superior) e 2 cm (direita e inferior)",
-        "O espaçamento entre linhas não é de 1,5 cm no corpo do texto",
-        "As páginas não estão corretamente numeradas sequencialmente em algarismos arábicos no canto superior direito",
-        "O sumário não apresenta todas as seções do relatório em ordem de ocorrência",
-        "As tabelas e ilustrações não possuem título, fonte de referência indicada",
-        "O texto contém erros ortográficos, de acentuação ou de grafia de palavras",
-        "O texto apresenta erros de concordância verbal ou nominal",
-        "Estrutura conforme normas, mas com pequenos ajustes necessários",
-        "Apresentação adequada e em conformidade com normas"
-    ],
-    "Introdução": [
-        "Seção não apresentada no relatório",
-        "A organização escolhida não é apresentada com informações sobre seu ramo de negócio, porte, localização e contexto geral",
-        "O relatório não estabelece conexão clara entre o objeto de pesquisa e as disciplinas estudadas no semestre",
-        "A introdução não explica por que o PIM é importante para a formação acadêmica dos alunos",
-        "O objetivo principal do relatório não está claramente definido",
-        "A pesquisa não é justificada quanto à sua importância ou contribuição para a prática profissional",
-        "A introdução não descreve a abordagem metodológica utilizada",
-        "A introdução não apresenta a estrutura geral do relatório (visão dos capítulos subsequentes)",
-        "Introdução adequada com contexto, objetivo e metodologia bem definidos"
-    ],
-    "Desenvolvimento": [
-        "Seção não apresentada no relatório",        
-        "Abrangência insuficiente das disciplinas propostas",
-        "Fraca integração entre teoria e prática",
-        "Faltam dados, gráficos e visualizações para suportar análise",
-        "Desenvolvimento parcial, com bom conteúdo mas faltam aplicações práticas",
-        "Abordagem prática bem elaborada, porém com conteúdo teórico pouco fundamentado",
-        "Desenvolvimento adequado com integração teórica-prática bem executada"
-    ],
-    "Discussão": {
-        "Problema (para PIM I ou PIM II)": [
-            "Seção não apresentada no relatório",        
-            "O problema principal não está claramente identificado",
-            "Os fatores internos e externos que contribuem para o problema não foram descritos",
-            "A forma como o problema afeta diferentes áreas da organização não foi demonstrada",
-            "As causas-raízes do problema não apresentaram fundamentação adequada",
-            "Dados que suportam ou justificam a existência do problema não foram apresentados",
-            "Os sintomas não apresentam conexão clara com a realidade observada na organização",
-            "As possíveis consequências caso o problema não seja resolvido não foram apresentadas",
-            "O problema não está adequadamente relacionado à uma das disciplinas específicas",
-            "Discussão adequada, com identificação clara do problema e suas consequências"
-        ],
-        "Solução (para PIM III ou PIM IV)": [
-            "Seção não apresentada no relatório",
-            "A solução proposta não está claramente descrita",
-            "Os objetivos a serem alcançados com a solução proposta não estão delineados",
-            "A solução proposta não está adequadamente justificada",
-            "As fases de implementação da solução (cronograma) não foi apresentada",
-            "A viabilidade da solução proposta não foi demonstrada",
-            "Os benefícios esperados com a implementação da solução não estão claramente descritos",
-            "Os indicadores de sucesso - para verificação do alcance da solução - não foram apresentados",
-            "Os aspectos que podem limitar a implementação da solução não foram apresentados",
-            "A solução não está adequadamente relacionada à uma das disciplinas específicas",
-            "A solução proposta está adequadamente fundamentada"
-        ]
-    },
-    "Conclusão": [
-        "Seção não apresentada no relatório",
-        "Os pontos principais discutidos no desenvolvimento não estão sintetizados",
-        "Os desdobramentos da discussão não foram retomados",
-        "As limitações encontradas durante a pesquisa não foram mencionadas",
-        "A principal contribuição do relatório para a área de estudo ou para a organização não está claramente apresentada",
-        "A conclusão não deixa clara a mensagem final que o relatório deseja transmitir",
-        "Conclusão adequada, com síntese clara e contribuições bem articuladas"
-    ],
-    "Referências e Citações": [
-        "Seção não apresentada no relatório",
-        "Fontes citadas no corpo do texto constam parcialmente na lista de Referências",
-        "As Referências não seguem o formato ABNT",
-        "Citações diretas apresentaram formatação inconsistente conforme ABNT",
-        "Citações indiretas apresentaram formatação inconsistente conforme ABNT",
-        "O texto apresenta paráfrases muito próximas de fontes bibliográficas sem a devida atribuição de autoria",
-        "Referências adequadas, mas com pequenos problemas de formatação",
-        "Padronização adequada das referências e citações, conforme ABNT"
-    ]
-}
-
-DIMENSOES = {
-    "Apresentação Geral": 1.0,
-    "Introdução": 1.0,
-    "Desenvolvimento": 3.0,
-    "Discussão": 3.0,
-    "Conclusão": 1.0,
-    "Referências e Citações": 1.0
-}
-
-DIMENSOES_TITULOS = {
-    "Apresentação Geral": "APRESENTAÇÃO GERAL DO TRABALHO",
-    "Introdução": "INTRODUÇÃO",
-    "Desenvolvimento": "DESENVOLVIMENTO",
-    "Discussão": "DISCUSSÃO",
-    "Conclusão": "CONCLUSÃO",
-    "Referências e Citações": "REFERÊNCIAS E CITAÇÕES"
-}
-
-RECOMENDACOES_GERAIS = [
-    "Revisar estrutura do trabalho conforme normas ABNT",
-    "Corrigir erros gramaticais e melhorar clareza da linguagem",
-    "Melhorar apresentação do contexto e objetivos do trabalho",
-    "Detalhar melhor a metodologia e estrutura adotadas",
-    "Aprofundar a integração entre teoria e prática",
-    "Incluir mais dados, gráficos e exemplos concretos",
-    "Estruturar melhor a análise e discussão do problema",
-    "Apresentar mais evidências e dados que sustentem a análise",
-    "Elaborar conclusões mais consistentes e bem fundamentadas",
-    "Propor encaminhamentos práticos e viáveis",
-    "Padronizar todas as referências conforme norma ABNT",
-    "Revisar citações e eliminar fontes inadequadas",
-    "Melhorar diagramação e formatação visual do documento",
-    "Expandir discussão dos resultados encontrados",
-    "Incluir mais referências acadêmicas e científicas",
-    "Detalhar melhor o problema identificado",
-    "Apresentar soluções mais inovadoras e criativas",
-    "Melhorar a conexão entre introdução, desenvolvimento e conclusão",
-    "Incluir análise crítica mais profunda dos dados",
-    "Revisar coesão e coerência do texto",
-    "Detalhar melhor a empresa/organização estudada",
-    "Integrar melhor as disciplinas do curso no trabalho",
-    "Incluir mais informações sobre impacto e resultados",
-    "Melhorar apresentação e organização das tabelas e figuras"
-]
-
-def calcular_notas(notas_tabela):
-    nota_objetiva = sum(notas_tabela.values())
-    nota_ponderada = nota_objetiva * 0.70
-    return nota_objetiva, nota_ponderada
-
-def salvar_progresso():
-    """Exporta todo o progresso da avaliação em JSON"""
-    dados = {
-        'versao': '2.1',
-        'timestamp': datetime.now().isoformat(),
-        'curso': st.session_state.get('curso', ''),
-        'lider': st.session_state.get('lider', ''),
-        'pim': st.session_state.get('pim', ''),
-        'empresa': st.session_state.get('empresa', ''),
-        'professor': st.session_state.get('professor', ''),
-        'data_avaliacao': st.session_state.get('data_avaliacao', datetime.now()).isoformat(),
-        'avaliacoes': st.session_state.get('avaliacoes', {}),
-        'notas_tabela': st.session_state.get('notas_tabela', {}),
-        'recomendacoes_selecionadas': st.session_state.get('recomendacoes_selecionadas', []),
-        'comentarios_adicionais': st.session_state.get('comentarios_adicionais', ''),
-        'parte_oral': st.session_state.get('parte_oral', 0.0),
-        'justificativa_oral': st.session_state.get('justificativa_oral', ''),
-        'tipo_discussao': st.session_state.get('tipo_discussao', 'Problema (PIM I ou II)')
-    }
-    return json.dumps(dados, indent=2, ensure_ascii=False)
+from sata import (
+    DIMENSOES,
+    calcular_notas, serializar_progresso, dados_pdf_de_progresso
+)
+from sata.armazenamento import ArmazemAvaliacoes
+from sata.avaliacao import avaliacoes_como_dict, avaliacoes_de_dict, notas_de, nova_avaliacao
+from sata.cache_pdf import CachePDF, chave_relatorio
+from sata.comentarios import IndiceComentarios
+from sata.diario import CAMINHO_PADRAO as CAMINHO_DIARIO, DiarioAvaliacoes
+from sata.documento import documento_relatorio
+from sata.fila_grupos import montar_fila
+from sata.parecer import texto_parecer
+from sata.rubrica import erro_rubrica, rubrica_de
+from sata import desempenho
+from sata.desempenho import cronometrado, medir
+
+CURSOS = ["Selecionar Curso", "Gestão Financeira", "Gestão RH", "Logística", "Marketing"]
+PIMS = ["Selecionar PIM", "I", "II", "III", "IV"]
+TIPOS_DISCUSSAO = ["Problema (PIM I ou II)", "Solução (PIM III ou IV)"]
+JUSTIFICATIVAS_ORAIS = ["Grupo não realizou apresentação", "Grupo aguardando para realizar apresentação", "Apresentação realizada"]
+
+# Sugestões de comentários já usados abaixo do comentário de cada dimensão
+LIMITE_SUGESTOES_COMENTARIO = 4
+
+# Sufixo das chaves dos checkboxes de cada grupo da Discussão
+SUFIXOS_GRUPOS = {"Problema (para PIM I ou PIM II)": "problema", "Solução (para PIM III ou PIM IV)": "solucao"}
+
+@functools.lru_cache(maxsize=64)
+def chaves_sugestoes(rubrica, dimensao):
+    """
+    Chaves dos checkboxes de sugestão da dimensão, na ordem dos bits de AvaliacaoDimensao.selecao.
+    As chaves dos widgets das abas são fixas: o Streamlit guarda os metadados de cada
+    widget já criado até o fim da sessão, então chaves novas a cada correção acumulariam.
+    Por isso a chave é a posição na lista do grupo, a mesma em todas as variantes da rubrica.
+    """
+    chaves = [None] * len(rubrica.sugestoes_dimensao[dimensao])
+    for (dim, grupo), bits in rubrica.bits_grupos.items():
+        if dim == dimensao:
+            sufixo = f"_{SUFIXOS_GRUPOS[grupo]}" if grupo else ""
+            for i, bit in enumerate(bits):
+                chaves[bit] = f"sug_{dimensao}{sufixo}_{i}"
+    return chaves
 
-def carregar_progresso(json_data):
-    """Restaura progresso salvo do JSON"""
+# Campos da sessão que, com as avaliações, formam o estado gravado (backup e banco local)
+CAMPOS_ESTADO = (
+    'professor', 'curso', 'pim', 'empresa', 'lider', 'data_avaliacao', 'recomendacoes_selecionadas',
+    'comentarios_adicionais', 'parte_oral', 'justificativa_oral', 'tipo_discussao'
+)
+
+def _contexto_desempenho():
+    """Campos extras de cada rastro de desempenho (sata.desempenho)"""
     try:
-        dados = json.loads(json_data)
-        
-        st.session_state.curso = dados.get('curso', '')
-        st.session_state.lider = dados.get('lider', '')
-        st.session_state.pim = dados.get('pim', '')
-        st.session_state.empresa = dados.get('empresa', '')
-        st.session_state.professor = dados.get('professor', '')
-        
-        if 'data_avaliacao' in dados:
-            st.session_state.data_avaliacao = datetime.fromisoformat(dados['data_avaliacao'])
-        
-        st.session_state.avaliacoes = dados.get('avaliacoes', {})
-        st.session_state.notas_tabela = dados.get('notas_tabela', {})
-        st.session_state.recomendacoes_selecionadas = dados.get('recomendacoes_selecionadas', [])
-        st.session_state.comentarios_adicionais = dados.get('comentarios_adicionais', '')
-        st.session_state.parte_oral = dados.get('parte_oral', 0.0)
-        st.session_state.justificativa_oral = dados.get('justificativa_oral', '')
-        st.session_state.tipo_discussao = dados.get('tipo_discussao', 'Problema (PIM I ou II)')
-        
+        return {'sessao': st.session_state.get('id_sessao')}
+    except Exception:
+        return {}  # fora de um rerun (ex.: dados de um download gerados sob demanda)
+
+if desempenho.MONITOR is not None:
+    desempenho.MONITOR.contexto = _contexto_desempenho
+
+@st.cache_resource
+def obter_armazem():
+    """Banco local de avaliações, compartilhado por todas as sessões"""
+    return ArmazemAvaliacoes()
+
+@st.cache_resource
+def obter_indice_comentarios():
+    """Comentários já escritos (sata.comentarios), gravados no mesmo banco; compartilhado por todas as sessões"""
+    indice = IndiceComentarios(obter_armazem().caminho)
+    indice.atualizar(obter_armazem())  # grupos gravados antes de o índice existir ou por outro processo
+    return indice
+
+@st.cache_resource
+def obter_diario():
+    """Diário local das avaliações (sata.diario), ou None se desligado (SATA_DIARIO vazio); compartilhado por todas as sessões"""
+    return DiarioAvaliacoes() if CAMINHO_DIARIO else None
+
+@st.cache_resource
+def obter_cache_pdf():
+    """PDFs já gerados, pelo conteúdo do relatório; compartilhado por todas as sessões"""
+    return CachePDF()
+
+@st.cache_resource
+def obter_fila_pdf():
+    """Fila de geração de PDFs em segundo plano, compartilhada por todas as sessões"""
+    from sata.fila_pdf import FilaPDF
+    return FilaPDF(cache=obter_cache_pdf())
+
+@st.cache_resource
+def obter_painel():
+    """Tabela da turma (sata.analise), compartilhada pelas sessões e atualizada de forma incremental"""
+    from sata.analise import PainelTurma
+    return PainelTurma()
+
+def estado_avaliacao():
+    """A avaliação da sessão no formato de sata.ler_progresso (observações em texto e notas_tabela)"""
+    estado = {campo: st.session_state[campo] for campo in CAMPOS_ESTADO if campo in st.session_state}
+    estado['avaliacoes'] = avaliacoes_como_dict(st.session_state.avaliacoes, st.session_state.rubrica)
+    estado['notas_tabela'] = notas_de(st.session_state.avaliacoes)
+    return estado
+
+def salvar_progresso(compactar=False):
+    """Exporta todo o progresso da avaliação em JSON (bytes gzip com compactar=True)"""
+    return serializar_progresso(estado_avaliacao(), compactar=compactar)
+
+def carregar_backups(arquivos):
+    """
+    Valida os backups enviados (um ou vários .json/.json.gz, .zip com vários
+    ou diário .jsonl) e monta com eles a fila de grupos, restaurando o primeiro. Os backups
+    inválidos ficam em st.session_state.falhas_fila, com o motivo.
+    """
+    fila, falhas = montar_fila((arquivo.name, arquivo.getvalue()) for arquivo in arquivos)
+    st.session_state.falhas_fila = falhas
+    if not len(fila):
+        return False, "❌ Nenhum backup válido para restaurar."
+    st.session_state.fila_grupos = fila
+    dados, grupo_id = fila.abrir(0, obter_armazem())
+    agendar_restauracao(dados, grupo_id, da_fila=True)
+    if len(fila) == 1:
         return True, "✅ Avaliação restaurada com sucesso!"
-    except Exception as e:
-        return False, f"❌ Erro ao carregar: {str(e)}"
+    return True, f"✅ {len(fila)} grupos na fila; o primeiro foi restaurado."
+
+def abrir_na_fila(posicao):
+    """
+    Callback dos botões Anterior/Próximo: agenda a restauração do grupo da
+    posição da fila, aplicada já no rerun do clique (os callbacks rodam antes do script).
+    """
+    fila = st.session_state.fila_grupos
+    # O id no banco só é do grupo da fila se a sessão não passou a outro grupo (Nova Correção, Abrir Grupo)
+    grupo_id_atual = st.session_state.get('grupo_id') if st.session_state.get('grupo_da_fila') else None
+    dados, grupo_id = fila.abrir(posicao, obter_armazem(), grupo_id_atual)
+    agendar_restauracao(dados, grupo_id, da_fila=True)
+
+def agendar_restauracao(dados, grupo_id=None, da_fila=False):
+    """
+    Agenda a restauração de uma avaliação (formato de ler_progresso) para o próximo rerun.
+    O Streamlit não permite alterar o valor de um widget depois que ele foi criado,
+    então os valores são aplicados no início de main(), antes dos widgets.
+    da_fila indica que a avaliação é o grupo atual da fila de grupos.
+    """
+    st.session_state.restauracao_pendente = (dados, grupo_id, da_fila)
+
+def valores_widgets_dimensao(dimensao):
+    """{chave: valor} dos widgets da aba de uma dimensão, a partir da avaliação da sessão"""
+    rubrica = st.session_state.rubrica
+    avaliacao = st.session_state.avaliacoes[dimensao]
+    valores = {
+        f"nota_{dimensao}": min(float(avaliacao.nota), rubrica.dimensoes[dimensao]),
+        f"comentario_{dimensao}": avaliacao.comentario
+    }
+    for bit, chave in enumerate(chaves_sugestoes(rubrica, dimensao)):
+        valores[chave] = bool(avaliacao.selecao >> bit & 1)
+    if isinstance(rubrica.sugestoes[dimensao], dict):
+        valores["campo_tipo_discussao"] = st.session_state.get('tipo_discussao', TIPOS_DISCUSSAO[0])
+    return valores
+
+def valores_widgets_oral():
+    justificativa = st.session_state.justificativa_oral
+    return {
+        "campo_parte_oral": min(float(st.session_state.parte_oral), st.session_state.rubrica.nota_maxima_oral),
+        "campo_justificativa_oral": justificativa if justificativa in JUSTIFICATIVAS_ORAIS else JUSTIFICATIVAS_ORAIS[0]
+    }
+
+def preencher_widgets(valores):
+    """Grava os valores nos widgets das abas; deve ser chamada antes de os widgets serem criados no rerun"""
+    for chave, valor in valores.items():
+        st.session_state[chave] = valor
+
+def montar_secao(secao, valores):
+    """
+    Registra que a aba foi montada neste rerun. Se ela não estava montada no
+    rerun anterior (aba reaberta), o Streamlit já descartou o valor dos seus
+    widgets, e eles voltam da avaliação da sessão (valores).
+    """
+    if secao not in st.session_state.abas_anteriores and secao not in st.session_state.abas_montadas:
+        preencher_widgets(valores)
+    st.session_state.abas_montadas.add(secao)
+
+def preencher_todos_widgets():
+    """Copia toda a avaliação da sessão para os widgets das abas (ao restaurar e na Nova Correção)"""
+    for dimensao in st.session_state.rubrica.dimensoes:
+        preencher_widgets(valores_widgets_dimensao(dimensao))
+    preencher_widgets(valores_widgets_oral())
+
+def atualizar_rubrica():
+    """
+    Confere, no início de cada rerun completo, a rubrica do curso e PIM da
+    sessão (sata.rubrica). Se ela mudou (outro curso/PIM, ou arquivo de
+    rubrica editado), as sugestões marcadas passam para a nova pelo texto e os
+    widgets das abas são refeitos; os fragmentos usam sempre st.session_state.rubrica.
+    """
+    nova = rubrica_de(st.session_state)
+    antiga = st.session_state.rubrica
+    st.session_state.rubrica = nova
+    if nova.versao == antiga.versao:
+        return
+    st.session_state.avaliacoes = avaliacoes_de_dict(avaliacoes_como_dict(st.session_state.avaliacoes, antiga), nova)
+    st.session_state.versao_avaliacao += 1
+    preencher_todos_widgets()
+
+@cronometrado("restauração")
+def aplicar_restauracao_pendente():
+    """Aplica a restauração agendada, preenchendo o estado e os widgets das abas"""
+    pendente = st.session_state.pop('restauracao_pendente', None)
+    if pendente is None:
+        return
+    dados, grupo_id, da_fila = pendente
+    
+    st.session_state.versao_avaliacao += 1
+    
+    # Barra lateral
+    st.session_state.professor = dados['professor']
+    st.session_state.curso = dados['curso'] if dados['curso'] in CURSOS else CURSOS[0]
+    st.session_state.pim = dados['pim'] if dados['pim'] in PIMS else PIMS[0]
+    st.session_state.rubrica = rubrica_de(st.session_state)
+    st.session_state.empresa = dados['empresa']
+    st.session_state.lider = dados['lider']
+    if dados['data_avaliacao'] is not None:
+        st.session_state.data_avaliacao = dados['data_avaliacao'].date()
+    
+    # Estado da avaliação
+    st.session_state.avaliacoes = avaliacoes_de_dict(dados['avaliacoes'], st.session_state.rubrica)
+    st.session_state.recomendacoes_selecionadas = dados['recomendacoes_selecionadas']
+    st.session_state.recomendacoes_automaticas = not dados['recomendacoes_selecionadas']
+    st.session_state.comentarios_adicionais = dados['comentarios_adicionais']
+    st.session_state.parte_oral = dados['parte_oral']
+    st.session_state.justificativa_oral = dados['justificativa_oral']
+    st.session_state.tipo_discussao = dados['tipo_discussao'] if dados['tipo_discussao'] in TIPOS_DISCUSSAO else TIPOS_DISCUSSAO[0]
+    st.session_state.grupo_id = grupo_id
+    st.session_state.grupo_da_fila = da_fila
+    preencher_todos_widgets()
+
+def _avaliacao_iniciada():
+    """Indica se já há algo avaliado (evita gravar grupos vazios após "Nova Correção")"""
+    if st.session_state.get('parte_oral'):
+        return True
+    return not all(av.vazia() for av in st.session_state.avaliacoes.values())
+
+@cronometrado("autosalvar")
+def autosalvar():
+    """Grava automaticamente a avaliação atual no banco local (só os campos alterados) e, se mudou algo, no diário local"""
+    if not (st.session_state.get('empresa') or st.session_state.get('lider')):
+        return
+    if st.session_state.get('grupo_id') is None and not _avaliacao_iniciada():
+        return
+    estado = estado_avaliacao()
+    grupo_id, alterados = obter_armazem().salvar(st.session_state.get('grupo_id'), estado)
+    st.session_state.grupo_id = grupo_id
+    obter_indice_comentarios().registrar(grupo_id, estado)
+    diario = obter_diario()
+    if alterados and diario is not None:
+        diario.registrar(estado)
+
+def _rotulo_grupo(grupo):
+    atualizado_em = datetime.fromisoformat(grupo['atualizado_em']).strftime('%d/%m %H:%M')
+    pim = grupo['pim'] if grupo['pim'] in PIMS[1:] else "?"
+    return f"{grupo['empresa'] or 'Sem empresa'} — {grupo['lider'] or 'Sem líder'} (PIM {pim}, {atualizado_em})"
+
+def registrar_alteracao():
+    """
+    Marca que a avaliação mudou: invalida os valores derivados em cache (aba
+    Relatório), atualiza as recomendações sugeridas e grava no banco local.
+    Chamado pelos fragmentos, que não passam pelo final de main().
+    """
+    st.session_state.versao_avaliacao += 1
+    atualizar_recomendacoes()
+    autosalvar()
+
+def motor_da_sessao():
+    """Motor de recomendações da rubrica da sessão (sata.recomendacoes, que importa o numpy só quando usado)"""
+    from sata.recomendacoes import motor_recomendacoes
+    return motor_recomendacoes(st.session_state.rubrica)
 
-def gerar_parecer_resumido(dados):
+def atualizar_recomendacoes():
     """
-    Gera parecer resumido automático combinando texto padrão com dados da avaliação
+    Enquanto o professor não escolhe as recomendações à mão, elas seguem as
+    sugeridas pelas regras da rubrica (sata.recomendacoes) para as notas e
+    sugestões marcadas, recalculadas só quando a avaliação muda (versao_avaliacao).
     """
-    texto_base = (
-        "A construção de um trabalho acadêmico envolve variáveis normativas, aspectos formais de pesquisa "
-        "e adequação de conteúdos aos tópicos propostos pelo roteiro do Projeto Integrado Multidisciplinar. "
-        "Desse modo, a avaliação do PIM (parte escrita) serve ao propósito de contemplar a análise das seguintes "
-        "dimensões e critérios de ponderação: cuidados na elaboração da apresentação geral do texto (10%), "
-        "introdução (10%), desenvolvimento (30%), discussão (30%), "
-        "conclusão pertinente aos aspectos estudados (10%) e atenção aos procedimentos de citações e referências (10%). "
-        "Para tanto, segue a distribuição dos pontos com o respectivo desempenho discente para cada uma das dimensões avaliadas: "
+    if not st.session_state.recomendacoes_automaticas:
+        return
+    versao = st.session_state.versao_avaliacao
+    if st.session_state.get('versao_recomendacoes') == versao:
+        return
+    st.session_state.versao_recomendacoes = versao
+    st.session_state.recomendacoes_selecionadas = (
+        motor_da_sessao().recomendar_avaliacao(st.session_state.avaliacoes)
+        if _avaliacao_iniciada() else []
     )
+
+def escolher_recomendacoes():
+    """Callback da lista de recomendações: a escolha do professor substitui as sugeridas"""
+    st.session_state.recomendacoes_selecionadas = st.session_state.campo_recomendacoes
+    st.session_state.recomendacoes_automaticas = False
+    registrar_alteracao()
+
+def usar_recomendacoes_sugeridas():
+    """Callback de "Usar as sugeridas": as recomendações voltam a seguir as regras"""
+    st.session_state.recomendacoes_automaticas = True
+    registrar_alteracao()
+
+def completar_comentario(dimensao, comentario):
+    """Callback das sugestões de comentário: o comentário escolhido substitui a última linha digitada"""
+    chave = f"comentario_{dimensao}"
+    linhas = st.session_state[chave].split('\n')
+    linhas[-1] = comentario
+    st.session_state[chave] = '\n'.join(linhas)
+
+def sugerir_comentarios(dimensao, comentario):
+    """Comentários já usados na dimensão que completam a última linha digitada (sata.comentarios)"""
+    linhas = comentario.split('\n')
+    escritos = {' '.join(linha.split()) for linha in linhas[:-1]}
+    limite = LIMITE_SUGESTOES_COMENTARIO + len(escritos)
+    sugestoes = obter_indice_comentarios().sugerir(dimensao, linhas[-1], limite=limite)
+    return [texto for texto in sugestoes if texto not in escritos][:LIMITE_SUGESTOES_COMENTARIO]
+
+def atualizar_dimensao(dimensao, selecao, comentario, nota):
+    """Atualiza só a dimensão informada no estado; retorna True se algo mudou"""
+    avaliacao = st.session_state.avaliacoes[dimensao]
+    if (avaliacao.selecao, avaliacao.comentario, avaliacao.nota) == (selecao, comentario, nota):
+        return False
+    avaliacao.selecao, avaliacao.comentario, avaliacao.nota = selecao, comentario, nota
+    return True
+
+@st.fragment
+@cronometrado("dimensão: {0}")
+def renderizar_dimensao(dimensao, nota_maxima):
+    """
+    Aba de uma dimensão. Como fragmento, marcar uma sugestão ou alterar a nota
+    reexecuta apenas esta aba, e não o app inteiro.
+    """
+    montar_secao(dimensao, valores_widgets_dimensao(dimensao))
+    rubrica = st.session_state.rubrica
+    chaves = chaves_sugestoes(rubrica, dimensao)
+    st.markdown(
+        f"<h1 style='color: #1f77b4; font-size: 28px;'>✍️ {dimensao}</h1>",
+        unsafe_allow_html=True
+    )
+    # Adicionar subtítulo explicativo
+    st.caption(f"📋 {rubrica.descricoes.get(dimensao, '')}")
+    st.divider()
     
-    # Construir detalhes das dimensões
-    avaliacoes = dados.get('avaliacoes', {})
-    detalhes = []
+    alterou = False
     
-    for dimensao, pesos in DIMENSOES.items():
-        avaliacao = avaliacoes.get(dimensao, {})
-        nota = avaliacao.get('nota', 0)
-        observacoes = avaliacao.get('observacoes', [])
-        comentario = avaliacao.get('comentario', '')
+    # Verificar se é Discussão (com grupos Problema/Solução)
+    if dimensao == "Discussão" and isinstance(rubrica.sugestoes.get(dimensao), dict):
+        st.write("**Escolha qual aspecto será abordado:**")
         
-        # Montar texto para cada dimensão
-        dimensao_texto = f"{dimensao}: Nota {nota:.1f}/{pesos:.1f}"
+        # Radio buttons para escolher entre Problema ou Solução
+        tipo_discussao = st.radio(
+            "Tipo de Discussão",
+            options=TIPOS_DISCUSSAO,
+            horizontal=True,
+            key="campo_tipo_discussao",
+            label_visibility="collapsed"
+        )
+        if st.session_state.get('tipo_discussao') != tipo_discussao:
+            st.session_state.tipo_discussao = tipo_discussao
+            alterou = True
         
-        # Coletar observações e comentários
-        detalhes_obs = []
-        if observacoes:
-            # Remover tags [Problema] e [Solução]
-            for obs in observacoes:
-                obs_limpa = obs.replace("[Problema] ", "").replace("[Solução] ", "")
-                detalhes_obs.append(obs_limpa)
-        if comentario:
-            detalhes_obs.append(comentario)
+        st.divider()
+        st.write("**Selecione as sugestões aplicáveis:**")
         
-        # Separar por vírgulas e adicionar ponto final
-        if detalhes_obs:
-            dimensao_texto += ". " + ", ".join(detalhes_obs) + "."
+        selecao = 0
+        
+        # Renderizar apenas o grupo escolhido
+        if tipo_discussao == "Problema (PIM I ou II)":
+            st.write("🔴 **Problema:**")
+            grupo = "Problema (para PIM I ou PIM II)"
         else:
-            dimensao_texto += "."
+            st.write("🟢 **Solução:**")
+            grupo = "Solução (para PIM III ou PIM IV)"
+        for sugestao, bit in zip(rubrica.sugestoes[dimensao][grupo], rubrica.bits_grupos[(dimensao, grupo)]):
+            if st.checkbox(sugestao, key=chaves[bit]):
+                selecao |= 1 << bit
+    else:
+        # Renderização normal para outras dimensões
+        sugestoes = rubrica.sugestoes.get(dimensao, [])
+        st.write("**Selecione as sugestões aplicáveis:**")
         
-        detalhes.append(dimensao_texto)
+        selecao = 0
+        for sugestao, bit in zip(sugestoes, rubrica.bits_grupos[(dimensao, None)]):
+            if st.checkbox(sugestao, key=chaves[bit]):
+                selecao |= 1 << bit
     
-    # Calcular nota ponderada da parte escrita
-    nota_objetiva = sum(dados.get('notas_tabela', {}).values())
-    nota_ponderada_escrita = nota_objetiva * 0.70
-    
-    # Obter notas da parte oral
-    parte_oral = dados.get('parte_oral', 0.0)
-    justificativa_oral = dados.get('justificativa_oral', 'Grupo não realizou apresentação')
-    
-    # Calcular nota total
-    nota_total = nota_ponderada_escrita + parte_oral
-    
-    parecer_completo = texto_base + " ".join(detalhes) + f" Parte Escrita: Nota {nota_ponderada_escrita:.1f}/7.0. Parte Oral: Nota {parte_oral:.1f}/3.0 ({justificativa_oral}). Nota Total: {nota_total:.2f}/10.0."
-    return parecer_completo
-
-def gerar_recomendacoes(notas_tabela, avaliacoes):
-    recomendacoes = []
-    if notas_tabela.get("Apresentação Geral", 0) < 0.7:
-        recomendacoes.append("Revisar estrutura do trabalho conforme normas ABNT")
-        recomendacoes.append("Corrigir erros gramaticais e melhorar clareza da linguagem")
-    if notas_tabela.get("Introdução", 0) < 0.7:
-        recomendacoes.append("Melhorar apresentação do contexto e objetivos do trabalho")
-        recomendacoes.append("Detalhar melhor a metodologia e estrutura adotadas")
-    if notas_tabela.get("Desenvolvimento", 0) < 2.0:
-        recomendacoes.append("Aprofundar a integração entre teoria e prática")
-        recomendacoes.append("Incluir mais dados, gráficos e exemplos concretos")
-    if notas_tabela.get("Discussão", 0) < 2.0:
-        recomendacoes.append("Estruturar melhor a análise e discussão do problema")
-        recomendacoes.append("Apresentar mais evidências e dados que sustentem a análise")
-    if notas_tabela.get("Conclusão", 0) < 0.7:
-        recomendacoes.append("Elaborar conclusões mais consistentes e bem fundamentadas")
-        recomendacoes.append("Propor encaminhamentos práticos e viáveis")
-    if notas_tabela.get("Referências e Citações", 0) < 0.7:
-        recomendacoes.append("Padronizar todas as referências conforme norma ABNT")
-        recomendacoes.append("Revisar citações e eliminar fontes inadequadas")
-    if not recomendacoes:
-        recomendacoes.append("Manter a qualidade do trabalho e aprofundar análises quando possível")
-    return recomendacoes[:5]
-
-class NumberedCanvas(canvas.Canvas):
-    """Canvas personalizado com números de página no rodapé"""
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._page_num = 0
-        self._pages = []
-
-    def showPage(self):
-        self._page_num += 1
-        self._pages.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        total_pages = self._page_num
-        for i, page_dict in enumerate(self._pages, 1):
-            self.__dict__.update(page_dict)
-            self.setFont("Helvetica", 8)
-            self.drawString(
-                7.5 * inch,
-                0.5 * inch,
-                f"Página {i} de {total_pages}"
+    st.divider()
+    comentario_custom = st.text_area(
+        "Ou escreva um comentário customizado",
+        height=60,
+        key=f"comentario_{dimensao}",
+        placeholder="Digite aqui comentários adicionais..."
+    )
+    sugestoes_comentario = sugerir_comentarios(dimensao, comentario_custom)
+    if sugestoes_comentario:
+        st.caption("💬 Comentários já usados (clique para completar a última linha):")
+        # Chaves fixas pela posição, como as dos checkboxes (chaves_sugestoes)
+        for i, texto in enumerate(sugestoes_comentario):
+            st.button(
+                texto if len(texto) <= 90 else texto[:89] + "…",
+                key=f"completar_{dimensao}_{i}",
+                help=texto,
+                on_click=completar_comentario,
+                args=(dimensao, texto)
             )
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
+    
+    st.divider()
+    col1, col2 = st.columns(2)
+    with col1:
+        nota = st.number_input(
+            f"Nota para {dimensao}",
+            min_value=0.0,
+            max_value=nota_maxima,
+            step=0.1,
+            key=f"nota_{dimensao}"
+        )
+    
+    with col2:
+        st.metric("Nota máxima", nota_maxima)
+    
+    # Salvar separado: observações e comentários do professor
+    if atualizar_dimensao(dimensao, selecao, comentario_custom, nota) or alterou:
+        registrar_alteracao()
 
-def gerar_pdf_relatorio(dados, caminho_saida):
+@st.fragment
+@cronometrado("parte oral")
+def renderizar_parte_oral():
+    """Aba Parte Oral, reexecutada isoladamente ao alterar a nota ou a justificativa"""
+    montar_secao("Parte Oral", valores_widgets_oral())
+    st.markdown(
+        "<h1 style='color: #ff6b6b; font-size: 28px;'>🎤 Parte Oral</h1>",
+        unsafe_allow_html=True
+    )
+    
+    # Calcular nota ponderada da parte escrita
+    rubrica = st.session_state.rubrica
+    _, nota_ponderada_escrita = calcular_notas(notas_de(st.session_state.avaliacoes), rubrica)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Parte Escrita (Ponderada)", f"{nota_ponderada_escrita:.1f}/{rubrica.nota_maxima_escrita:.1f}")
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        parte_oral = st.number_input(
+            "Parte Oral",
+            min_value=0.0,
+            max_value=rubrica.nota_maxima_oral,
+            step=0.1,
+            key="campo_parte_oral"
+        )
+    
+    with col2:
+        justificativa = st.selectbox(
+            "Justificativa",
+            JUSTIFICATIVAS_ORAIS,
+            key="campo_justificativa_oral"
+        )
+    
+    if (parte_oral, justificativa) != (st.session_state.parte_oral, st.session_state.justificativa_oral):
+        st.session_state.parte_oral = parte_oral
+        st.session_state.justificativa_oral = justificativa
+        registrar_alteracao()
+
+@cronometrado("relatório: resumo e parecer")
+def resumo_relatorio(documento):
     """
-    Gera relatório de avaliação em PDF com paginação correta
+    Valores derivados do DocumentoRelatorio exibidos na aba Relatório (tabela de notas e
+    parecer), recalculados só quando o documento muda: documento_relatorio devolve o
+    mesmo objeto enquanto o conteúdo do relatório não muda.
     """
-    doc = SimpleDocTemplate(
-        caminho_saida, 
-        pagesize=A4, 
-        topMargin=0.5*inch, 
-        bottomMargin=1.0*inch,
-        leftMargin=0.6*inch, 
-        rightMargin=0.6*inch,
-        canvasmaker=NumberedCanvas
-    )
-    story = []
-    
-    styles = getSampleStyleSheet()
-    
-    titulo_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=11,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=8,
-        spaceBefore=0,
-        alignment=0,
-        bold=True,
-        keepWithNext=True
-    )
+    cache = st.session_state.get('cache_relatorio')
+    if cache is not None and cache['documento'] is documento:
+        return cache
+    
+    import pandas as pd
+    
+    resumo_data = [
+        {
+            "Dimensão": secao.dimensao,
+            "Nota Máxima": f"{secao.nota_maxima:.1f}",
+            "Nota Atribuída": f"{secao.nota:.1f}"
+        }
+        for secao in documento.secoes
+    ]
+    cache = {
+        'documento': documento,
+        'df_resumo': pd.DataFrame(resumo_data),
+        'parecer_resumido': texto_parecer(documento)
+    }
+    st.session_state.cache_relatorio = cache
+    return cache
+
+def dados_pdf_da_sessao():
+    """Dicionário esperado por gerar_pdf_relatorio, a partir da avaliação da sessão"""
+    return {
+        'curso': st.session_state.curso,
+        'lider': st.session_state.lider,
+        'pim': st.session_state.pim,
+        'empresa': st.session_state.empresa,
+        'professor': st.session_state.professor,
+        'data_avaliacao': st.session_state.data_avaliacao.strftime("%d/%m/%Y"),
+        'avaliacoes': avaliacoes_como_dict(st.session_state.avaliacoes, st.session_state.rubrica),
+        'notas_tabela': notas_de(st.session_state.avaliacoes),
+        'recomendacoes_selecionadas': st.session_state.recomendacoes_selecionadas,
+        'comentarios_adicionais': st.session_state.get('comentarios_adicionais', ''),
+        'parte_oral': st.session_state.parte_oral,
+        'justificativa_oral': st.session_state.justificativa_oral
+    }
+
+@cronometrado("relatório: chave do pdf")
+def chave_pdf_da_sessao(dados_pdf=None):
+    """Hash do conteúdo do relatório (chave do cache de PDFs): muda quando o PDF mudaria"""
+    return chave_relatorio(dados_pdf if dados_pdf is not None else dados_pdf_da_sessao())
+
+@st.fragment
+@cronometrado("relatório")
+def renderizar_relatorio():
+    """Aba Relatório; o botão de PDF reexecuta só esta aba"""
+    curso = st.session_state.curso
+    lider = st.session_state.lider
+    pim = st.session_state.pim
+    empresa = st.session_state.empresa
+    data_avaliacao = st.session_state.data_avaliacao
+    rubrica = st.session_state.rubrica
+    dados_pdf = dados_pdf_da_sessao()
+    chave_pdf = chave_pdf_da_sessao(dados_pdf)
+    documento = documento_relatorio(dados_pdf, chave_pdf)
+    resumo = resumo_relatorio(documento)
     
-    section_style = ParagraphStyle(
-        'SectionTitle',
-        parent=styles['Heading2'],
-        fontSize=10,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=4,
-        spaceBefore=8,
-        bold=True,
-        keepWithNext=True
+    # Título customizado com cor e ícone diferente
+    st.markdown(
+        "<h1 style='color: #2ca02c; font-size: 28px;'>📋 Relatório</h1>",
+        unsafe_allow_html=True
     )
     
-    normal_style = ParagraphStyle(
-        'Normal',
-        parent=styles['Normal'],
-        fontSize=8,
-        spaceAfter=2,
-        leading=10
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Curso", curso)
+    with col2:
+        st.metric("Líder", lider)
+    with col3:
+        st.metric("Empresa", empresa if empresa else "N/A")
+    with col4:
+        st.metric("Data", data_avaliacao.strftime("%d/%m/%Y"))
+    
+    st.divider()
+    
+    st.subheader("Notas por Dimensão")
+    
+    st.dataframe(resumo['df_resumo'], width="stretch", hide_index=True)
+    
+    st.divider()
+    st.subheader("Cálculo de Notas")
+    
+    nota_maxima_total = rubrica.nota_maxima_escrita + rubrica.nota_maxima_oral
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Nota Objetiva", f"{documento.nota_objetiva:.1f}/{documento.nota_maxima_objetiva:.1f}")
+    with col2:
+        st.metric(f"Nota Ponderada ({round(rubrica.fator_escrita * 100, 1):g}%)",
+                  f"{documento.nota_ponderada:.2f}/{rubrica.nota_maxima_escrita:.1f}")
+    with col3:
+        st.metric("Nota Oral", f"{documento.parte_oral:.1f}/{rubrica.nota_maxima_oral:.1f}")
+    with col4:
+        st.metric("Nota Total", f"{documento.nota_total:.2f}/{nota_maxima_total:.1f}", delta=None)
+    
+    st.divider()
+    st.subheader("📋 Avaliações Realizadas (Espelho do PDF)")
+    
+    for secao in documento.secoes:
+        with st.expander(f"{secao.numero}. {secao.titulo}"):
+            st.write(f"**Nota:** {secao.nota:.1f}/{secao.nota_maxima}")
+            
+            if secao.observacoes:
+                st.write("**Observações:**")
+                for obs in secao.observacoes:
+                    st.write(f"• {obs}")
+            
+            if secao.comentario:
+                st.write("**Comentários do Professor:**")
+                for linha in secao.linhas_comentario:
+                    st.write(f"• {linha}")
+            
+            if not secao.observacoes and not secao.comentario:
+                st.write("*Sem comentários*")
+    
+    st.divider()
+    st.subheader("💡 Recomendações Gerais para Aprimoramento")
+    selecionadas = st.session_state.recomendacoes_selecionadas
+    opcoes = motor_da_sessao().opcoes
+    st.session_state.campo_recomendacoes = list(selecionadas)
+    st.multiselect(
+        "Recomendações do relatório",
+        opcoes + [rec for rec in selecionadas if rec not in opcoes],  # ex.: de um backup com outra rubrica
+        key="campo_recomendacoes",
+        on_change=escolher_recomendacoes,
+        label_visibility="collapsed"
     )
+    if st.session_state.recomendacoes_automaticas:
+        st.caption("Sugeridas a partir das notas e das sugestões marcadas; ao alterar a lista, ela passa a ser a sua escolha.")
+    else:
+        st.button("↩️ Usar as recomendações sugeridas", on_click=usar_recomendacoes_sugeridas)
     
-    # Calcular notas
-    nota_obj, nota_pond = calcular_notas(dados['notas_tabela'])
+    st.divider()
+    st.subheader("📝 Parecer Resumido (texto para ser inserido nos comentários da plataforma do PIM)")
     
-    # ========== CAPA ==========
-    story.append(Paragraph("RELATÓRIO DE AVALIAÇÃO DO PIM", titulo_style))
-    story.append(Spacer(1, 0.05*inch))
+    st.info(resumo['parecer_resumido'])
     
-    # ========== SEÇÃO I - IDENTIFICAÇÃO ==========
-    story.append(Paragraph("I. Identificação", section_style))
+    st.divider()
+    if st.button("💾 Gerar PDF", type="primary", width="stretch"):
+        nome_pdf = f"PIM_{pim}_{empresa.replace(' ', '_')}_{lider.replace(' ', '_')}.pdf"
+        st.session_state.pop('erro_pdf', None)
+        pdf = obter_cache_pdf().obter(chave_pdf)
+        if pdf is not None:
+            # Mesmo conteúdo de um PDF já gerado (por esta ou outra sessão): sem passar pela fila
+            st.session_state.pdf_gerado = {'chave': chave_pdf, 'nome': nome_pdf, 'pdf': pdf}
+        else:
+            st.session_state.pedido_pdf = {
+                'id': obter_fila_pdf().enviar(st.session_state.id_sessao, dados_pdf, chave_pdf, documento),
+                'chave': chave_pdf,
+                'nome': nome_pdf
+            }
     
-    ident_text = f"""
-    <b>Curso:</b> {dados.get('curso', '')}<br/>
-    <b>PIM:</b> {dados.get('pim', '')}<br/>
-    <b>Líder:</b> {dados.get('lider', '')}<br/>
-    <b>Organização/Empresa:</b> {dados.get('empresa', '')}<br/>
-    <b>Professor responsável:</b> {dados.get('professor', '')}<br/>
-    <b>Data da avaliação:</b> {dados.get('data_avaliacao', '')}
-    """
-    story.append(Paragraph(ident_text, normal_style))
-    story.append(Spacer(1, 0.08*inch))
+    if st.session_state.get('pedido_pdf') is not None:
+        acompanhar_pedido_pdf()
     
-    # ========== SEÇÃO II - DIMENSÕES DE AVALIAÇÃO ==========
-    story.append(Paragraph("II. Dimensões de Avaliação", section_style))
-    story.append(Spacer(1, 0.03*inch))
+    if st.session_state.get('erro_pdf'):
+        st.error(f"❌ Erro ao gerar PDF: {st.session_state.erro_pdf}")
     
-    num_dim = 1
-    for chave_dim, titulo_dim_completo in DIMENSOES_TITULOS.items():
-        story.append(Paragraph(f"II.{num_dim} {titulo_dim_completo}", section_style))
-        
-        resposta = dados['avaliacoes'].get(chave_dim, {})
-        observacoes = resposta.get('observacoes', [])
-        comentario = resposta.get('comentario', '')
-        
-        # Mostrar Observações
-        if observacoes:
-            story.append(Paragraph(f"<b>Observações:</b>", normal_style))
-            observacoes_html = '<br/>'.join([f"• {obs}" for obs in observacoes])
-            story.append(Paragraph(observacoes_html, normal_style))
-        
-        # Mostrar Comentários do Professor
-        if comentario:
-            story.append(Paragraph(f"<b>Comentários do Professor:</b>", normal_style))
-            comentario_html = '<br/>'.join([f"• {linha.strip()}" for linha in comentario.split('\n') if linha.strip()])
-            story.append(Paragraph(comentario_html, normal_style))
-        
-        story.append(Spacer(1, 0.04*inch))
-        num_dim += 1
-    
-    # ========== SEÇÃO III - TABELA DE AVALIAÇÃO ==========
-    story.append(Paragraph("III. Tabela de Avaliação", section_style))
-    
-    table_data = [["Dimensão Avaliada", "Nota Máxima", "Nota Atribuída"]]
-    
-    for dimensao, nota_maxima in DIMENSOES.items():
-        resposta = dados['avaliacoes'].get(dimensao, {})
-        nota_atribuida = resposta.get('nota', 0)
-        dim_tabela = dimensao if "(" not in dimensao else dimensao[:dimensao.index("(")].strip()
-        table_data.append([dim_tabela, str(nota_maxima), f"{nota_atribuida:.1f}"])
-    
-    table_avaliacao = Table(table_data, colWidths=[3.5*inch, 1.0*inch, 1.2*inch])
-    table_avaliacao.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#d3d3d3')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('TOPPADDING', (0, 0), (-1, 0), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#000000')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4)
-    ]))
-    story.append(table_avaliacao)
-    story.append(Spacer(1, 0.08*inch))
-    
-    # ========== SEÇÃO IV - RECOMENDAÇÕES GERAIS ==========
-    recomendacoes = dados.get('recomendacoes_selecionadas', [])
-    comentarios_adicionais = dados.get('comentarios_adicionais', '').strip()
-    
-    if recomendacoes or comentarios_adicionais:
-        story.append(Paragraph("IV. Recomendações Gerais para Aprimoramento", section_style))
-        
-        if recomendacoes:
-            for i, rec in enumerate(recomendacoes, 1):
-                story.append(Paragraph(f"• {rec}", normal_style))
-        
-        if comentarios_adicionais:
-            story.append(Spacer(1, 0.03*inch))
-            story.append(Paragraph("<b>Notas Adicionais:</b>", normal_style))
-            comentarios_formatado = comentarios_adicionais.replace('\n', '<br/>')
-            story.append(Paragraph(f"{comentarios_formatado}", normal_style))
-        
-        story.append(Spacer(1, 0.08*inch))
+    # O PDF pronto continua disponível nos reruns, enquanto a avaliação não mudar
+    pdf_gerado = st.session_state.get('pdf_gerado')
+    if pdf_gerado is not None and pdf_gerado['chave'] == chave_pdf:
+        st.success("✅ PDF gerado com sucesso!")
+        st.download_button(
+            label="📥 Baixar PDF",
+            data=pdf_gerado['pdf'],
+            file_name=pdf_gerado['nome'],
+            mime="application/pdf",
+            on_click="ignore",
+            width="stretch"
+        )
     
-    # ========== SEÇÃO IV - PARECER RESUMIDO ==========
-    story.append(Paragraph("IV. Parecer Resumido", section_style))
+    estatisticas = obter_cache_pdf().estatisticas()
+    acertos = estatisticas['acertos_memoria'] + estatisticas['acertos_disco']
+    if acertos + estatisticas['faltas']:
+        st.caption(
+            f"♻️ Cache de PDFs: {acertos} reaproveitados, {estatisticas['faltas']} gerados "
+            f"({estatisticas['taxa_acerto']:.0%} de acerto, {estatisticas['bytes_memoria'] / 2**20:.1f} MiB em memória)"
+        )
+
+@st.fragment(run_every=1)
+@cronometrado("pdf: acompanhar pedido")
+def acompanhar_pedido_pdf():
+    """Consulta a cada segundo o PDF pedido à fila; ao terminar, guarda o resultado e reexecuta o app"""
+    pedido = st.session_state.get('pedido_pdf')
+    if pedido is None:
+        return
+    fila = obter_fila_pdf()
+    trabalho = fila.consultar(pedido['id'])
     
-    parecer_dados = {
-        'avaliacoes': dados['avaliacoes'],
-        'notas_tabela': dados['notas_tabela'],
-        'parte_oral': dados['parte_oral'],
-        'justificativa_oral': dados['justificativa_oral']
-    }
-    parecer_texto = gerar_parecer_resumido(parecer_dados)
-    story.append(Paragraph(parecer_texto, normal_style))
-    story.append(Spacer(1, 0.08*inch))
-    
-    # ========== SEÇÃO V - NOTAS ATRIBUÍDAS ==========
-    story.append(Paragraph("V. Notas Atribuídas", section_style))
-    
-    # Calcular notas para exibição
-    parte_oral = dados.get('parte_oral', 0.0)
-    nota_total = nota_pond + parte_oral
-    
-    notas_resumo = f"""
-    <b>Nota Objetiva:</b> {nota_obj:.1f}/10.0 (nota atribuída considerando o trabalho avaliado em uma escala de 0,0 a 10,0).<br/>
-    <b>Nota Ponderada (70%):</b> {nota_pond:.2f}/7.0 (esta nota considera a avaliação escrita, que corresponde a 70% da nota total do PIM).<br/>
-    <b>Nota Oral:</b> {parte_oral:.1f}/3.0 (nota correspondente à avaliação da apresentação oral, via seminário ou feira acadêmica).<br/>
-    <b>Nota Total:</b> {nota_total:.2f}/10.0 (nota efetivamente lançada em sistema acadêmico).
+    if trabalho is None:
+        st.session_state.pedido_pdf = None
+        st.session_state.erro_pdf = "o pedido expirou, clique em Gerar PDF novamente"
+    elif not trabalho.terminado:
+        posicao = fila.posicao(trabalho.id)
+        st.info("⏳ Gerando o PDF..." if posicao == 0 else f"⏳ PDF na fila de geração ({posicao}º)...")
+        return
+    else:
+        fila.retirar(trabalho.id)
+        st.session_state.pedido_pdf = None
+        if trabalho.erro:
+            st.session_state.erro_pdf = trabalho.erro
+        else:
+            st.session_state.pdf_gerado = {'chave': pedido['chave'], 'nome': pedido['nome'], 'pdf': trabalho.pdf}
+            desempenho.registrar("pdf: espera na fila", (trabalho.iniciado_em - trabalho.enviado_em) * 1000)
+            desempenho.registrar("pdf: geração", (trabalho.concluido_em - trabalho.iniciado_em) * 1000)
+    st.rerun()
+
+@cronometrado("turma: pdf único")
+def pdf_da_turma(curso, pim):
+    """
+    Arquivo temporário com o PDF único (sumário e relatórios) das avaliações
+    gravadas de um curso e PIM, lidas do banco em fluxo (gerado só ao baixar)
     """
-    story.append(Paragraph(notas_resumo, normal_style))
+    from sata.pdf import gerar_pdf_turma
+    armazem = obter_armazem()
+    
+    def abrir_relatorios():
+        return (dados_pdf_de_progresso(estado) for _, estado in armazem.iterar_avaliacoes()
+                if estado.get('curso') == curso and estado.get('pim') == pim)
     
-    # Build PDF
-    doc.build(story)
+    arquivo = tempfile.TemporaryFile()
+    gerar_pdf_turma(abrir_relatorios, arquivo, titulo=f"Relatórios de Avaliação do PIM — {curso}, PIM {pim}")
+    arquivo.seek(0)
+    return arquivo
 
+AGRUPAMENTOS_PAINEL = {"Curso": "curso", "PIM": "pim", "Turma inteira": None}
+
+@cronometrado("turma: exportar notas")
+def exportar_notas(formato):
+    """
+    Arquivo temporário com as notas finais de todas as avaliações gravadas (ou,
+    em 'jsonl', o diário com as avaliações completas), gerado em fluxo a partir do banco (chamado só quando o professor clica em baixar)
+    """
+    from sata.exportacao import exportar
+    avaliacoes = (estado for _, estado in obter_armazem().iterar_avaliacoes())
+    arquivo = tempfile.TemporaryFile()
+    exportar(avaliacoes, arquivo, formato)
+    arquivo.seek(0)
+    return arquivo
+
+@st.fragment
+@cronometrado("turma")
+def renderizar_painel_turma():
+    """Aba Turma: distribuição das notas e uso das sugestões em todas as avaliações gravadas"""
+    st.markdown(
+        "<h1 style='color: #9467bd; font-size: 28px;'>📈 Turma</h1>",
+        unsafe_allow_html=True
+    )
+    
+    painel = obter_painel()
+    painel.atualizar(obter_armazem())
+    if not len(painel):
+        st.info("Nenhuma avaliação gravada ainda. Elas são salvas automaticamente ao preencher a empresa ou o líder.")
+        return
+    st.caption(f"📊 {len(painel)} avaliações gravadas neste computador")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        agrupamento = st.radio("Agrupar por", list(AGRUPAMENTOS_PAINEL), horizontal=True, key="painel_agrupamento")
+    with col2:
+        dimensao = st.selectbox("Distribuição da nota", ["Nota Total", *DIMENSOES], key="painel_dimensao")
+    por = AGRUPAMENTOS_PAINEL[agrupamento]
+    
+    st.divider()
+    st.subheader("Distribuição das Notas")
+    st.bar_chart(painel.histograma(dimensao, por), x_label="Faixa de nota", y_label="Avaliações", stack=False)
+    st.dataframe(painel.resumo_notas(por), width="stretch")
+    
+    st.divider()
+    st.subheader("Frequência das Sugestões")
+    frequencia = painel.frequencia_sugestoes(por)
+    st.dataframe(
+        frequencia,
+        width="stretch",
+        column_config={
+            coluna: st.column_config.ProgressColumn(coluna, format="percent", min_value=0.0, max_value=1.0)
+            for coluna in frequencia.columns
+        }
+    )
+    
+    st.divider()
+    st.subheader("📤 Exportar Notas")
+    st.caption("Notas finais e parecer resumido de todos os grupos, para lançamento no sistema acadêmico.")
+    formato = st.radio("Formato", ["csv", "xlsx"], format_func=str.upper, horizontal=True, key="formato_exportacao")
+    st.download_button(
+        label="📥 Baixar Notas da Turma",
+        data=lambda: exportar_notas(formato),
+        file_name=f"notas_pim_{datetime.now().strftime('%Y%m%d')}.{formato}",
+        mime="text/csv" if formato == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+        width="stretch"
+    )
+    
+    st.caption("📓 Diário com todas as avaliações, para levar a outro computador (abre em \"Continuar Trabalho Salvo\").")
+    st.download_button(
+        label="📥 Baixar Diário (.jsonl)",
+        data=lambda: exportar_notas("jsonl"),
+        file_name=f"SATA_diario_{datetime.now().strftime('%Y%m%d')}.jsonl",
+        mime="application/jsonl",
+        on_click="ignore",
+        width="stretch"
+    )
+    
+    st.divider()
+    st.subheader("📚 PDF da Turma")
+    st.caption("Relatórios de todos os grupos de um curso e PIM em um único PDF, com sumário.")
+    col1, col2 = st.columns(2)
+    with col1:
+        curso_turma = st.selectbox("Curso", CURSOS[1:], key="turma_pdf_curso")
+    with col2:
+        pim_turma = st.selectbox("PIM", PIMS[1:], key="turma_pdf_pim")
+    st.download_button(
+        label="📥 Baixar PDF da Turma",
+        data=lambda: pdf_da_turma(curso_turma, pim_turma),
+        file_name=f"PIM_{pim_turma}_{curso_turma.replace(' ', '_')}_turma.pdf",
+        mime="application/pdf",
+        on_click="ignore",
+        width="stretch"
+    )
+
+def renderizar_painel_desempenho():
+    """Painel de depuração (com SATA_PERF ligado): tempos por seção dos reruns de todas as sessões"""
+    import pandas as pd
+    monitor = desempenho.MONITOR
+    with st.expander("⏱️ Desempenho"):
+        estatisticas = monitor.estatisticas()
+        if not estatisticas:
+            st.caption("Nenhum rerun medido ainda.")
+            return
+        tabela = pd.DataFrame.from_dict(estatisticas, orient='index').rename(columns={
+            'n': 'medições', 'p50': 'p50 (ms)', 'p95': 'p95 (ms)', 'p99': 'p99 (ms)', 'max': 'máx (ms)'
+        })
+        st.dataframe(tabela.round(1), width="stretch")
+        
+        ultimo = next((r for r in monitor.ultimos_rastros() if r.get('sessao') == st.session_state.id_sessao), None)
+        if ultimo is not None:
+            st.caption(f"Último rerun desta sessão ({ultimo['rerun']}): {ultimo['total_ms']:.0f} ms")
+            if ultimo['secoes']:
+                st.bar_chart(pd.Series(ultimo['secoes'], name="ms"), horizontal=True)
+        if monitor.arquivo is not None:
+            st.caption(f"Rastros em {monitor.arquivo}")
+        if st.button("🧹 Limpar estatísticas", width="stretch"):
+            monitor.limpar()
+
+@cronometrado("rerun completo")
 def main():
+    st.set_page_config(page_title="Avaliador PIM", layout="wide", initial_sidebar_state="expanded")
     st.title("📊 SATA - Sistema de Avaliação de Trabalho Acadêmico")
     
-    with st.sidebar:
+    if 'avaliacoes' not in st.session_state:
+        st.session_state.rubrica = rubrica_de(st.session_state)
+        st.session_state.avaliacoes = nova_avaliacao(st.session_state.rubrica)
+        st.session_state.recomendacoes_selecionadas = []
+        st.session_state.recomendacoes_automaticas = True
+        st.session_state.parte_oral = 0.0
+        st.session_state.justificativa_oral = "Grupo não realizou apresentação"
+        st.session_state.versao_avaliacao = 0
+        st.session_state.grupo_id = None
+        st.session_state.id_sessao = uuid.uuid4().hex
+        st.session_state.abas_montadas = set()
+    
+    aplicar_restauracao_pendente()
+    atualizar_rubrica()
+    # Abas montadas no rerun anterior (os fragmentos reexecutados sozinhos continuam montados)
+    st.session_state.abas_anteriores = st.session_state.abas_montadas
+    st.session_state.abas_montadas = set()
+    
+    with st.sidebar, medir("barra lateral"):
         st.header("📋 Informações do Relatório")
         
-        # Listas de opções
-        cursos = ["Selecionar Curso", "Gestão Financeira", "Gestão RH", "Logística", "Marketing"]
-        pims = ["Selecionar PIM", "I", "II", "III", "IV"]
-
-        professor = st.text_input("Professor", value="")
-        curso = st.selectbox("Curso", cursos, index=0)
-        pim = st.selectbox("PIM", pims, index=0)
-        empresa = st.text_input("Organização/Empresa", value="")
-        lider = st.text_input("Líder", value="")
-        data_avaliacao = st.date_input("Data da Avaliação")
+        professor = st.text_input("Professor", key="professor")
+        curso = st.selectbox("Curso", CURSOS, key="curso")
+        pim = st.selectbox("PIM", PIMS, key="pim")
+        empresa = st.text_input("Organização/Empresa", key="empresa")
+        lider = st.text_input("Líder", key="lider")
+        data_avaliacao = st.date_input("Data da Avaliação", key="data_avaliacao")
+        if len(st.session_state.rubrica.arquivos) > 1:
+            st.caption(f"📐 Rubrica: {st.session_state.rubrica.nome}")
+        erro = erro_rubrica()
+        if erro:
+            st.warning(f"⚠️ Arquivo de rubrica com problema; segue em uso a versão anterior. {erro}")
         
         st.divider()
-        if st.button("🔄 Nova Correção", type="secondary", use_container_width=True):
-            st.session_state.avaliacoes = {dim: {'nota': 0, 'comentario': '', 'observacoes': []} for dim in DIMENSOES.keys()}
+        if st.button("🔄 Nova Correção", type="secondary", width="stretch"):
+            st.session_state.avaliacoes = nova_avaliacao(st.session_state.rubrica)
             st.session_state.parecer_final = ""
-            st.session_state.notas_tabela = {dim: 0 for dim in DIMENSOES.keys()}
             st.session_state.recomendacoes_selecionadas = []
+            st.session_state.recomendacoes_automaticas = True
             st.session_state.comentarios_adicionais = ""
             st.session_state.parte_oral = 0.0
             st.session_state.justificativa_oral = "Grupo não realizou apresentação"
-            st.session_state.reset_counter += 1
+            st.session_state.tipo_discussao = TIPOS_DISCUSSAO[0]
+            st.session_state.versao_avaliacao += 1
+            st.session_state.grupo_id = None
+            st.session_state.grupo_da_fila = False
+            preencher_todos_widgets()  # as abas ainda não foram montadas neste rerun
             
             st.success("✨ Todos os campos foram zerados! Pronto para o próximo grupo.")
             st.balloons()
@@ -515,35 +883,50 @@ def main():
         
         # ===== PROTEÇÃO DE DADOS =====
         st.markdown("### 💾 Proteção de Dados")
-        st.caption("⚠️ O app pode reiniciar e apagar seus dados. Salve periodicamente!")
+        st.caption("✅ As avaliações são salvas automaticamente neste computador. Use o backup JSON para levá-las a outro lugar.")
+        
+        # Grupos salvos automaticamente
+        grupos_salvos = obter_armazem().listar_grupos(professor or None, limite=100)
+        if grupos_salvos:
+            grupo_escolhido = st.selectbox(
+                "📂 Grupos salvos",
+                grupos_salvos,
+                format_func=_rotulo_grupo,
+                key="grupo_salvo"
+            )
+            if st.button("📂 Abrir Grupo", width="stretch"):
+                agendar_restauracao(obter_armazem().carregar(grupo_escolhido['id']), grupo_escolhido['id'])
+                st.rerun()
         
         # Botão de Salvar
-        if st.button("⬇️ Salvar Trabalho Atual", use_container_width=True, type="primary"):
-            json_backup = salvar_progresso()
+        compactar = st.checkbox("Compactar backup (.json.gz)", key="compactar_backup")
+        if st.button("⬇️ Salvar Trabalho Atual", width="stretch", type="primary"):
+            json_backup = salvar_progresso(compactar)
             lider = st.session_state.get('lider', 'SemNome').replace(' ', '_')
             empresa = st.session_state.get('empresa', 'SemEmpresa').replace(' ', '_')
             timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-            nome_arquivo = f"SATA_{empresa}_{lider}_{timestamp}.json"
+            nome_arquivo = f"SATA_{empresa}_{lider}_{timestamp}.json" + (".gz" if compactar else "")
             
             st.download_button(
                 label="📥 Clique aqui para baixar",
                 data=json_backup,
                 file_name=nome_arquivo,
-                mime="application/json",
-                use_container_width=True
+                mime="application/gzip" if compactar else "application/json",
+                width="stretch"
             )
         
-        # Botão de Carregar
-        arquivo_backup = st.file_uploader(
+        # Botão de Carregar: um ou vários backups, ou um .zip com vários (fila de grupos)
+        arquivos_backup = st.file_uploader(
             "⬆️ Continuar Trabalho Salvo",
-            type=['json'],
-            help="Selecione um arquivo de backup anterior"
+            type=['json', 'gz', 'zip', 'jsonl'],
+            accept_multiple_files=True,
+            help="Selecione um ou mais backups anteriores (.json ou .json.gz), um .zip com vários "
+                 "ou um diário (.jsonl); com mais de um grupo, eles ficam em uma fila para corrigir em sequência"
         )
         
-        if arquivo_backup is not None:
-            if st.button("🔄 Restaurar Dados", use_container_width=True):
-                conteudo = arquivo_backup.read().decode('utf-8')
-                sucesso, mensagem = carregar_progresso(conteudo)
+        if arquivos_backup:
+            if st.button("🔄 Restaurar Dados", width="stretch"):
+                sucesso, mensagem = carregar_backups(arquivos_backup)
                 
                 if sucesso:
                     st.success(mensagem)
@@ -554,9 +937,24 @@ def main():
                 else:
                     st.error(mensagem)
         
+        # Fila de grupos: navegação entre os backups restaurados juntos
+        fila = st.session_state.get('fila_grupos')
+        if fila is not None and len(fila) > 1:
+            st.caption(f"📚 Fila: grupo {fila.posicao + 1} de {len(fila)} — {fila.atual.rotulo}")
+            col_anterior, col_proximo = st.columns(2)
+            col_anterior.button("⬅️ Anterior", on_click=abrir_na_fila, args=(fila.posicao - 1,),
+                                disabled=not fila.tem_anterior(), width="stretch")
+            col_proximo.button("Próximo ➡️", on_click=abrir_na_fila, args=(fila.posicao + 1,),
+                               disabled=not fila.tem_proximo(), width="stretch")
+        falhas = st.session_state.get('falhas_fila')
+        if falhas:
+            with st.expander(f"⚠️ {len(falhas)} backup(s) inválido(s), fora da fila"):
+                for nome, erro in falhas:
+                    st.caption(f"**{nome}**: {erro}")
+        
         st.divider()
     
-    tab_inicio, tab_apresentacao, tab_introducao, tab_desenvolvimento, tab_discussao, tab_conclusao, tab_referencias, tab_parte_oral, tab_relatorio = st.tabs([
+    tab_inicio, tab_apresentacao, tab_introducao, tab_desenvolvimento, tab_discussao, tab_conclusao, tab_referencias, tab_parte_oral, tab_relatorio, tab_turma = st.tabs([
         "🏠 Início",
         "📄 Apresentação",
         "📖 Introdução", 
@@ -565,311 +963,77 @@ def main():
         "✅ Conclusão",
         "📚 Referências",
         "🎤 Parte Oral",
-        "📋 Relatório"
-    ])
-    
-    if 'avaliacoes' not in st.session_state:
-        st.session_state.avaliacoes = {dim: {'nota': 0, 'comentario': '', 'observacoes': []} for dim in DIMENSOES.keys()}
-        st.session_state.notas_tabela = {dim: 0 for dim in DIMENSOES.keys()}
-        st.session_state.recomendacoes_selecionadas = []
-        st.session_state.parte_oral = 0.0
-        st.session_state.justificativa_oral = "Grupo não realizou apresentação"
-        st.session_state.reset_counter = 0
+        "📋 Relatório",
+        "📈 Turma"
+    ], key="aba", on_change="rerun")
+    # Só a aba aberta é montada: trocar de aba reexecuta o app, e o rerun custa uma
+    # seção, não todas. As abas fechadas não perdem nada: o estado fica na avaliação
+    # da sessão (sata.avaliacao), que alimenta os totais, e volta aos widgets ao reabrir.
     
     # ========== ABA INÍCIO ==========
-    with tab_inicio:
-        st.markdown("""
-        ### 👋 Bem-vindo ao SATA!
+    if tab_inicio.open:
+        with tab_inicio:
+            st.markdown("""
+            ### 👋 Bem-vindo ao SATA!
         
-        Este sistema foi desenvolvido para facilitar e padronizar a avaliação do **Projeto Integrado Multidisciplinar (PIM)**.
+            Este sistema foi desenvolvido para facilitar e padronizar a avaliação do **Projeto Integrado Multidisciplinar (PIM)**.
         
-        ---
+            ---
         
-        #### 📋 Como usar:
+            #### 📋 Como usar:
         
-        1. **Preencha os dados na Barra Lateral** (Professor, Curso, PIM, Organização/Empresa, Líder e Data).
-        2. **Acesse cada aba** para realizar a avaliação do trabalho.
-        3. **Aba Parte Oral** - Registre a nota da apresentação.
-        4. **Aba Relatório** - Visualize o resumo completo e gere o PDF.
+            1. **Preencha os dados na Barra Lateral** (Professor, Curso, PIM, Organização/Empresa, Líder e Data).
+            2. **Acesse cada aba** para realizar a avaliação do trabalho.
+            3. **Aba Parte Oral** - Registre a nota da apresentação.
+            4. **Aba Relatório** - Visualize o resumo completo e gere o PDF.
+            5. **Aba Turma** - Acompanhe as notas e as sugestões mais marcadas em todas as avaliações salvas, exporte as notas e baixe o PDF único de um curso e PIM.
         
-        ---
+            ---
         
-        #### 💡 Dicas Importantes:
+            #### 💡 Dicas Importantes:
         
-        - ✅ Use o botão **🔄 Nova Correção** na Barra Lateral para limpar os campos e avaliar outro grupo.
-        - 💬 Na aba **Discussão**, escolha entre **Problema (PIM I/II)** ou **Solução (PIM III/IV)** - não é possível preencher ambos.
-        - 📄 O **PDF** é gerado automaticamente com todas as informações.
-        - 📊 As notas são calculadas automaticamente (Escrita 70% + Oral 30%).
+            - ✅ Use o botão **🔄 Nova Correção** na Barra Lateral para limpar os campos e avaliar outro grupo.
+            - 💬 Na aba **Discussão**, escolha entre **Problema (PIM I/II)** ou **Solução (PIM III/IV)** - não é possível preencher ambos.
+            - 📄 O **PDF** é gerado automaticamente com todas as informações.
+            - 📊 As notas são calculadas automaticamente (Escrita 70% + Oral 30%).
         
-        ---
+            ---
         
-        **Dúvidas?** Encaminhe e-mail para rodrigo.marchesin@outlook.com
-        """)
-    
-    # Dicionário com descrições de cada dimensão
-    descricoes_dimensoes = {
-        "Apresentação Geral": "Conformidade com normas ABNT, diagramação e qualidade da apresentação visual.",
-        "Introdução": "Contexto, objetivos e metodologia do trabalho.",
-        "Desenvolvimento": "Integração entre teoria e prática, com dados e visualizações das disciplinas correntes no semestre.",
-        "Discussão": "Análise e identificação do problema ou da proposição de solução.",
-        "Conclusão": "Síntese dos achados e contribuições do trabalho.",
-        "Referências e Citações": "Padronização das referências conforme normas ABNT."
-    }
+            **Dúvidas?** Encaminhe e-mail para rodrigo.marchesin@outlook.com
+            """)
     
-    # Função para renderizar uma dimensão
-    def renderizar_dimensao(tab, dimensao, nota_maxima):
-        with tab:
-            st.markdown(
-                f"<h1 style='color: #1f77b4; font-size: 28px;'>✍️ {dimensao}</h1>",
-                unsafe_allow_html=True
-            )
-            # Adicionar subtítulo explicativo
-            st.caption(f"📋 {descricoes_dimensoes.get(dimensao, '')}")
-            st.divider()
-            
-            # Verificar se é Discussão (com grupos Problema/Solução)
-            if dimensao == "Discussão" and isinstance(SUGESTOES_BANCO.get(dimensao), dict):
-                st.write("**Escolha qual aspecto será abordado:**")
-                
-                # Radio buttons para escolher entre Problema ou Solução
-                tipo_discussao = st.radio(
-                    "Tipo de Discussão",
-                    options=["Problema (PIM I ou II)", "Solução (PIM III ou IV)"],
-                    horizontal=True,
-                    key=f"tipo_discussao_{st.session_state.reset_counter}",
-                    label_visibility="collapsed"
-                )
-                
-                st.divider()
-                st.write("**Selecione as sugestões aplicáveis:**")
-                
-                selecionadas = []
-                
-                # Renderizar apenas o grupo escolhido
-                if tipo_discussao == "Problema (PIM I ou II)":
-                    st.write("🔴 **Problema:**")
-                    for i, sugestao in enumerate(SUGESTOES_BANCO[dimensao]["Problema (para PIM I ou PIM II)"]):
-                        if st.checkbox(sugestao, key=f"sug_{dimensao}_problema_{i}_{st.session_state.reset_counter}"):
-                            selecionadas.append(f"[Problema] {sugestao}")
-                else:
-                    st.write("🟢 **Solução:**")
-                    for i, sugestao in enumerate(SUGESTOES_BANCO[dimensao]["Solução (para PIM III ou PIM IV)"]):
-                        if st.checkbox(sugestao, key=f"sug_{dimensao}_solucao_{i}_{st.session_state.reset_counter}"):
-                            selecionadas.append(f"[Solução] {sugestao}")
-            else:
-                # Renderização normal para outras dimensões
-                sugestoes = SUGESTOES_BANCO.get(dimensao, [])
-                st.write("**Selecione as sugestões aplicáveis:**")
-                
-                selecionadas = []
-                for i, sugestao in enumerate(sugestoes):
-                    if st.checkbox(sugestao, key=f"sug_{dimensao}_{i}_{st.session_state.reset_counter}"):
-                        selecionadas.append(sugestao)
-            
-            st.divider()
-            comentario_custom = st.text_area(
-                "Ou escreva um comentário customizado",
-                value="",
-                height=60,
-                key=f"comentario_{dimensao}_{st.session_state.reset_counter}",
-                placeholder="Digite aqui comentários adicionais..."
-            )
-            
-            # Salvar separado: observações e comentários do professor
-            st.session_state.avaliacoes[dimensao]['observacoes'] = selecionadas
-            st.session_state.avaliacoes[dimensao]['comentario'] = comentario_custom
-            
-            st.divider()
-            col1, col2 = st.columns(2)
-            with col1:
-                nota = st.number_input(
-                    f"Nota para {dimensao}",
-                    min_value=0.0,
-                    max_value=nota_maxima,
-                    step=0.1,
-                    key=f"nota_{dimensao}_{st.session_state.reset_counter}"
-                )
-                st.session_state.avaliacoes[dimensao]['nota'] = nota
-                st.session_state.notas_tabela[dimensao] = nota
-            
-            with col2:
-                st.metric("Nota máxima", nota_maxima)
-    
-    # Renderizar cada dimensão em sua aba
-    renderizar_dimensao(tab_apresentacao, "Apresentação Geral", DIMENSOES["Apresentação Geral"])
-    renderizar_dimensao(tab_introducao, "Introdução", DIMENSOES["Introdução"])
-    renderizar_dimensao(tab_desenvolvimento, "Desenvolvimento", DIMENSOES["Desenvolvimento"])
-    renderizar_dimensao(tab_discussao, "Discussão", DIMENSOES["Discussão"])
-    renderizar_dimensao(tab_conclusao, "Conclusão", DIMENSOES["Conclusão"])
-    renderizar_dimensao(tab_referencias, "Referências e Citações", DIMENSOES["Referências e Citações"])
-    
-    # Aba Parte Oral
-    with tab_parte_oral:
-        st.markdown(
-            "<h1 style='color: #ff6b6b; font-size: 28px;'>🎤 Parte Oral</h1>",
-            unsafe_allow_html=True
-        )
-        
-        # Calcular nota ponderada da parte escrita
-        nota_objetiva = sum(st.session_state.notas_tabela.values())
-        nota_ponderada_escrita = nota_objetiva * 0.70
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Parte Escrita (Ponderada)", f"{nota_ponderada_escrita:.1f}/7.0")
-        
-        st.divider()
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            parte_oral = st.number_input(
-                "Parte Oral",
-                min_value=0.0,
-                max_value=3.0,
-                step=0.1,
-                key=f"parte_oral_{st.session_state.reset_counter}"
-            )
-            st.session_state.parte_oral = parte_oral
-        
-        with col2:
-            justificativa = st.selectbox(
-                "Justificativa",
-                ["Grupo não realizou apresentação", "Grupo aguardando para realizar apresentação", "Apresentação realizada"],
-                key=f"justificativa_oral_{st.session_state.reset_counter}"
-            )
-            st.session_state.justificativa_oral = justificativa
-    
-    # Aba Relatório (com o conteúdo que era antes na aba Resumo)
-    with tab_relatorio:
-        # Título customizado com cor e ícone diferente
-        st.markdown(
-            "<h1 style='color: #2ca02c; font-size: 28px;'>📋 Relatório</h1>",
-            unsafe_allow_html=True
-        )
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Curso", curso)
-        with col2:
-            st.metric("Líder", lider)
-        with col3:
-            st.metric("Empresa", empresa if empresa else "N/A")
-        with col4:
-            st.metric("Data", data_avaliacao.strftime("%d/%m/%Y"))
-        
-        st.divider()
-        
-        st.subheader("Notas por Dimensão")
-        
-        resumo_data = []
-        for dimensao, nota_maxima in DIMENSOES.items():
-            nota_atribuida = st.session_state.notas_tabela[dimensao]
-            resumo_data.append({
-                "Dimensão": dimensao,
-                "Nota Máxima": f"{nota_maxima:.1f}",
-                "Nota Atribuída": f"{nota_atribuida:.1f}"
-            })
-        
-        df_resumo = pd.DataFrame(resumo_data)
-        
-        st.dataframe(df_resumo, use_container_width=True, hide_index=True)
-        
-        st.divider()
-        st.subheader("Cálculo de Notas")
-        
-        nota_obj, nota_pond = calcular_notas(st.session_state.notas_tabela)
-        nota_total = nota_pond + st.session_state.parte_oral
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Nota Objetiva", f"{nota_obj:.1f}/10.0")
-        with col2:
-            st.metric("Nota Ponderada (70%)", f"{nota_pond:.2f}/7.0")
-        with col3:
-            st.metric("Nota Oral", f"{st.session_state.parte_oral:.1f}/3.0")
-        with col4:
-            st.metric("Nota Total", f"{nota_total:.2f}/10.0", delta=None)
-        
-        st.divider()
-        st.subheader("📋 Avaliações Realizadas (Espelho do PDF)")
-        
-        num_dim = 1
-        for chave_dim, titulo_dim_completo in DIMENSOES_TITULOS.items():
-            with st.expander(f"{num_dim}. {titulo_dim_completo}"):
-                resposta = st.session_state.avaliacoes.get(chave_dim, {})
-                nota = resposta.get('nota', 0)
-                observacoes = resposta.get('observacoes', [])
-                comentario = resposta.get('comentario', '')
-                
-                st.write(f"**Nota:** {nota:.1f}/{DIMENSOES[chave_dim]}")
-                
-                if observacoes:
-                    st.write("**Observações:**")
-                    for obs in observacoes:
-                        st.write(f"• {obs}")
-                
-                if comentario:
-                    st.write("**Comentários do Professor:**")
-                    for linha in comentario.split('\n'):
-                        if linha.strip():
-                            st.write(f"• {linha.strip()}")
-                
-                if not observacoes and not comentario:
-                    st.write("*Sem comentários*")
-            
-            num_dim += 1
-        
-        st.divider()
-        st.subheader("📝 Parecer Resumido (texto para ser inserido nos comentários da plataforma do PIM)")
-        
-        parecer_resumido = gerar_parecer_resumido({
-            'avaliacoes': st.session_state.avaliacoes,
-            'notas_tabela': st.session_state.notas_tabela,
-            'parte_oral': st.session_state.parte_oral,
-            'justificativa_oral': st.session_state.justificativa_oral
-        })
-        st.info(parecer_resumido)
-        
-        st.divider()
-        if st.button("💾 Gerar PDF", type="primary", use_container_width=True):
-            dados_pdf = {
-                'curso': curso,
-                'lider': lider,
-                'pim': pim,
-                'empresa': empresa,
-                'professor': professor,
-                'data_avaliacao': data_avaliacao.strftime("%d/%m/%Y"),
-                'avaliacoes': st.session_state.avaliacoes,
-                'notas_tabela': st.session_state.notas_tabela,
-                'recomendacoes_selecionadas': st.session_state.recomendacoes_selecionadas,
-                'comentarios_adicionais': st.session_state.get('comentarios_adicionais', ''),
-                'parte_oral': st.session_state.parte_oral,
-                'justificativa_oral': st.session_state.justificativa_oral
-            }
-            
-            nome_arquivo = f"PIM_{pim}_{empresa.replace(' ', '_')}_{lider.replace(' ', '_')}.pdf"
-            
-            try:
-                # Criar PDF em memória
-                pdf_buffer = BytesIO()
-                gerar_pdf_relatorio(dados_pdf, pdf_buffer)
-                pdf_buffer.seek(0)
-                pdf_bytes = pdf_buffer.getvalue()
-                
-                st.success(f"✅ PDF gerado com sucesso!")
-                
-                st.download_button(
-                    label="📥 Baixar PDF",
-                    data=pdf_bytes,
-                    file_name=nome_arquivo,
-                    mime="application/pdf",
-                    use_container_width=True
-                )
-                
-            except Exception as e:
-                st.error(f"❌ Erro ao gerar PDF: {str(e)}")
-                import traceback
-                st.error(traceback.format_exc())
+    # Cada aba abaixo é um fragmento (st.fragment): interagir com ela reexecuta só a aba
+    abas_dimensoes = (tab_apresentacao, tab_introducao, tab_desenvolvimento, tab_discussao, tab_conclusao, tab_referencias)
+    for tab_dimensao, (dimensao, nota_maxima) in zip(abas_dimensoes, st.session_state.rubrica.dimensoes.items()):
+        if tab_dimensao.open:
+            with tab_dimensao:
+                renderizar_dimensao(dimensao, nota_maxima)
+    
+    if tab_parte_oral.open:
+        with tab_parte_oral:
+            renderizar_parte_oral()
+    
+    if tab_relatorio.open:
+        with tab_relatorio:
+            renderizar_relatorio()
+    
+    if tab_turma.open:
+        with tab_turma:
+            renderizar_painel_turma()
+    
+    # Gravação automática no banco local, depois que todos os widgets atualizaram o estado
+    atualizar_recomendacoes()
+    autosalvar()
+    
+    # Grupos vizinhos da fila lidos com antecedência, depois de a página já ter sido enviada
+    fila = st.session_state.get('fila_grupos')
+    if fila is not None:
+        with medir("fila de grupos"):
+            fila.preparar_vizinhos(obter_armazem())
+    
+    if desempenho.MONITOR is not None:
+        with st.sidebar:
+            renderizar_painel_desempenho()
 
 
 if __name__ == "__main__":
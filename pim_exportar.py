@@ -0,0 +1,121 @@
+"""
+Exporta as notas finais de todas as avaliações gravadas no banco local do SATA
+em CSV ou XLSX, para lançamento no sistema acadêmico.
+
+Cada linha traz a identificação do grupo, as notas por dimensão, as notas
+objetiva e ponderada, a parte oral, a nota total e o parecer resumido. As
+avaliações são lidas do banco e gravadas no arquivo uma a uma, com memória
+constante independentemente da quantidade de grupos.
+
+As avaliações também podem vir de um diário .jsonl (sata.diario; o registro
+mais recente de cada grupo) em vez do banco, e ser gravadas em um diário
+(-o arquivo.jsonl), com as avaliações completas.
+
+Com --recalcular-recomendacoes, as recomendações de cada avaliação são
+substituídas pelas sugeridas pelas regras atuais da rubrica do seu curso/PIM
+(sata.recomendacoes, em lotes), por exemplo depois de editar as regras no
+meio do semestre. Lidas do banco, as que mudaram também são gravadas nele.
+
+Uso:
+    python pim_exportar.py -o notas.csv
+    python pim_exportar.py -o notas.xlsx --professor "Nome do Professor"
+    python pim_exportar.py -o - --separador ,      (CSV na saída padrão)
+    python pim_exportar.py -o semestre.jsonl       (diário com todas as avaliações)
+    python pim_exportar.py --diario semestre.jsonl -o notas.csv
+    python pim_exportar.py --recalcular-recomendacoes -o semestre.jsonl
+"""
+import argparse
+import sys
+import time
+from itertools import tee
+from pathlib import Path
+
+from sata.armazenamento import ArmazemAvaliacoes, CAMINHO_PADRAO
+from sata.diario import ler_diario
+from sata.exportacao import exportar, FORMATOS_EXPORTACAO
+
+
+def recalcular_recomendacoes(grupos, armazem=None, alteradas=None):
+    """
+    Percorre os estados de grupos ((grupo_id, estado)) com as
+    recomendacoes_selecionadas sugeridas pelas regras da rubrica
+    (sata.recomendacoes.recomendar_em_lotes). Com armazem, grava no banco as
+    que mudaram; alteradas (lista) recebe o grupo_id de cada uma.
+    """
+    from sata.recomendacoes import recomendar_em_lotes  # numpy só é importado quando usado
+
+    grupos, estados = tee(grupos)  # guarda no máximo um lote de grupos à frente
+    for (grupo_id, _), (estado, recomendacoes) in zip(grupos, recomendar_em_lotes(estado for _, estado in estados)):
+        if recomendacoes != estado.get('recomendacoes_selecionadas'):
+            estado['recomendacoes_selecionadas'] = recomendacoes
+            if armazem is not None and grupo_id is not None:
+                armazem.salvar(grupo_id, estado)
+            if alteradas is not None:
+                alteradas.append(grupo_id)
+        yield estado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporta as notas finais das avaliações gravadas no banco local do SATA."
+    )
+    parser.add_argument('-o', '--saida', default='notas_pim.csv',
+                        help="Arquivo .csv, .xlsx ou .jsonl de saída, ou '-' para a saída padrão "
+                             "(padrão: notas_pim.csv)")
+    parser.add_argument('-f', '--formato', choices=FORMATOS_EXPORTACAO,
+                        help="Formato da saída (padrão: pela extensão do arquivo)")
+    parser.add_argument('--banco', default=str(CAMINHO_PADRAO),
+                        help=f"Banco SQLite das avaliações (padrão: {CAMINHO_PADRAO})")
+    parser.add_argument('--diario', help="Lê as avaliações deste diário .jsonl em vez do banco")
+    parser.add_argument('--professor', help="Exporta só as avaliações deste professor")
+    parser.add_argument('--separador', default=';',
+                        help="Separador do CSV (padrão: ';', com decimais com vírgula)")
+    parser.add_argument('--recalcular-recomendacoes', action='store_true',
+                        help="Substitui as recomendações pelas sugeridas pelas regras atuais da rubrica "
+                             "(lidas do banco, grava as que mudaram nele)")
+    args = parser.parse_args(argv)
+
+    extensao = Path(args.saida).suffix.lower().lstrip('.')
+    formato = args.formato or (extensao if extensao in FORMATOS_EXPORTACAO else 'csv')
+    if args.saida == '-' and formato == 'xlsx':
+        parser.error("A saída padrão não aceita XLSX")
+    origem = args.diario or args.banco
+    if not Path(origem).exists():
+        parser.error(f"{'Diário' if args.diario else 'Banco'} não encontrado: {origem}")
+
+    if args.diario:
+        armazem = None
+        grupos = ((None, estado) for estado in ler_diario(args.diario, professor=args.professor))
+    else:
+        armazem = ArmazemAvaliacoes(args.banco)
+        grupos = armazem.iterar_avaliacoes(professor=args.professor)
+    alteradas = []
+    if args.recalcular_recomendacoes:
+        avaliacoes = recalcular_recomendacoes(grupos, armazem, alteradas)
+    else:
+        avaliacoes = (estado for _, estado in grupos)
+
+    inicio = time.perf_counter()
+    try:
+        if args.saida == '-':
+            quantidade = exportar(avaliacoes, sys.stdout.buffer, formato, args.separador)
+        else:
+            with open(args.saida, 'wb') as destino:
+                quantidade = exportar(avaliacoes, destino, formato, args.separador)
+    except ValueError as e:  # registro inválido no diário
+        parser.error(str(e))
+    finally:
+        if armazem is not None:
+            armazem.fechar()
+    duracao = time.perf_counter() - inicio
+
+    if args.saida != '-':
+        print(f"{quantidade} avaliação(ões) exportada(s) em {duracao:.1f}s -> {args.saida}")
+    if args.recalcular_recomendacoes:
+        print(f"{len(alteradas)} avaliação(ões) com recomendações recalculadas"
+              + ("" if args.diario else " (gravadas no banco)"), file=sys.stderr if args.saida == '-' else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Geração em lote dos relatórios PDF a partir dos backups JSON do SATA (.json ou .json.gz).
+
+Lê todos os arquivos gerados por "⬇️ Salvar Trabalho Atual" (salvar_progresso)
+de um diretório ou de um arquivo .zip, gera os relatórios em paralelo em um
+pool de processos e grava os PDFs, à medida que ficam prontos, em um único zip.
+Com --turma, gera em vez disso um único PDF com sumário (sata.pdf.gerar_pdf_turma),
+opcionalmente só de um curso e/ou PIM.
+
+Uso:
+    python pim_lote.py backups/ -o relatorios.zip
+    python pim_lote.py backups.zip -o relatorios.zip --processos 8
+    python pim_lote.py backups/ --turma -o turma.pdf --curso Logística --pim II
+"""
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from io import BytesIO
+from pathlib import Path
+
+from sata import ler_progresso, dados_pdf_de_progresso
+from sata.pdf import gerar_pdf_relatorio, gerar_pdf_turma
+from sata.progresso import EXTENSOES_BACKUP
+
+
+def listar_backups(origem):
+    """Lista os backups (.json ou .json.gz) da origem como pares (origem, nome) em ordem alfabética"""
+    origem = Path(origem)
+    if origem.is_dir():
+        return [(str(origem), str(caminho.relative_to(origem)))
+                for caminho in sorted(origem.rglob('*'))
+                if caminho.name.lower().endswith(EXTENSOES_BACKUP) and caminho.is_file()]
+    if zipfile.is_zipfile(origem):
+        with zipfile.ZipFile(origem) as zf:
+            return [(str(origem), nome) for nome in sorted(zf.namelist())
+                    if nome.lower().endswith(EXTENSOES_BACKUP) and not nome.endswith('/')]
+    raise ValueError(f"Origem inválida (esperado diretório ou .zip): {origem}")
+
+
+def ler_backup(origem, nome):
+    """Lê o conteúdo de um backup, seja de um diretório ou de dentro de um zip"""
+    if os.path.isdir(origem):
+        return Path(origem, nome).read_bytes()
+    with zipfile.ZipFile(origem) as zf:
+        return zf.read(nome)
+
+
+def nome_pdf(dados_pdf):
+    """Nome do arquivo PDF no mesmo padrão do botão "💾 Gerar PDF" """
+    empresa = dados_pdf['empresa'].replace(' ', '_')
+    lider = dados_pdf['lider'].replace(' ', '_')
+    return f"PIM_{dados_pdf['pim']}_{empresa}_{lider}.pdf"
+
+
+def renderizar_backup(origem, nome):
+    """
+    Gera o PDF de um backup (executado nos processos do pool).
+    Retorna (nome_pdf, bytes_pdf) ou levanta a exceção original.
+    """
+    dados_pdf = dados_pdf_de_progresso(ler_progresso(ler_backup(origem, nome)))
+
+    pdf_buffer = BytesIO()
+    gerar_pdf_relatorio(dados_pdf, pdf_buffer)
+    return nome_pdf(dados_pdf), pdf_buffer.getvalue()
+
+
+def _nome_unico(nome, usados):
+    """Evita sobrescrever PDFs de grupos com mesmo PIM/empresa/líder dentro do zip"""
+    base, ext = os.path.splitext(nome)
+    candidato, n = nome, 1
+    while candidato in usados:
+        n += 1
+        candidato = f"{base}_{n}{ext}"
+    usados.add(candidato)
+    return candidato
+
+
+def gerar_lote(origem, saida, processos=None, ao_concluir=None):
+    """
+    Gera os relatórios de todos os backups da origem e grava os PDFs no zip de saída.
+
+    Os PDFs são escritos no zip assim que cada processo termina, e no máximo
+    2 tarefas por processo ficam em andamento, para que a memória não cresça
+    com o tamanho da turma. Falhas em um arquivo não interrompem o lote.
+
+    Retorna (quantidade de PDFs gerados, lista de (nome do backup, mensagem de erro)).
+    """
+    backups = listar_backups(origem)
+    processos = processos or os.cpu_count() or 1
+    limite_pendentes = processos * 2
+
+    gerados = 0
+    falhas = []
+    usados = set()
+
+    with ProcessPoolExecutor(max_workers=processos) as executor, \
+            zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        fila = iter(backups)
+        pendentes = {}
+
+        while True:
+            for origem_backup, nome in fila:
+                futuro = executor.submit(renderizar_backup, origem_backup, nome)
+                pendentes[futuro] = nome
+                if len(pendentes) >= limite_pendentes:
+                    break
+
+            if not pendentes:
+                break
+
+            concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                nome = pendentes.pop(futuro)
+                try:
+                    arquivo_pdf, pdf_bytes = futuro.result()
+                except Exception as e:
+                    falhas.append((nome, f"{type(e).__name__}: {e}"))
+                    erro = falhas[-1][1]
+                else:
+                    zf.writestr(_nome_unico(arquivo_pdf, usados), pdf_bytes)
+                    gerados += 1
+                    erro = None
+
+                if ao_concluir is not None:
+                    ao_concluir(nome, erro)
+
+    return gerados, falhas
+
+
+def gerar_pdf_unico(origem, saida, curso=None, pim=None):
+    """
+    Gera um único PDF com sumário com os relatórios dos backups da origem,
+    filtrados por curso e PIM e ordenados por curso, PIM, empresa e líder.
+
+    Os backups são lidos de novo a cada passada de gerar_pdf_turma, em vez de
+    ficarem todos em memória. Backups ilegíveis ficam de fora do PDF.
+
+    Retorna (quantidade de relatórios, lista de (nome do backup, mensagem de erro)).
+    """
+    selecionados = []
+    falhas = []
+    for origem_backup, nome in listar_backups(origem):
+        try:
+            dados_pdf = dados_pdf_de_progresso(ler_progresso(ler_backup(origem_backup, nome)))
+        except Exception as e:
+            falhas.append((nome, f"{type(e).__name__}: {e}"))
+            continue
+        if (curso is None or dados_pdf['curso'] == curso) and (pim is None or dados_pdf['pim'] == pim):
+            ordem = (dados_pdf['curso'], dados_pdf['pim'], dados_pdf['empresa'].lower(), dados_pdf['lider'].lower())
+            selecionados.append((ordem, origem_backup, nome))
+    selecionados.sort()
+
+    def abrir_relatorios():
+        return (dados_pdf_de_progresso(ler_progresso(ler_backup(origem_backup, nome)))
+                for _, origem_backup, nome in selecionados)
+
+    titulo = "Relatórios de Avaliação do PIM"
+    if curso or pim:
+        titulo += " — " + ", ".join(filter(None, [curso, pim and f"PIM {pim}"]))
+    return gerar_pdf_turma(abrir_relatorios, saida, titulo=titulo), falhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera em lote os relatórios PDF do SATA a partir dos backups JSON."
+    )
+    parser.add_argument('origem', help="Diretório ou arquivo .zip com os backups JSON")
+    parser.add_argument('-o', '--saida', default=None,
+                        help="Arquivo de saída (padrão: relatorios_pim.zip, ou relatorios_pim.pdf com --turma)")
+    parser.add_argument('-p', '--processos', type=int, default=None,
+                        help="Número de processos (padrão: número de núcleos)")
+    parser.add_argument('--turma', action='store_true',
+                        help="Gera um único PDF com sumário em vez do zip com um PDF por grupo")
+    parser.add_argument('--curso', help="Com --turma, só os grupos deste curso")
+    parser.add_argument('--pim', help="Com --turma, só os grupos deste PIM (I, II, III, IV)")
+    args = parser.parse_args(argv)
+
+    if args.turma:
+        saida = args.saida or 'relatorios_pim.pdf'
+        inicio = time.perf_counter()
+        try:
+            gerados, falhas = gerar_pdf_unico(args.origem, saida, args.curso, args.pim)
+        except ValueError as e:
+            parser.error(str(e))
+        for nome, erro in falhas:
+            print(f"❌ {nome}: {erro}", file=sys.stderr)
+        print(f"{gerados} relatório(s) em um único PDF em {time.perf_counter() - inicio:.1f}s -> {saida}")
+        return 1 if falhas else 0
+    if args.curso or args.pim:
+        parser.error("--curso e --pim só valem com --turma")
+    args.saida = args.saida or 'relatorios_pim.zip'
+
+    def ao_concluir(nome, erro):
+        if erro:
+            print(f"❌ {nome}: {erro}", file=sys.stderr)
+        else:
+            print(f"✅ {nome}")
+
+    inicio = time.perf_counter()
+    try:
+        gerados, falhas = gerar_lote(args.origem, args.saida, args.processos, ao_concluir)
+    except ValueError as e:
+        parser.error(str(e))
+    duracao = time.perf_counter() - inicio
+
+    print(f"\n{gerados} relatório(s) gerado(s) em {duracao:.1f}s "
+          f"({gerados / duracao if duracao else 0:.1f} relatórios/s) -> {args.saida}")
+    if falhas:
+        print(f"{len(falhas)} arquivo(s) com erro.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Candidatas a novas sugestões do banco a partir dos comentários customizados
+das avaliações gravadas no banco local do SATA (ou em um diário .jsonl).
+
+Agrupa, por dimensão, os comentários quase iguais (MinHash/LSH,
+sata.agrupamento) e lista cada agrupamento com a variante mais frequente,
+a frequência (grupos avaliados que escreveram algum texto do agrupamento) e
+exemplos das outras variantes, dos mais para os menos frequentes. As
+avaliações de cursos/PIMs com uma variante da rubrica são agrupadas à parte.
+Os agrupamentos que já correspondem a uma sugestão da rubrica do curso/PIM
+(com as sugestões extras da variante) ficam de fora (--incluir-banco para listá-los).
+
+Sem -o, mostra as candidatas na tela; com -o, grava CSV ou JSON (pela
+extensão), com todos os exemplos.
+
+Uso:
+    python pim_sugestoes.py
+    python pim_sugestoes.py --diario semestre.jsonl --minimo 5 -o candidatas.csv
+    python pim_sugestoes.py --dimensao Introdução --limiar 0.6 -o candidatas.json
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from sata.agrupamento import LIMIAR_SIMILARIDADE, candidatas_sugestoes, contar_comentarios
+from sata.armazenamento import ArmazemAvaliacoes, CAMINHO_PADRAO
+from sata.diario import ler_diario
+
+# Exemplos por candidata na tela (o CSV e o JSON têm todos)
+EXEMPLOS_NA_TELA = 3
+
+
+def gravar_csv(candidatas, destino):
+    escritor = csv.writer(destino, delimiter=';')
+    escritor.writerow(['Dimensão', 'Rubrica', 'Frequência', 'Variantes', 'Sugestão', 'Já no banco', 'Exemplos'])
+    for candidata in candidatas:
+        escritor.writerow([candidata.dimensao, candidata.rubrica, candidata.frequencia, candidata.variantes,
+                           candidata.texto, 'sim' if candidata.no_banco else 'não', ' | '.join(candidata.exemplos)])
+
+
+def mostrar(candidatas, limite):
+    varias_rubricas = len({candidata.rubrica for candidata in candidatas}) > 1
+    for dimensao, rubrica in dict.fromkeys((candidata.dimensao, candidata.rubrica) for candidata in candidatas):
+        da_dimensao = [candidata for candidata in candidatas
+                       if (candidata.dimensao, candidata.rubrica) == (dimensao, rubrica)][:limite]
+        print(f"\n== {dimensao}" + (f" ({rubrica})" if varias_rubricas else "") + " ==")
+        for candidata in da_dimensao:
+            marca = " (já no banco)" if candidata.no_banco else ""
+            print(f"{candidata.frequencia:>6}  {candidata.texto}{marca}")
+            for exemplo in candidata.exemplos[:EXEMPLOS_NA_TELA]:
+                print(f"{'':>8}~ {exemplo}")
+            if candidata.variantes > EXEMPLOS_NA_TELA + 1:
+                print(f"{'':>8}  (+{candidata.variantes - EXEMPLOS_NA_TELA - 1} variantes)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Lista comentários customizados recorrentes como candidatas a novas sugestões do banco."
+    )
+    parser.add_argument('-o', '--saida', help="Arquivo .csv ou .json de saída (padrão: mostra na tela)")
+    parser.add_argument('--banco', default=str(CAMINHO_PADRAO),
+                        help=f"Banco SQLite das avaliações (padrão: {CAMINHO_PADRAO})")
+    parser.add_argument('--diario', help="Lê as avaliações deste diário .jsonl em vez do banco")
+    parser.add_argument('--professor', help="Só as avaliações deste professor")
+    parser.add_argument('--dimensao', help="Só os comentários desta dimensão")
+    parser.add_argument('--minimo', type=int, default=3,
+                        help="Frequência mínima de uma candidata (padrão: 3)")
+    parser.add_argument('--limiar', type=float, default=LIMIAR_SIMILARIDADE,
+                        help=f"Similaridade mínima entre comentários do mesmo agrupamento, de 0 a 1 "
+                             f"(padrão: {LIMIAR_SIMILARIDADE})")
+    parser.add_argument('--incluir-banco', action='store_true',
+                        help="Lista também os agrupamentos que já correspondem a uma sugestão da rubrica")
+    parser.add_argument('--limite', type=int, default=20, help="Candidatas por dimensão na tela (padrão: 20)")
+    args = parser.parse_args(argv)
+
+    if args.saida and Path(args.saida).suffix.lower() not in ('.csv', '.json'):
+        parser.error("A saída deve ser .csv ou .json")
+    if not 0 < args.limiar <= 1:
+        parser.error("O limiar deve estar entre 0 e 1")
+    origem = args.diario or args.banco
+    if not Path(origem).exists():
+        parser.error(f"{'Diário' if args.diario else 'Banco'} não encontrado: {origem}")
+
+    inicio = time.perf_counter()
+    armazem = None
+    try:
+        if args.diario:
+            avaliacoes = ler_diario(args.diario, professor=args.professor)
+        else:
+            armazem = ArmazemAvaliacoes(args.banco)
+            avaliacoes = (estado for _, estado in armazem.iterar_avaliacoes(professor=args.professor))
+        contagens = contar_comentarios(avaliacoes)
+    except ValueError as e:  # registro inválido no diário
+        parser.error(str(e))
+    finally:
+        if armazem is not None:
+            armazem.fechar()
+    if args.dimensao:
+        contagens = {rubrica: {args.dimensao: da_rubrica.get(args.dimensao, {})}
+                     for rubrica, da_rubrica in contagens.items()}
+    leitura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    candidatas = candidatas_sugestoes(contagens, minimo=args.minimo, incluir_banco=args.incluir_banco,
+                                      limiar=args.limiar)
+    agrupamento = time.perf_counter() - inicio
+
+    if args.saida is None:
+        mostrar(candidatas, args.limite)
+    elif args.saida.lower().endswith('.csv'):
+        with open(args.saida, 'w', newline='', encoding='utf-8-sig') as destino:
+            gravar_csv(candidatas, destino)
+    else:
+        with open(args.saida, 'w', encoding='utf-8') as destino:
+            json.dump([asdict(candidata) for candidata in candidatas], destino, ensure_ascii=False, indent=2)
+
+    comentarios = sum(sum(contagem.values()) for da_rubrica in contagens.values() for contagem in da_rubrica.values())
+    print(f"\n{len(candidatas)} candidata(s) de {comentarios} comentário(s) "
+          f"(leitura {leitura:.1f}s, agrupamento {agrupamento:.1f}s)" + (f" -> {args.saida}" if args.saida else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
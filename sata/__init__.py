@@ -0,0 +1,26 @@
+"""
+Núcleo do SATA (Sistema de Avaliação de Trabalho Acadêmico), sem dependência do Streamlit.
+
+Rubrica, cálculo de notas, parecer e backup são importados aqui diretamente.
+O relatório PDF fica em sata.pdf e só carrega o ReportLab quando usado:
+"from sata import gerar_pdf_relatorio" (ou sata.gerar_pdf_relatorio) importa
+sata.pdf sob demanda.
+"""
+from sata.rubrica import (
+    SUGESTOES_BANCO, DIMENSOES, DIMENSOES_TITULOS, RECOMENDACOES_GERAIS, Rubrica, obter_rubrica, rubrica_de
+)
+from sata.notas import calcular_notas, gerar_recomendacoes
+from sata.parecer import gerar_parecer_resumido
+from sata.progresso import serializar_progresso, ler_progresso, validar_progresso, dados_pdf_de_progresso
+
+_NOMES_PDF = (
+    'gerar_pdf_relatorio', 'gerar_pdf_turma', 'historia_relatorio', 'modelo_relatorio', 'ModeloRelatorio',
+    'NumberedCanvas', 'CanvasTurma'
+)
+
+
+def __getattr__(nome):
+    if nome in _NOMES_PDF:
+        from sata import pdf
+        return getattr(pdf, nome)
+    raise AttributeError(f"module 'sata' has no attribute '{nome}'")
@@ -0,0 +1,216 @@
+"""
+Agrupamento dos comentários customizados quase iguais, para achar candidatas
+a novas sugestões do banco (SUGESTOES_BANCO / sugestoes_extras da rubrica).
+
+Os comentários são as linhas do comentário de cada dimensão (como em
+sata.comentarios), contadas uma vez por grupo avaliado. Dois comentários
+são quase iguais quando os seus conjuntos de 5-gramas de caracteres (do
+texto normalizado, sem pontuação) têm similaridade de Jaccard de pelo menos
+LIMIAR_SIMILARIDADE.
+
+Para não comparar todos os pares, cada comentário distinto vira uma
+assinatura MinHash de PERMUTACOES valores, e o LSH divide a assinatura em
+BANDAS faixas: só comentários com uma faixa inteira igual são comparados,
+e a ligação só vale se a similaridade estimada pelas assinaturas passar do
+limiar. Os grupos são os componentes conexos dessas ligações. Tudo é feito
+com arrays numpy sobre todos os comentários da dimensão de uma vez (os
+5-gramas de todos os textos, os mínimos por texto, as faixas e os
+componentes), sem laço por comentário.
+
+Cada grupo vira uma Candidata: o texto mais frequente como sugestão, a
+frequência somada e os demais textos como exemplos. Grupos que contêm uma
+sugestão que a rubrica já tem ficam marcados com no_banco. Os comentários são
+agrupados separadamente por rubrica (a do curso/PIM de cada avaliação,
+sata.rubrica), e cada rubrica confere as suas sugestões, com as extras das variantes.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from sata.comentarios import comentarios_do_estado, normalizar
+from sata.rubrica import rubrica_de
+
+LIMIAR_SIMILARIDADE = 0.5
+PERMUTACOES = 64
+BANDAS = 16  # 4 valores por faixa: pares com Jaccard 0,5 viram candidatos com ~64% de chance por faixa (~100% em 16)
+TAMANHO_GRAMA = 5
+
+_NAO_PALAVRA = re.compile(r'[^\w ]+')
+# Multiplicadores das faixas e da hash dos 5-gramas (ímpares, 64 bits)
+_MISTURA = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93],
+                    dtype=np.uint64)
+_BASE_GRAMA = np.uint64(0x100000001B3)
+
+
+@dataclass
+class Candidata:
+    dimensao: str
+    texto: str  # a variante mais frequente
+    frequencia: int  # grupos avaliados com algum texto do agrupamento
+    variantes: int  # textos distintos (após normalização) no agrupamento
+    exemplos: list = field(default_factory=list)  # outras variantes, das mais frequentes
+    no_banco: bool = False  # o agrupamento contém uma sugestão que a rubrica já tem
+    rubrica: str = ''  # nome da rubrica dos comentários (do curso/PIM das avaliações)
+
+
+def contar_comentarios(estados):
+    """
+    {Rubrica: {dimensão: Counter(comentário)}} das avaliações (formato de
+    ler_progresso), um por grupo, separadas pela rubrica do curso/PIM (rubrica_de)
+    """
+    contagens = {}
+    for estado in estados:
+        da_rubrica = contagens.setdefault(rubrica_de(estado), {})
+        for dimensao, texto in comentarios_do_estado(estado):
+            da_rubrica.setdefault(dimensao, Counter())[texto] += 1
+    return contagens
+
+
+def _chave(texto):
+    return ' '.join(_NAO_PALAVRA.sub(' ', normalizar(texto)).split())
+
+
+# ---------- MinHash ----------
+
+def assinaturas(chaves, permutacoes=PERMUTACOES, semente=0):
+    """
+    Assinaturas MinHash (textos x permutacoes, uint32) dos conjuntos de
+    5-gramas dos textos, todas de uma vez: os textos são concatenados em um
+    só array de bytes, a hash de cada 5-grama é uma soma deslocada do array,
+    e o mínimo de cada texto sai de np.minimum.reduceat.
+    """
+    textos = [f" {chave} ".encode('utf-8').ljust(TAMANHO_GRAMA) for chave in chaves]
+    tamanhos = np.fromiter(map(len, textos), dtype=np.int64, count=len(textos))
+    bytes_ = np.frombuffer(b''.join(textos), dtype=np.uint8).astype(np.uint64)
+
+    # Hash de cada posição: os TAMANHO_GRAMA bytes a partir dela (as que atravessam dois textos são descartadas)
+    posicoes = len(bytes_) - TAMANHO_GRAMA + 1
+    hashes = np.zeros(posicoes, dtype=np.uint64)
+    for deslocamento in range(TAMANHO_GRAMA):
+        hashes = hashes * _BASE_GRAMA + bytes_[deslocamento:deslocamento + posicoes]
+    texto_da_posicao = np.repeat(np.arange(len(textos)), tamanhos)
+    validas = texto_da_posicao[:posicoes] == texto_da_posicao[TAMANHO_GRAMA - 1:]
+    hashes = hashes[validas]
+    inicios = np.concatenate(([0], np.cumsum(tamanhos - TAMANHO_GRAMA + 1)[:-1]))
+
+    # Família multiplicação-deslocamento: (a * x + b) mod 2^64, os 32 bits altos
+    rng = np.random.default_rng(semente)
+    multiplicadores = rng.integers(1, 2**63, permutacoes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    somas = rng.integers(0, 2**63, permutacoes, dtype=np.uint64)
+    resultado = np.empty((len(textos), permutacoes), dtype=np.uint32)
+    for i in range(permutacoes):
+        valores = (hashes * multiplicadores[i] + somas[i]) >> np.uint64(32)
+        resultado[:, i] = np.minimum.reduceat(valores, inicios)
+    return resultado
+
+
+# ---------- LSH e componentes ----------
+
+def _ligacoes(assinatura, bandas, limiar):
+    """Pares (i, j) de textos com uma faixa igual e similaridade estimada >= limiar"""
+    linhas = assinatura.shape[1] // bandas
+    origens, destinos = [], []
+    for banda in range(bandas):
+        faixa = assinatura[:, banda * linhas:(banda + 1) * linhas].astype(np.uint64)
+        chave = np.zeros(len(assinatura), dtype=np.uint64)
+        for coluna in range(linhas):
+            chave = (chave ^ faixa[:, coluna]) * _MISTURA[coluna % len(_MISTURA)]
+        ordem = np.argsort(chave, kind='stable')
+        ordenadas = chave[ordem]
+        # Cada texto liga-se ao primeiro do seu balde
+        novo_balde = np.concatenate(([True], ordenadas[1:] != ordenadas[:-1]))
+        primeiro = ordem[np.maximum.accumulate(np.where(novo_balde, np.arange(len(ordem)), 0))]
+        mesmos = ~novo_balde
+        origens.append(ordem[mesmos])
+        destinos.append(primeiro[mesmos])
+    origens = np.concatenate(origens)
+    destinos = np.concatenate(destinos)
+    if len(origens):
+        # Confirmação: fração de valores iguais nas assinaturas inteiras (estimativa do Jaccard)
+        semelhantes = (assinatura[origens] == assinatura[destinos]).mean(axis=1) >= limiar
+        origens, destinos = origens[semelhantes], destinos[semelhantes]
+    return origens, destinos
+
+
+def componentes(quantidade, origens, destinos):
+    """Rótulo (o menor índice) do componente conexo de cada um dos quantidade nós, pelas ligações"""
+    rotulos = np.arange(quantidade)
+    while True:
+        menores = np.minimum(rotulos[origens], rotulos[destinos])
+        novos = rotulos.copy()
+        np.minimum.at(novos, origens, menores)
+        np.minimum.at(novos, destinos, menores)
+        novos = novos[novos]  # salto de ponteiro: cada nó aponta para o rótulo do seu rótulo
+        if np.array_equal(novos, rotulos):
+            return rotulos
+        rotulos = novos
+
+
+# ---------- candidatas ----------
+
+def agrupar(dimensao, contagem, sugestoes_banco=(), limiar=LIMIAR_SIMILARIDADE, permutacoes=PERMUTACOES,
+            bandas=BANDAS, semente=0):
+    """
+    Candidatas (não ordenadas) dos comentários de uma dimensão, {texto:
+    frequência}. sugestoes_banco: textos das sugestões que a rubrica já tem,
+    agrupados junto para marcar no_banco.
+    """
+    # Textos com a mesma chave normalizada são a mesma variante
+    variantes = {}  # chave -> Counter(texto)
+    for texto, frequencia in contagem.items():
+        variantes.setdefault(_chave(texto), Counter())[texto] += frequencia
+    banco = {_chave(texto) for texto in sugestoes_banco}
+    for chave in banco:
+        variantes.setdefault(chave, Counter())
+    variantes.pop('', None)
+    if not variantes:
+        return []
+
+    chaves = list(variantes)
+    assinatura = assinaturas(chaves, permutacoes, semente)
+    rotulos = componentes(len(chaves), *_ligacoes(assinatura, bandas, limiar))
+
+    # Cada chave vira (frequência, grafia mais usada); as do banco que ninguém escreveu só marcam o grupo
+    grupos, com_banco = {}, set()
+    for chave, rotulo in zip(chaves, rotulos.tolist()):
+        grafias = variantes[chave]
+        if grafias:
+            grupos.setdefault(rotulo, []).append((-sum(grafias.values()), grafias.most_common(1)[0][0]))
+        if chave in banco:
+            com_banco.add(rotulo)
+    candidatas = []
+    for rotulo, membros in grupos.items():
+        membros.sort()  # das variantes mais frequentes; no empate, em ordem alfabética
+        candidatas.append(Candidata(
+            dimensao=dimensao,
+            texto=membros[0][1],
+            frequencia=-sum(frequencia for frequencia, _ in membros),
+            variantes=len(membros),
+            exemplos=[texto for _, texto in membros[1:]],
+            no_banco=rotulo in com_banco
+        ))
+    return candidatas
+
+
+def candidatas_sugestoes(contagens, minimo=3, incluir_banco=False, **parametros):
+    """
+    Candidatas a novas sugestões de todas as rubricas e dimensões de contagens
+    (contar_comentarios), das mais para as menos frequentes, só as com
+    frequência >= minimo. Sem incluir_banco, ficam de fora as que a rubrica dos
+    comentários já tem. parametros vão para agrupar().
+    """
+    resultado = []
+    for rubrica, da_rubrica in contagens.items():
+        for dimensao, contagem in da_rubrica.items():
+            sugestoes = rubrica.sugestoes.get(dimensao, [])
+            if isinstance(sugestoes, dict):
+                sugestoes = [texto for grupo in sugestoes.values() for texto in grupo]
+            for candidata in agrupar(dimensao, contagem, sugestoes, **parametros):
+                if candidata.frequencia >= minimo and (incluir_banco or not candidata.no_banco):
+                    candidata.rubrica = rubrica.nome
+                    resultado.append(candidata)
+    resultado.sort(key=lambda candidata: (-candidata.frequencia, candidata.dimensao,
+                                          candidata.rubrica, candidata.texto))
+    return resultado
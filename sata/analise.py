@@ -0,0 +1,305 @@
+"""
+Análise da turma: distribuição das notas e frequência das sugestões do banco
+sobre todas as avaliações gravadas (sata.armazenamento).
+
+As avaliações ficam em uma tabela colunar em memória: arrays numpy com uma
+coluna por dimensão, códigos para curso e PIM e uma matriz booleana
+avaliação x sugestão. Os agregados são calculados com operações vetorizadas
+(numpy/pandas) e ficam em cache até a tabela mudar; atualizar() lê do banco
+apenas os grupos gravados desde a leitura anterior.
+
+Cada linha é gravada com a rubrica do seu curso/PIM (sata.rubrica.rubrica_de):
+as notas máximas das dimensões, a nota total (parte escrita ponderada mais a
+oral) e a nota total máxima ficam na própria linha, e as colunas de sugestões
+são a união dos catálogos das rubricas já vistas (com as sugestões extras das
+variantes). Quando os arquivos de rubrica mudam, atualizar() recalcula esses
+valores das linhas de cada curso/PIM afetado a partir das notas guardadas.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sata.rubrica import obter_rubrica, rubrica_de
+
+AGRUPAMENTOS = ('curso', 'pim')
+
+
+class PainelTurma:
+    """
+    Tabela colunar das avaliações e agregados da turma. Uma instância pode ser
+    compartilhada entre as sessões do Streamlit (st.cache_resource).
+    Os DataFrames retornados ficam em cache e não devem ser alterados.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        # As dimensões são as do padrão, que só mudam reiniciando o app (sata.rubrica)
+        self._dimensoes = list(obter_rubrica().dimensoes)
+        self._linhas = {}  # grupo_id -> linha da tabela
+        self._categorias = {agrupamento: {} for agrupamento in AGRUPAMENTOS}  # valor -> código
+        self._rubricas = {}  # (código do curso, código do PIM) -> versão da rubrica usada nas linhas
+        self._sugestoes = {}  # (dimensão, observação) -> coluna de _selecoes, na ordem em que apareceram
+        self._n = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._codigos = {agrupamento: np.zeros(0, dtype=np.int32) for agrupamento in AGRUPAMENTOS}
+        self._notas = np.zeros((0, len(self._dimensoes)))
+        self._oral = np.zeros(0)
+        self._maximos = np.zeros((0, len(self._dimensoes)))  # nota máxima de cada dimensão na rubrica da linha
+        self._total = np.zeros(0)  # parte escrita ponderada + oral
+        self._total_maximo = np.zeros(0)
+        self._selecoes = np.zeros((0, 0), dtype=bool)
+        self._lido_ate = None
+        self._cache = {}
+        self._incluir_sugestoes(obter_rubrica())
+
+    def __len__(self):
+        return self._n
+
+    # ---------- carga ----------
+
+    def atualizar(self, armazem):
+        """
+        Lê do armazém os grupos novos ou alterados desde a última chamada.
+        Retorna quantas avaliações entraram ou mudaram na tabela.
+        """
+        with self._lock:
+            # O instante é lido antes da consulta; a próxima chamada relê a partir
+            # dele (>=), então gravações feitas durante a leitura não se perdem.
+            ultima = armazem.ultima_atualizacao()
+            if ultima is None:
+                return 0
+
+            alterados = self._atualizar_rubricas()
+            novos = []
+            for grupo_id, estado in armazem.iterar_avaliacoes(alterados_desde=self._lido_ate):
+                linha = self._converter(estado)
+                posicao = self._linhas.get(grupo_id)
+                if posicao is None:
+                    novos.append((grupo_id, linha))
+                elif self._gravar_linha(posicao, linha):
+                    alterados += 1
+
+            if novos:
+                self._acrescentar(novos)
+            self._lido_ate = ultima
+            if novos or alterados:
+                self._cache.clear()
+            return len(novos) + alterados
+
+    def _registrar_rubrica(self, codigos, rubrica):
+        """Guarda a versão da rubrica do curso/PIM e inclui as sugestões dela entre as colunas"""
+        par = (codigos['curso'], codigos['pim'])
+        if self._rubricas.get(par) != rubrica.versao:
+            self._rubricas[par] = rubrica.versao
+            self._incluir_sugestoes(rubrica)
+
+    def _incluir_sugestoes(self, rubrica):
+        """Acrescenta colunas para as sugestões do catálogo da rubrica que a tabela ainda não tem"""
+        for dimensao, _, obs in rubrica.catalogo:
+            self._sugestoes.setdefault((dimensao, obs), len(self._sugestoes))
+        faltam = len(self._sugestoes) - self._selecoes.shape[1]
+        if faltam:
+            self._selecoes = np.pad(self._selecoes, ((0, 0), (0, faltam)))
+
+    def _atualizar_rubricas(self):
+        """
+        Recalcula as notas máximas e totais das linhas de cada curso/PIM cuja
+        rubrica mudou (arquivos de rubrica alterados). Retorna quantas linhas mudaram.
+        """
+        alteradas = 0
+        valores = {agrupamento: list(self._categorias[agrupamento]) for agrupamento in AGRUPAMENTOS}  # código -> valor
+        for (curso, pim), versao in list(self._rubricas.items()):
+            rubrica = rubrica_de({'curso': valores['curso'][curso] or None, 'pim': valores['pim'][pim] or None})
+            if rubrica.versao == versao:
+                continue
+            self._registrar_rubrica({'curso': curso, 'pim': pim}, rubrica)
+            linhas = np.flatnonzero((self._codigos['curso'][:self._n] == curso)
+                                    & (self._codigos['pim'][:self._n] == pim))
+            maximos, total_maximo = self._maximos_rubrica(rubrica)
+            self._maximos[linhas] = maximos
+            self._total[linhas] = self._notas[linhas].sum(axis=1) * rubrica.fator_escrita + self._oral[linhas]
+            self._total_maximo[linhas] = total_maximo
+            alteradas += len(linhas)
+        return alteradas
+
+    def _maximos_rubrica(self, rubrica):
+        """Notas máximas das dimensões (na ordem das colunas) e nota total máxima da rubrica"""
+        maximos = [float(rubrica.dimensoes.get(dimensao, 0)) for dimensao in self._dimensoes]
+        return maximos, rubrica.nota_maxima_escrita + rubrica.nota_maxima_oral
+
+    def _converter(self, estado):
+        """Valores de uma avaliação para as colunas da tabela, com a rubrica do seu curso/PIM"""
+        codigos = {}
+        for agrupamento in AGRUPAMENTOS:
+            categorias = self._categorias[agrupamento]
+            codigos[agrupamento] = categorias.setdefault(estado.get(agrupamento) or '', len(categorias))
+        rubrica = rubrica_de(estado)
+        self._registrar_rubrica(codigos, rubrica)
+
+        notas_tabela = estado.get('notas_tabela', {})
+        notas = [float(notas_tabela.get(dimensao) or 0) for dimensao in self._dimensoes]
+        oral = float(estado.get('parte_oral') or 0)
+        maximos, total_maximo = self._maximos_rubrica(rubrica)
+
+        selecoes = []
+        for dimensao, avaliacao in estado.get('avaliacoes', {}).items():
+            for obs in avaliacao.get('observacoes', []):
+                indice = self._sugestoes.get((dimensao, obs))
+                if indice is not None:
+                    selecoes.append(indice)
+
+        total = sum(notas) * rubrica.fator_escrita + oral
+        return codigos, notas, oral, selecoes, maximos, total, total_maximo
+
+    def _gravar_linha(self, posicao, linha):
+        """Sobrescreve uma linha existente; retorna True se algum valor mudou"""
+        codigos, notas, oral, selecoes, maximos, total, total_maximo = linha
+        marcadas = np.zeros(self._selecoes.shape[1], dtype=bool)
+        marcadas[selecoes] = True
+
+        if (all(self._codigos[a][posicao] == codigos[a] for a in AGRUPAMENTOS)
+                and np.array_equal(self._notas[posicao], notas)
+                and self._oral[posicao] == oral
+                and np.array_equal(self._maximos[posicao], maximos)
+                and self._total[posicao] == total
+                and self._total_maximo[posicao] == total_maximo
+                and np.array_equal(self._selecoes[posicao], marcadas)):
+            return False
+
+        for agrupamento in AGRUPAMENTOS:
+            self._codigos[agrupamento][posicao] = codigos[agrupamento]
+        self._notas[posicao] = notas
+        self._oral[posicao] = oral
+        self._maximos[posicao] = maximos
+        self._total[posicao] = total
+        self._total_maximo[posicao] = total_maximo
+        self._selecoes[posicao] = marcadas
+        return True
+
+    def _acrescentar(self, novos):
+        """Acrescenta as linhas novas, dobrando a capacidade dos arrays quando preciso"""
+        inicio, fim = self._n, self._n + len(novos)
+        if fim > len(self._ids):
+            capacidade = max(fim, 2 * len(self._ids), 1024)
+            self._ids = np.resize(self._ids, capacidade)
+            self._codigos = {a: np.resize(c, capacidade) for a, c in self._codigos.items()}
+            self._notas = np.resize(self._notas, (capacidade, len(self._dimensoes)))
+            self._oral = np.resize(self._oral, capacidade)
+            self._maximos = np.resize(self._maximos, (capacidade, len(self._dimensoes)))
+            self._total = np.resize(self._total, capacidade)
+            self._total_maximo = np.resize(self._total_maximo, capacidade)
+            self._selecoes = np.resize(self._selecoes, (capacidade, self._selecoes.shape[1]))
+
+        ids, linhas = zip(*novos)
+        self._ids[inicio:fim] = ids
+        for agrupamento in AGRUPAMENTOS:
+            self._codigos[agrupamento][inicio:fim] = [linha[0][agrupamento] for linha in linhas]
+        self._notas[inicio:fim] = [linha[1] for linha in linhas]
+        self._oral[inicio:fim] = [linha[2] for linha in linhas]
+        self._maximos[inicio:fim] = [linha[4] for linha in linhas]
+        self._total[inicio:fim] = [linha[5] for linha in linhas]
+        self._total_maximo[inicio:fim] = [linha[6] for linha in linhas]
+
+        self._selecoes[inicio:fim] = False
+        posicoes = [(i, s) for i, linha in enumerate(linhas, start=inicio) for s in linha[3]]
+        if posicoes:
+            self._selecoes[tuple(np.array(posicoes).T)] = True
+
+        self._linhas.update(zip(ids, range(inicio, fim)))
+        self._n = fim
+
+    # ---------- agregados ----------
+
+    def _em_cache(self, chave, calcular):
+        with self._lock:
+            if chave not in self._cache:
+                self._cache[chave] = calcular()
+            return self._cache[chave]
+
+    def _grupos(self, por):
+        """Rótulo de grupo de cada linha (categórico, em ordem alfabética), ou 'Todas' sem agrupamento"""
+        if por is None:
+            return pd.Categorical.from_codes(np.zeros(self._n, dtype=np.int32), ['Todas'])
+        if por not in AGRUPAMENTOS:
+            raise ValueError(f"Agrupamento inválido: {por!r} (use {', '.join(AGRUPAMENTOS)})")
+        # Os códigos seguem a ordem de chegada; são remapeados para a ordem alfabética
+        valores = list(self._categorias[por])
+        ordem = np.argsort(valores)
+        remapear = np.empty(len(valores), dtype=np.int32)
+        remapear[ordem] = np.arange(len(valores))
+        categorias = [valores[i] or '(não informado)' for i in ordem]
+        return pd.Categorical.from_codes(remapear[self._codigos[por][:self._n]], categorias)
+
+    def resumo_notas(self, por=None):
+        """
+        Estatísticas das notas (n, média, desvio, mínimo, quartis e máximo) por
+        dimensão e da nota total, para cada curso/PIM ou para a turma inteira.
+        Índice: (grupo, dimensão).
+        """
+        def calcular():
+            notas = pd.DataFrame(self._notas[:self._n], columns=self._dimensoes)
+            notas['Nota Total'] = self._total[:self._n]
+            resumo = notas.groupby(self._grupos(por), observed=True).describe()
+            resumo = resumo.stack(level=0, future_stack=True)
+            resumo.index.names = [por or 'turma', 'dimensão']
+            resumo.columns = ['n', 'média', 'desvio', 'mínimo', 'p25', 'mediana', 'p75', 'máximo']
+            resumo['n'] = resumo['n'].astype(int)
+            return resumo
+        return self._em_cache(('resumo_notas', por), calcular)
+
+    def histograma(self, dimensao, por=None, faixas=10):
+        """
+        Quantidade de avaliações por faixa de nota da dimensão (linhas) e grupo
+        (colunas). Cada nota é dividida pela nota máxima da rubrica da sua
+        avaliação; se as avaliações têm notas máximas diferentes (variantes de
+        curso/PIM), as faixas são rotuladas em porcentagem da nota máxima.
+        """
+        def calcular():
+            if dimensao == 'Nota Total':
+                valores, maximos = self._total[:self._n], self._total_maximo[:self._n]
+            else:
+                coluna = self._dimensoes.index(dimensao)
+                valores, maximos = self._notas[:self._n, coluna], self._maximos[:self._n, coluna]
+
+            # O arredondamento evita que 0.6/3*10 = 1.999... caia na faixa anterior
+            faixa = np.clip(np.floor(np.round(valores / maximos * faixas, 6)).astype(np.int64), 0, faixas - 1)
+            grupos = self._grupos(por)
+            contagem = np.bincount(
+                grupos.codes.astype(np.int64) * faixas + faixa,
+                minlength=len(grupos.categories) * faixas
+            ).reshape(len(grupos.categories), faixas)
+
+            distintos = np.unique(maximos)
+            if len(distintos) == 1:
+                limites = np.linspace(0, distintos[0], faixas + 1)
+                rotulos = [f"{limites[i]:.1f}–{limites[i + 1]:.1f}" for i in range(faixas)]
+            else:
+                limites = np.linspace(0, 100, faixas + 1)
+                rotulos = [f"{limites[i]:.0f}%–{limites[i + 1]:.0f}%" for i in range(faixas)]
+            quadro = pd.DataFrame(contagem.T, index=pd.Index(rotulos, name='faixa'), columns=grupos.categories)
+            return quadro.loc[:, quadro.sum() > 0]
+        return self._em_cache(('histograma', dimensao, por, faixas), calcular)
+
+    def frequencia_sugestoes(self, por=None, proporcao=True):
+        """
+        Quantas avaliações marcaram cada sugestão do banco (ou a proporção, de 0 a 1),
+        por curso/PIM ou na turma inteira. Índice: (dimensão, sugestão), com as
+        sugestões de todas as rubricas já vistas, agrupadas por dimensão.
+        """
+        def calcular():
+            grupos = self._grupos(por)
+            ordem_dimensao = {dimensao: i for i, dimensao in enumerate(self._dimensoes)}
+            sugestoes = sorted(self._sugestoes.items(),
+                               key=lambda item: (ordem_dimensao.get(item[0][0], len(ordem_dimensao)), item[1]))
+            selecoes = pd.DataFrame(self._selecoes[:self._n, [coluna for _, coluna in sugestoes]])
+            contagem = selecoes.groupby(grupos, observed=True).sum().T
+            if proporcao:
+                tamanhos = pd.Series(grupos).value_counts()
+                contagem = contagem / tamanhos.reindex(contagem.columns).to_numpy()
+
+            contagem.index = pd.MultiIndex.from_tuples(
+                [chave for chave, _ in sugestoes], names=['dimensão', 'sugestão']
+            )
+            contagem.columns = list(contagem.columns)
+            return contagem
+        return self._em_cache(('frequencia_sugestoes', por, proporcao), calcular)
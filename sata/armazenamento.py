@@ -0,0 +1,255 @@
+"""
+Armazenamento local das avaliações em SQLite (modo WAL), com gravação automática.
+
+Cada grupo avaliado é uma linha de `grupos` (identificação: professor, curso,
+PIM, empresa e líder) e cada campo da avaliação é uma linha de `campos`, com o
+valor em JSON. As avaliações de cada dimensão são campos separados
+("avaliacoes/Introdução", ...), então marcar uma sugestão regrava só aquela
+dimensão. salvar() compara com o último estado gravado e só escreve o que mudou.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CAMINHO_PADRAO = Path(os.environ.get('SATA_BANCO', Path.home() / '.sata' / 'avaliacoes.db'))
+
+CAMPOS_IDENTIFICACAO = ('professor', 'curso', 'pim', 'empresa', 'lider')
+
+_PREFIXO_AVALIACAO = 'avaliacoes/'
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS grupos (
+    id INTEGER PRIMARY KEY,
+    professor TEXT NOT NULL,
+    curso TEXT NOT NULL,
+    pim TEXT NOT NULL,
+    empresa TEXT NOT NULL,
+    lider TEXT NOT NULL,
+    atualizado_em TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_grupos_identificacao ON grupos (professor, curso, pim, empresa, lider);
+CREATE INDEX IF NOT EXISTS idx_grupos_recentes ON grupos (professor, atualizado_em DESC);
+CREATE INDEX IF NOT EXISTS idx_grupos_atualizacao ON grupos (atualizado_em);
+CREATE TABLE IF NOT EXISTS campos (
+    grupo_id INTEGER NOT NULL REFERENCES grupos (id) ON DELETE CASCADE,
+    campo TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (grupo_id, campo)
+) WITHOUT ROWID;
+"""
+
+
+def campos_do_estado(estado):
+    """Converte o estado da avaliação em {campo: valor JSON} para gravação"""
+    campos = {}
+    for dimensao, avaliacao in estado.get('avaliacoes', {}).items():
+        campos[_PREFIXO_AVALIACAO + dimensao] = json.dumps(avaliacao, ensure_ascii=False, sort_keys=True)
+
+    data_avaliacao = estado.get('data_avaliacao')
+    campos['data_avaliacao'] = json.dumps(data_avaliacao.isoformat() if data_avaliacao else None)
+
+    for campo, padrao in (('notas_tabela', {}), ('recomendacoes_selecionadas', []),
+                          ('comentarios_adicionais', ''), ('parte_oral', 0.0),
+                          ('justificativa_oral', ''), ('tipo_discussao', 'Problema (PIM I ou II)')):
+        campos[campo] = json.dumps(estado.get(campo, padrao), ensure_ascii=False, sort_keys=True)
+    return campos
+
+
+def estado_dos_campos(identificacao, campos):
+    """Inverso de campos_do_estado: monta o estado no mesmo formato de sata.ler_progresso"""
+    estado = dict(identificacao)
+    estado['avaliacoes'] = {}
+    for campo, valor in campos.items():
+        valor = json.loads(valor)
+        if campo.startswith(_PREFIXO_AVALIACAO):
+            estado['avaliacoes'][campo[len(_PREFIXO_AVALIACAO):]] = valor
+        elif campo == 'data_avaliacao':
+            estado[campo] = datetime.fromisoformat(valor) if valor else None
+        else:
+            estado[campo] = valor
+
+    estado.setdefault('data_avaliacao', None)
+    estado.setdefault('notas_tabela', {})
+    estado.setdefault('recomendacoes_selecionadas', [])
+    estado.setdefault('comentarios_adicionais', '')
+    estado.setdefault('parte_oral', 0.0)
+    estado.setdefault('justificativa_oral', '')
+    estado.setdefault('tipo_discussao', 'Problema (PIM I ou II)')
+    return estado
+
+
+class ArmazemAvaliacoes:
+    """
+    Banco SQLite das avaliações. Uma instância pode ser compartilhada entre as
+    sessões do Streamlit (st.cache_resource): a conexão é protegida por um lock.
+    """
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = str(caminho)
+        if self.caminho != ':memory:':
+            Path(self.caminho).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA foreign_keys=ON")
+        self._conexao.executescript(_ESQUEMA)
+        self._lock = threading.Lock()
+
+        # Último estado gravado por grupo: {grupo_id: (identificação, {campo: json})}
+        self._gravados = {}
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+    def salvar(self, grupo_id, estado):
+        """
+        Grava a avaliação do grupo (grupo_id None cria um grupo novo).
+        Só escreve a identificação e os campos que mudaram desde a última gravação.
+        Retorna (grupo_id, quantidade de campos gravados).
+        """
+        identificacao = {c: str(estado.get(c) or '') for c in CAMPOS_IDENTIFICACAO}
+        campos = campos_do_estado(estado)
+        # Microssegundos: quem lê as alterações a partir de um instante (sata.analise) não relê o segundo inteiro
+        agora = datetime.now().isoformat(timespec='microseconds')
+
+        with self._lock:
+            with self._conexao:
+                if grupo_id is None:
+                    cursor = self._conexao.execute(
+                        "INSERT INTO grupos (professor, curso, pim, empresa, lider, atualizado_em) "
+                        "VALUES (:professor, :curso, :pim, :empresa, :lider, :agora)",
+                        dict(identificacao, agora=agora)
+                    )
+                    grupo_id = cursor.lastrowid
+                    identificacao_anterior, anteriores = identificacao, {}
+                else:
+                    if grupo_id not in self._gravados:
+                        self._gravados[grupo_id] = self._ler_grupo(grupo_id)
+                    identificacao_anterior, anteriores = self._gravados[grupo_id]
+
+                alterados = [(grupo_id, campo, valor) for campo, valor in campos.items()
+                             if anteriores.get(campo) != valor]
+                if not alterados and identificacao == identificacao_anterior:
+                    return grupo_id, 0
+
+                self._conexao.executemany(
+                    "INSERT INTO campos (grupo_id, campo, valor) VALUES (?, ?, ?) "
+                    "ON CONFLICT (grupo_id, campo) DO UPDATE SET valor = excluded.valor",
+                    alterados
+                )
+                self._conexao.execute(
+                    "UPDATE grupos SET professor = :professor, curso = :curso, pim = :pim, "
+                    "empresa = :empresa, lider = :lider, atualizado_em = :agora WHERE id = :id",
+                    dict(identificacao, agora=agora, id=grupo_id)
+                )
+
+            self._gravados[grupo_id] = (identificacao, campos)
+        return grupo_id, len(alterados)
+
+    def procurar_grupo(self, estado):
+        """
+        Id do grupo gravado mais recentemente com a mesma identificação do
+        estado (professor, curso, PIM, empresa e líder), ou None se não há ou
+        se o estado ainda não tem empresa nem líder. Para quem restaura um
+        backup (sata.fila_grupos) gravar no grupo que já está no banco em vez
+        de criar outro.
+        """
+        identificacao = {c: str(estado.get(c) or '') for c in CAMPOS_IDENTIFICACAO}
+        if not identificacao['empresa'] and not identificacao['lider']:
+            return None
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT id FROM grupos WHERE professor = :professor AND curso = :curso AND pim = :pim "
+                "AND empresa = :empresa AND lider = :lider ORDER BY atualizado_em DESC LIMIT 1",
+                identificacao
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def _ler_grupo(self, grupo_id):
+        """Lê (identificação, {campo: json}) de um grupo; chamar com o lock adquirido"""
+        linha = self._conexao.execute(
+            "SELECT professor, curso, pim, empresa, lider FROM grupos WHERE id = ?", (grupo_id,)
+        ).fetchone()
+        if linha is None:
+            raise KeyError(grupo_id)
+        campos = dict(self._conexao.execute(
+            "SELECT campo, valor FROM campos WHERE grupo_id = ?", (grupo_id,)
+        ))
+        return dict(zip(CAMPOS_IDENTIFICACAO, linha)), campos
+
+    def carregar(self, grupo_id):
+        """Estado da avaliação do grupo, no formato de sata.ler_progresso"""
+        with self._lock:
+            identificacao, campos = self._ler_grupo(grupo_id)
+            self._gravados[grupo_id] = (identificacao, campos)
+        return estado_dos_campos(identificacao, campos)
+
+    def listar_grupos(self, professor=None, limite=None):
+        """Grupos gravados, do mais recente para o mais antigo, como dicionários de identificação"""
+        sql = "SELECT id, professor, curso, pim, empresa, lider, atualizado_em FROM grupos"
+        parametros = []
+        if professor:
+            sql += " WHERE professor = ?"
+            parametros.append(professor)
+        sql += " ORDER BY atualizado_em DESC, id DESC"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+
+        colunas = ('id',) + CAMPOS_IDENTIFICACAO + ('atualizado_em',)
+        with self._lock:
+            return [dict(zip(colunas, linha)) for linha in self._conexao.execute(sql, parametros)]
+
+    def ultima_atualizacao(self):
+        """Data/hora (ISO) da gravação mais recente, ou None se o banco estiver vazio"""
+        with self._lock:
+            return self._conexao.execute("SELECT MAX(atualizado_em) FROM grupos").fetchone()[0]
+
+    def iterar_avaliacoes(self, professor=None, apos_id=0, alterados_desde=None):
+        """
+        Percorre (grupo_id, estado) de todos os grupos com id maior que apos_id,
+        em ordem de id, lendo do banco em lotes para não carregar tudo na memória.
+        Com alterados_desde (ISO), só os grupos gravados a partir desse instante.
+        """
+        condicoes, parametros = [], []
+        if apos_id:
+            condicoes.append("g.id > ?")
+            parametros.append(apos_id)
+        if professor:
+            condicoes.append("g.professor = ?")
+            parametros.append(professor)
+        if alterados_desde:
+            # Subconsulta para o SQLite usar o índice de atualizado_em em vez de percorrer os grupos
+            condicoes.append("g.id IN (SELECT id FROM grupos WHERE atualizado_em >= ?)")
+            parametros.append(alterados_desde)
+
+        sql = ("SELECT g.id, g.professor, g.curso, g.pim, g.empresa, g.lider, c.campo, c.valor "
+               "FROM grupos g JOIN campos c ON c.grupo_id = g.id")
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY g.id"
+
+        # Cursor próprio (as leituras no modo WAL não bloqueiam as gravações das sessões)
+        conexao = sqlite3.connect(self.caminho) if self.caminho != ':memory:' else self._conexao
+        try:
+            cursor = conexao.execute(sql, parametros)
+            atual, identificacao, campos = None, None, {}
+            while True:
+                linhas = cursor.fetchmany(500)
+                if not linhas:
+                    break
+                for grupo_id, *ident, campo, valor in linhas:
+                    if grupo_id != atual:
+                        if atual is not None:
+                            yield atual, estado_dos_campos(identificacao, campos)
+                        atual, identificacao, campos = grupo_id, dict(zip(CAMPOS_IDENTIFICACAO, ident)), {}
+                    campos[campo] = valor
+            if atual is not None:
+                yield atual, estado_dos_campos(identificacao, campos)
+        finally:
+            if conexao is not self._conexao:
+                conexao.close()
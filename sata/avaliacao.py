@@ -0,0 +1,85 @@
+"""
+Modelo compacto da avaliação em andamento (uma por sessão do app).
+
+Cada dimensão é uma AvaliacaoDimensao (dataclass com __slots__): nota,
+comentário e as sugestões marcadas em um inteiro usado como conjunto de bits,
+em que o bit i é a sugestão Rubrica.sugestoes_dimensao[dimensao][i] (a ordem
+do catálogo da rubrica; na Discussão, os grupos Problema e Solução em
+sequência, e as sugestões extras de uma variante no fim). A mesma seleção vale
+em qualquer variante da rubrica; os bits de sugestões que a rubrica não tem
+são ignorados. A nota fica só aqui: notas_tabela é derivada por notas_de().
+
+As funções recebem a rubrica da avaliação (sata.rubrica.rubrica_de); sem ela,
+usam a rubrica padrão.
+
+O texto das observações só é montado na fronteira com o resto do núcleo
+(backup, banco, PDF e parecer), por avaliacoes_como_dict, no formato de
+sata.ler_progresso.
+"""
+from dataclasses import dataclass
+
+from sata.rubrica import obter_rubrica
+
+
+@dataclass(slots=True)
+class AvaliacaoDimensao:
+    dimensao: str
+    nota: float = 0.0
+    comentario: str = ''
+    selecao: int = 0  # bit i: rubrica.sugestoes_dimensao[dimensao][i] marcada
+    extras: tuple = ()  # observações fora do banco de sugestões (ex.: backup de uma versão antiga)
+
+    def bits(self):
+        """Posições das sugestões marcadas, em ordem"""
+        selecao, bit = self.selecao, 0
+        while selecao:
+            if selecao & 1:
+                yield bit
+            selecao >>= 1
+            bit += 1
+
+    def observacoes(self, rubrica=None):
+        sugestoes = (rubrica or obter_rubrica()).sugestoes_dimensao.get(self.dimensao, ())
+        return [sugestoes[bit] for bit in self.bits() if bit < len(sugestoes)] + list(self.extras)
+
+    def vazia(self):
+        return not (self.nota or self.selecao or self.extras or self.comentario)
+
+    def como_dict(self, rubrica=None):
+        """{'nota', 'comentario', 'observacoes'}, o formato de sata.ler_progresso"""
+        return {'nota': self.nota, 'comentario': self.comentario, 'observacoes': self.observacoes(rubrica)}
+
+    @classmethod
+    def de_dict(cls, dimensao, dados, rubrica=None):
+        """Inverso de como_dict; observações que não estão no banco de sugestões ficam em extras"""
+        posicoes = (rubrica or obter_rubrica()).bit_observacao.get(dimensao, {})
+        selecao, extras = 0, []
+        for observacao in dados.get('observacoes', []):
+            bit = posicoes.get(observacao)
+            if bit is None:
+                extras.append(observacao)
+            else:
+                selecao |= 1 << bit
+        return cls(dimensao, dados.get('nota', 0), dados.get('comentario', ''), selecao, tuple(extras))
+
+
+def nova_avaliacao(rubrica=None):
+    """Avaliação vazia: {dimensão: AvaliacaoDimensao}"""
+    return {dimensao: AvaliacaoDimensao(dimensao) for dimensao in (rubrica or obter_rubrica()).dimensoes}
+
+
+def avaliacoes_de_dict(avaliacoes, rubrica=None):
+    """Avaliação (formato de sata.ler_progresso) no modelo compacto, com todas as dimensões"""
+    rubrica = rubrica or obter_rubrica()
+    return {dimensao: AvaliacaoDimensao.de_dict(dimensao, avaliacoes.get(dimensao, {}), rubrica)
+            for dimensao in rubrica.dimensoes}
+
+
+def avaliacoes_como_dict(avaliacoes, rubrica=None):
+    rubrica = rubrica or obter_rubrica()
+    return {dimensao: avaliacao.como_dict(rubrica) for dimensao, avaliacao in avaliacoes.items()}
+
+
+def notas_de(avaliacoes):
+    """notas_tabela ({dimensão: nota}) da avaliação"""
+    return {dimensao: avaliacao.nota for dimensao, avaliacao in avaliacoes.items()}
@@ -0,0 +1,178 @@
+"""
+Cache dos PDFs gerados, endereçado pelo conteúdo do relatório.
+
+A chave é o SHA-256 do JSON canônico do dicionário passado a
+gerar_pdf_relatorio, que determina o PDF inteiro junto com a versão da
+rubrica do curso/PIM (sata.rubrica): o mesmo conteúdo sempre reaproveita os
+mesmos bytes, e editar um arquivo de rubrica invalida os PDFs afetados. Os PDFs ficam em memória e, opcionalmente, em
+disco, cada nível com seu limite de bytes; ao passar do limite saem os usados
+há mais tempo (LRU). Os contadores de acertos e faltas mostram quantas
+gerações o cache evitou.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from sata.rubrica import rubrica_de
+
+# Mude ao alterar o layout do PDF (sata.pdf): invalida os PDFs já guardados em disco
+VERSAO_LAYOUT = 2
+
+LIMITE_MEMORIA_PADRAO = int(os.environ.get('SATA_CACHE_PDF_MB', 64)) * 1024 * 1024
+LIMITE_DISCO_PADRAO = int(os.environ.get('SATA_CACHE_PDF_DISCO_MB', 256)) * 1024 * 1024
+# SATA_CACHE_PDF vazio desliga o cache em disco
+PASTA_PADRAO = os.environ.get('SATA_CACHE_PDF', str(Path.home() / '.sata' / 'cache_pdf')) or None
+
+
+def chave_relatorio(dados_pdf):
+    """SHA-256 (hex) do JSON canônico dos dados do relatório e da versão da rubrica usada"""
+    canonico = json.dumps([VERSAO_LAYOUT, rubrica_de(dados_pdf).versao, dados_pdf], sort_keys=True, ensure_ascii=False,
+                          separators=(',', ':'), default=str)
+    return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+
+class CachePDF:
+    """
+    Cache LRU de PDFs em dois níveis (memória e disco) com limite de bytes em
+    cada um. Seguro para uso por várias threads.
+    """
+    def __init__(self, limite_memoria=LIMITE_MEMORIA_PADRAO, pasta=PASTA_PADRAO,
+                 limite_disco=LIMITE_DISCO_PADRAO):
+        self.limite_memoria = limite_memoria
+        self.limite_disco = limite_disco
+        self.pasta = Path(pasta) if pasta else None
+        self._lock = threading.Lock()
+
+        self._memoria = OrderedDict()  # chave -> bytes, do uso mais antigo ao mais recente
+        self._bytes_memoria = 0
+        self._disco = OrderedDict()  # chave -> tamanho do arquivo, idem
+        self._bytes_disco = 0
+        self._gravando = set()  # chaves com o arquivo sendo escrito fora do lock
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.faltas = 0
+        self.descartes = 0
+
+        if self.pasta is not None:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            # Ordem de uso entre execuções: mtime, atualizado a cada acerto
+            arquivos = sorted(self.pasta.glob('*.pdf'), key=lambda a: a.stat().st_mtime)
+            for arquivo in arquivos:
+                tamanho = arquivo.stat().st_size
+                self._disco[arquivo.stem] = tamanho
+                self._bytes_disco += tamanho
+            self._apagar(self._descartar_excesso_disco())
+
+    def obter(self, chave):
+        """Bytes do PDF guardado com a chave, ou None"""
+        with self._lock:
+            pdf = self._memoria.get(chave)
+            if pdf is not None:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return pdf
+
+            if chave in self._disco:
+                arquivo = self._arquivo(chave)
+                try:
+                    pdf = arquivo.read_bytes()
+                    os.utime(arquivo)
+                except OSError:
+                    self._bytes_disco -= self._disco.pop(chave)
+                else:
+                    self._disco.move_to_end(chave)
+                    self.acertos_disco += 1
+                    self._guardar_em_memoria(chave, pdf)
+                    return pdf
+
+            self.faltas += 1
+            return None
+
+    def guardar(self, chave, pdf):
+        """
+        Guarda o PDF nos dois níveis, descartando os menos usados se passar dos
+        limites. O arquivo é escrito fora do lock: quem consulta o cache
+        enquanto isso não espera pelo disco.
+        """
+        with self._lock:
+            self._guardar_em_memoria(chave, pdf)
+            if (self.pasta is None or chave in self._disco or chave in self._gravando
+                    or len(pdf) > self.limite_disco):
+                return
+            self._gravando.add(chave)
+
+        arquivo = self._arquivo(chave)
+        temporario = arquivo.with_suffix('.tmp')
+        try:
+            temporario.write_bytes(pdf)
+            os.replace(temporario, arquivo)
+        except OSError:
+            gravado = False  # o disco é só um nível a mais; sem ele o cache continua em memória
+        else:
+            gravado = True
+
+        with self._lock:
+            self._gravando.discard(chave)
+            if not gravado:
+                return
+            self._disco[chave] = len(pdf)
+            self._bytes_disco += len(pdf)
+            descartados = self._descartar_excesso_disco()
+        self._apagar(descartados)
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos_memoria + self.acertos_disco + self.faltas
+            return {
+                'acertos_memoria': self.acertos_memoria,
+                'acertos_disco': self.acertos_disco,
+                'faltas': self.faltas,
+                'taxa_acerto': (self.acertos_memoria + self.acertos_disco) / consultas if consultas else 0.0,
+                'descartes': self.descartes,
+                'pdfs_memoria': len(self._memoria),
+                'bytes_memoria': self._bytes_memoria,
+                'pdfs_disco': len(self._disco),
+                'bytes_disco': self._bytes_disco,
+            }
+
+    def _arquivo(self, chave):
+        return self.pasta / f"{chave}.pdf"
+
+    def _guardar_em_memoria(self, chave, pdf):
+        """Chamar com o lock adquirido"""
+        if len(pdf) > self.limite_memoria:
+            return
+        anterior = self._memoria.pop(chave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        self._memoria[chave] = pdf
+        self._bytes_memoria += len(pdf)
+        while self._bytes_memoria > self.limite_memoria:
+            _, antigo = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(antigo)
+            self.descartes += 1
+
+    def _descartar_excesso_disco(self):
+        """
+        Tira do índice do disco os menos usados até caber no limite e retorna
+        suas chaves, para apagar os arquivos com _apagar. Chamar com o lock adquirido
+        """
+        descartados = []
+        while self._bytes_disco > self.limite_disco:
+            chave, tamanho = self._disco.popitem(last=False)
+            self._bytes_disco -= tamanho
+            self.descartes += 1
+            descartados.append(chave)
+        return descartados
+
+    def _apagar(self, chaves):
+        """Apaga os arquivos das chaves; não precisa do lock"""
+        for chave in chaves:
+            try:
+                self._arquivo(chave).unlink()
+            except OSError:
+                pass
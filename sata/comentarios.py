@@ -0,0 +1,371 @@
+"""
+Índice dos comentários customizados já escritos nas avaliações, para sugerir
+ao professor, na aba de cada dimensão, os comentários que ele costuma repetir.
+
+Cada linha não vazia do comentário de uma dimensão é um comentário. O índice
+guarda, por dimensão, cada comentário distinto com a quantidade de grupos
+gravados em que ele aparece, e sugerir() responde com os mais frequentes
+entre os que começam pelo texto digitado (trie) e, se faltarem, entre os que
+contêm as suas palavras, mesmo pela metade (índice invertido de palavras,
+com um índice de trigramas sobre o vocabulário). A comparação ignora
+maiúsculas, acentos e espaços repetidos.
+
+A trie é de baldes: um nó guarda até BALDE comentários e só se divide em
+filhos (um por caractere) quando passa disso, e cada nó interno mantém em
+cache os LIMITE_SUGESTOES mais frequentes abaixo dele, montado a partir dos
+filhos e invalidado só no caminho do comentário que mudou.
+
+As contagens ficam em tabelas do mesmo banco SQLite das avaliações
+(sata.armazenamento). registrar() é chamado a cada gravação de um grupo e só
+aplica a diferença entre os comentários anteriores e os atuais do grupo;
+atualizar() lê apenas os grupos gravados desde a leitura anterior (como
+sata.analise), com o instante guardado no banco. Ao abrir, o índice não relê
+as avaliações: a trie e o índice de palavras de uma dimensão são montados
+das contagens gravadas, na primeira busca nela.
+"""
+import heapq
+import re
+import sqlite3
+import threading
+import unicodedata
+from itertools import islice
+from pathlib import Path
+
+from sata.armazenamento import CAMINHO_PADRAO
+
+# Máximo de sugestões por busca (e tamanho do cache de cada nó da trie)
+LIMITE_SUGESTOES = 8
+# Comentários por nó da trie antes de ele se dividir
+BALDE = 32
+# Linhas mais longas que isso são texto corrido, não comentários reaproveitáveis
+TAMANHO_MAXIMO = 400
+# Grupos por transação em atualizar()
+_LOTE = 500
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS comentarios (
+    dimensao TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    contagem INTEGER NOT NULL,
+    PRIMARY KEY (dimensao, texto)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comentarios_grupos (
+    grupo_id INTEGER NOT NULL,
+    dimensao TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    PRIMARY KEY (grupo_id, dimensao, texto)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comentarios_leitura (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    lido_ate TEXT
+);
+"""
+
+
+# Acentos e demais marcas que o NFKD separa da letra (U+0300 a U+036F)
+_MARCAS = re.compile('[\u0300-\u036f]+')
+
+
+def normalizar(texto):
+    """Chave de comparação: minúsculas, sem acentos e com os espaços simplificados"""
+    texto = texto.casefold()
+    if not texto.isascii():
+        texto = _MARCAS.sub('', unicodedata.normalize('NFKD', texto))
+    return ' '.join(texto.split())
+
+
+def linhas_comentario(comentario):
+    """Comentários de um campo de comentário: as linhas não vazias, com os espaços simplificados"""
+    linhas = (' '.join(linha.split()) for linha in (comentario or '').split('\n'))
+    return [linha for linha in linhas if linha and len(linha) <= TAMANHO_MAXIMO]
+
+
+def comentarios_do_estado(estado):
+    """{(dimensão, comentário)} de uma avaliação no formato de ler_progresso"""
+    return {(dimensao, linha) for dimensao, avaliacao in (estado.get('avaliacoes') or {}).items()
+            for linha in linhas_comentario(avaliacao.get('comentario'))}
+
+
+_PALAVRA = re.compile(r'\w+')
+
+
+def _trigramas(palavra):
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+class _No:
+    __slots__ = ('filhos', 'ids', 'melhores')
+
+    def __init__(self):
+        self.filhos = None  # None: folha (balde); senão {caractere: _No}
+        self.ids = []  # folha: todos; nó interno: os que terminam aqui
+        self.melhores = None  # nó interno: cache dos mais frequentes abaixo dele
+
+
+class _IndiceDimensao:
+    """
+    Comentários de uma dimensão: contagens, trie de prefixos e o índice de
+    palavras (palavra -> comentários, e trigrama -> palavras do vocabulário,
+    para achar as palavras que contêm um pedaço digitado).
+    """
+    def __init__(self, contagens=()):
+        self.textos, self.chaves, self.contagens = [], [], []
+        self.ids = {}  # texto -> id
+        self.raiz = _No()
+        self.com_palavra = {}  # palavra -> {ids}
+        self.trigramas = {}  # trigrama -> {palavras}
+        self._ranking = None  # todos os ids, do mais para o menos frequente (cache)
+        for texto, contagem in contagens:
+            self.ajustar(texto, contagem)
+
+    # ---------- alteração ----------
+
+    def ajustar(self, texto, diferenca):
+        """Soma diferenca à contagem do comentário (criado se for novo)"""
+        id_ = self.ids.get(texto)
+        self._ranking = None
+        if id_ is None:
+            if diferenca <= 0:
+                return
+            id_ = self.ids[texto] = len(self.textos)
+            chave = normalizar(texto)
+            self.textos.append(texto)
+            self.chaves.append(chave)
+            self.contagens.append(diferenca)
+            self._inserir(id_, chave)
+            for palavra in set(_PALAVRA.findall(chave)):
+                ids = self.com_palavra.get(palavra)
+                if ids is None:
+                    ids = self.com_palavra[palavra] = set()
+                    for trigrama in _trigramas(palavra):
+                        self.trigramas.setdefault(trigrama, set()).add(palavra)
+                ids.add(id_)
+            return
+        # Contagem zerada: o comentário continua indexado, mas não é mais sugerido
+        self.contagens[id_] = max(0, self.contagens[id_] + diferenca)
+        self._invalidar(self.chaves[id_])
+
+    def _inserir(self, id_, chave):
+        no, profundidade = self.raiz, 0
+        while no.filhos is not None:
+            no.melhores = None
+            if profundidade == len(chave):
+                no.ids.append(id_)
+                return
+            no = no.filhos.get(chave[profundidade]) or no.filhos.setdefault(chave[profundidade], _No())
+            profundidade += 1
+        no.ids.append(id_)
+        if len(no.ids) > BALDE:
+            self._dividir(no, profundidade)
+
+    def _dividir(self, no, profundidade):
+        """Transforma a folha cheia em nó interno, um filho por próximo caractere"""
+        ids, no.ids, no.filhos = no.ids, [], {}
+        for id_ in ids:
+            chave = self.chaves[id_]
+            if profundidade == len(chave):
+                no.ids.append(id_)
+            else:
+                no.filhos.setdefault(chave[profundidade], _No()).ids.append(id_)
+        for filho in no.filhos.values():
+            if len(filho.ids) > BALDE:
+                self._dividir(filho, profundidade + 1)
+
+    def _invalidar(self, chave):
+        no, profundidade = self.raiz, 0
+        while no is not None and no.filhos is not None:
+            no.melhores = None
+            if profundidade == len(chave):
+                return
+            no = no.filhos.get(chave[profundidade])
+            profundidade += 1
+
+    # ---------- busca ----------
+
+    def _ordenar(self, ids):
+        """Os LIMITE_SUGESTOES ids mais frequentes (no empate, o mais antigo), sem os de contagem zero"""
+        contagens = self.contagens
+        return heapq.nsmallest(LIMITE_SUGESTOES, (id_ for id_ in ids if contagens[id_] > 0),
+                               key=lambda id_: (-contagens[id_], id_))
+
+    def _melhores(self, no):
+        if no.filhos is None:
+            return self._ordenar(no.ids)
+        if no.melhores is None:
+            candidatos = list(no.ids)
+            for filho in no.filhos.values():
+                candidatos += self._melhores(filho)
+            no.melhores = self._ordenar(candidatos)
+        return no.melhores
+
+    def por_prefixo(self, prefixo):
+        """Ids dos mais frequentes que começam por prefixo (normalizado), em ordem"""
+        no, profundidade = self.raiz, 0
+        while no.filhos is not None and profundidade < len(prefixo):
+            no = no.filhos.get(prefixo[profundidade])
+            if no is None:
+                return []
+            profundidade += 1
+        if no.filhos is not None:
+            return self._melhores(no)
+        chaves = self.chaves
+        return self._ordenar(id_ for id_ in no.ids if chaves[id_].startswith(prefixo))
+
+    def _com_pedaco(self, pedaco):
+        """Ids dos comentários com alguma palavra que contém pedaco (3 caracteres ou mais)"""
+        palavras = [palavra for palavra in set.intersection(*(self.trigramas.get(trigrama, set())
+                                                              for trigrama in _trigramas(pedaco)))
+                    if pedaco in palavra]
+        if len(palavras) == 1:
+            return self.com_palavra[palavras[0]]
+        return set().union(*(self.com_palavra[palavra] for palavra in palavras))
+
+    def por_palavras(self, busca):
+        """
+        Ids dos mais frequentes que contêm todas as palavras da busca
+        (normalizada), em qualquer ordem; palavras com menos de 3 letras não contam.
+        """
+        pedacos = {pedaco for pedaco in _PALAVRA.findall(busca) if len(pedaco) >= 3}
+        if not pedacos:
+            return []
+        # Interseção em C, do conjunto menor para os maiores
+        conjuntos = sorted((self._com_pedaco(pedaco) for pedaco in pedacos), key=len)
+        candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        if len(candidatos) <= BALDE * LIMITE_SUGESTOES:
+            return self._ordenar(candidatos)
+        # Muitos candidatos: percorre os comentários do mais frequente para o menos e para ao completar a lista
+        if self._ranking is None:
+            contagens = self.contagens
+            self._ranking = sorted((id_ for id_ in range(len(contagens)) if contagens[id_] > 0),
+                                   key=lambda id_: -contagens[id_])
+        return list(islice((id_ for id_ in self._ranking if id_ in candidatos), LIMITE_SUGESTOES))
+
+
+class IndiceComentarios:
+    """
+    Índice dos comentários gravado no banco das avaliações. Uma instância pode
+    ser compartilhada entre as sessões do Streamlit (st.cache_resource).
+    """
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = str(caminho)
+        if self.caminho != ':memory:':
+            Path(self.caminho).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(_ESQUEMA)
+        self._lock = threading.RLock()
+
+        self._dimensoes = {}  # dimensão -> _IndiceDimensao, montado na primeira busca
+        self._grupos = {}  # grupo_id -> {(dimensão, comentário)} já contados
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+    # ---------- gravação ----------
+
+    def registrar(self, grupo_id, estado):
+        """
+        Conta os comentários da avaliação gravada do grupo, no lugar dos que
+        ele tinha antes. Retorna quantos comentários do grupo mudaram.
+        """
+        return self._registrar_lote([(grupo_id, estado)])
+
+    def _registrar_lote(self, avaliacoes):
+        with self._lock:
+            entradas, saidas, diferencas = [], [], {}
+            for grupo_id, estado in avaliacoes:
+                atuais = comentarios_do_estado(estado)
+                anteriores = self._grupos.get(grupo_id)
+                if anteriores is None:
+                    anteriores = set(self._conexao.execute(
+                        "SELECT dimensao, texto FROM comentarios_grupos WHERE grupo_id = ?", (grupo_id,)
+                    ))
+                self._grupos[grupo_id] = atuais
+                for par in atuais - anteriores:
+                    entradas.append((grupo_id, *par))
+                    diferencas[par] = diferencas.get(par, 0) + 1
+                for par in anteriores - atuais:
+                    saidas.append((grupo_id, *par))
+                    diferencas[par] = diferencas.get(par, 0) - 1
+            if not (entradas or saidas):
+                return 0
+
+            with self._conexao:
+                self._conexao.executemany(
+                    "DELETE FROM comentarios_grupos WHERE grupo_id = ? AND dimensao = ? AND texto = ?", saidas
+                )
+                self._conexao.executemany(
+                    "INSERT OR IGNORE INTO comentarios_grupos (grupo_id, dimensao, texto) VALUES (?, ?, ?)", entradas
+                )
+                self._conexao.executemany(
+                    "INSERT INTO comentarios (dimensao, texto, contagem) VALUES (?, ?, ?) "
+                    "ON CONFLICT (dimensao, texto) DO UPDATE SET contagem = contagem + excluded.contagem",
+                    [(dimensao, texto, diferenca) for (dimensao, texto), diferenca in diferencas.items() if diferenca]
+                )
+                self._conexao.executemany(
+                    "DELETE FROM comentarios WHERE dimensao = ? AND texto = ? AND contagem <= 0",
+                    [par for par, diferenca in diferencas.items() if diferenca < 0]
+                )
+
+            for (dimensao, texto), diferenca in diferencas.items():
+                indice = self._dimensoes.get(dimensao)
+                if indice is not None and diferenca:
+                    indice.ajustar(texto, diferenca)
+            return len(entradas) + len(saidas)
+
+    def atualizar(self, armazem):
+        """
+        Conta os comentários dos grupos gravados no armazém desde a última
+        chamada (na primeira vez, de todos). Retorna quantos comentários mudaram.
+        """
+        with self._lock:
+            # Como em sata.analise: o instante é lido antes da consulta, e a próxima chamada relê a partir dele
+            ultima = armazem.ultima_atualizacao()
+            if ultima is None:
+                return 0
+            linha = self._conexao.execute("SELECT lido_ate FROM comentarios_leitura WHERE id = 1").fetchone()
+            avaliacoes = armazem.iterar_avaliacoes(alterados_desde=linha[0] if linha else None)
+            alterados = 0
+            while lote := list(islice(avaliacoes, _LOTE)):
+                alterados += self._registrar_lote(lote)
+            with self._conexao:
+                self._conexao.execute(
+                    "INSERT INTO comentarios_leitura (id, lido_ate) VALUES (1, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET lido_ate = excluded.lido_ate", (ultima,)
+                )
+            return alterados
+
+    # ---------- busca ----------
+
+    def _indice(self, dimensao):
+        indice = self._dimensoes.get(dimensao)
+        if indice is None:
+            indice = self._dimensoes[dimensao] = _IndiceDimensao(self._conexao.execute(
+                "SELECT texto, contagem FROM comentarios WHERE dimensao = ? AND contagem > 0", (dimensao,)
+            ))
+        return indice
+
+    def sugerir(self, dimensao, texto='', limite=5):
+        """
+        Até limite (no máximo LIMITE_SUGESTOES) comentários já usados na
+        dimensão, dos mais para os menos frequentes: os que começam por texto
+        e, completando a lista, os que contêm as suas palavras. Sem texto, os
+        mais usados da dimensão. O próprio texto não é sugerido.
+        """
+        busca = normalizar(texto)
+        with self._lock:
+            indice = self._indice(dimensao)
+            ids = [id_ for id_ in indice.por_prefixo(busca) if indice.chaves[id_] != busca]
+            if busca and len(ids) < limite:
+                ids += [id_ for id_ in indice.por_palavras(busca) if id_ not in ids and indice.chaves[id_] != busca]
+            return [indice.textos[id_] for id_ in ids[:limite]]
+
+    def contagem(self, dimensao, texto):
+        """Em quantos grupos gravados o comentário aparece na dimensão"""
+        with self._lock:
+            indice = self._indice(dimensao)
+            id_ = indice.ids.get(' '.join(texto.split()))
+            return 0 if id_ is None else indice.contagens[id_]
@@ -0,0 +1,150 @@
+"""
+Instrumentação dos reruns do app: tempo de cada seção, estatísticas móveis e rastros em JSONL.
+
+Ligada pela variável de ambiente SATA_PERF (qualquer valor diferente de vazio
+ou "0"). Desligada, medir() retorna sempre o mesmo contexto vazio e
+cronometrado() devolve a própria função, sem custo nos reruns.
+
+A primeira medição aberta em uma thread é a raiz do rastro (o rerun completo,
+ou o rerun de um fragmento); as medições dentro dela são as seções. Ao fechar
+a raiz, o rastro vira uma linha do arquivo JSONL (SATA_PERF_ARQUIVO, padrão
+~/.sata/desempenho.jsonl):
+
+    {"em": "2025-03-10T14:03:22.511", "rerun": "rerun completo", "sessao": "...",
+     "total_ms": 182.4, "secoes": {"barra lateral": 21.3, "dimensão: Introdução": 12.9, ...}}
+
+Raízes e seções entram também nas estatísticas (p50/p95/p99 das últimas
+JANELA_PADRAO medições de cada nome), mostradas no painel de desempenho do app.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+
+ATIVO = os.environ.get('SATA_PERF', '') not in ('', '0')
+ARQUIVO_PADRAO = Path(os.environ.get('SATA_PERF_ARQUIVO', Path.home() / '.sata' / 'desempenho.jsonl'))
+JANELA_PADRAO = 1000
+
+
+def _percentil(valores_ordenados, p):
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p / 100))]
+
+
+class MonitorDesempenho:
+    """
+    Tempos das seções dos reruns, com estatísticas móveis por nome e rastros em
+    JSONL. Uma instância por servidor (MONITOR); segura para as threads das sessões.
+    """
+    def __init__(self, arquivo=ARQUIVO_PADRAO, janela=JANELA_PADRAO):
+        self.arquivo = Path(arquivo) if arquivo else None
+        self.janela = janela
+        self.contexto = None  # função sem argumentos com campos extras do rastro (ex.: a sessão)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._amostras = defaultdict(lambda: deque(maxlen=self.janela))
+        self._ultimos = deque(maxlen=20)
+        self._saida = None
+
+    @contextlib.contextmanager
+    def medir(self, nome):
+        rastro = getattr(self._local, 'rastro', None)
+        raiz = rastro is None
+        if raiz:
+            rastro = {'em': datetime.now().isoformat(timespec='milliseconds'), 'rerun': nome}
+            if self.contexto is not None:
+                rastro.update(self.contexto())
+            rastro['secoes'] = {}
+            self._local.rastro = rastro
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            if raiz:
+                self._local.rastro = None
+                rastro['total_ms'] = round(ms, 3)
+                self._concluir(rastro)
+            else:
+                rastro['secoes'][nome] = round(rastro['secoes'].get(nome, 0.0) + ms, 3)
+            with self._lock:
+                self._amostras[nome].append(ms)
+
+    def registrar(self, nome, ms):
+        """Registra um tempo medido fora da thread (ex.: a geração do PDF no pool)"""
+        rastro = getattr(self._local, 'rastro', None)
+        if rastro is not None:
+            rastro['secoes'][nome] = round(rastro['secoes'].get(nome, 0.0) + ms, 3)
+        with self._lock:
+            self._amostras[nome].append(ms)
+
+    def estatisticas(self):
+        """{nome: {'n', 'p50', 'p95', 'p99', 'max'}} em ms, das últimas medições de cada nome"""
+        with self._lock:
+            amostras = {nome: sorted(valores) for nome, valores in self._amostras.items() if valores}
+        return {
+            nome: {'n': len(valores), 'p50': _percentil(valores, 50), 'p95': _percentil(valores, 95),
+                   'p99': _percentil(valores, 99), 'max': valores[-1]}
+            for nome, valores in sorted(amostras.items())
+        }
+
+    def ultimos_rastros(self):
+        """Os rastros mais recentes, do mais novo ao mais antigo"""
+        with self._lock:
+            return list(reversed(self._ultimos))
+
+    def limpar(self):
+        with self._lock:
+            self._amostras.clear()
+            self._ultimos.clear()
+
+    def _concluir(self, rastro):
+        with self._lock:
+            self._ultimos.append(rastro)
+            if self.arquivo is None:
+                return
+            try:
+                if self._saida is None:
+                    self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+                    self._saida = open(self.arquivo, 'a', encoding='utf-8')
+                self._saida.write(json.dumps(rastro, ensure_ascii=False) + '\n')
+                self._saida.flush()
+            except OSError:
+                self.arquivo = None  # sem onde gravar, fica só com as estatísticas em memória
+
+
+MONITOR = MonitorDesempenho() if ATIVO else None
+_NULO = contextlib.nullcontext()
+
+
+def medir(nome):
+    """Contexto que cronometra a seção nome (ou abre o rastro, se for a primeira da thread)"""
+    if MONITOR is None:
+        return _NULO
+    return MONITOR.medir(nome)
+
+
+def registrar(nome, ms):
+    if MONITOR is not None:
+        MONITOR.registrar(nome, ms)
+
+
+def cronometrado(nome):
+    """
+    Decorador que mede cada chamada da função como a seção nome, formatado com
+    os argumentos da chamada ("dimensão: {0}"). Desligado, devolve a própria função.
+    """
+    def decorador(funcao):
+        if MONITOR is None:
+            return funcao
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with MONITOR.medir(nome.format(*args, **kwargs)):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
@@ -0,0 +1,204 @@
+"""
+Diário de avaliações em JSON Lines (.jsonl): um único arquivo, só de
+acréscimo, com todas as avaliações de um professor (ex.: as de um semestre).
+
+Cada linha é um registro completo de um grupo, no mesmo formato do backup
+(sata.progresso, v3): qualquer linha pode ser lida por ler_progresso, e um
+backup .json sem compactação é um diário de um registro só. Gravar de novo
+um grupo acrescenta outro registro ao fim do arquivo; na leitura, o registro
+mais recente de cada grupo (mesma identificação: professor, curso, PIM,
+empresa e líder) substitui os anteriores.
+
+A leitura é em fluxo, um registro por vez: cada linha é validada e migrada
+para o formato atual (progresso_de_dados; registros v2.1 continuam válidos),
+sem carregar o arquivo inteiro na memória. Para ficar só com os registros
+mais recentes, uma primeira passada guarda apenas a posição da última linha
+de cada grupo. compactar_diario regrava o diário só com esses registros, já
+na versão atual.
+
+O app acrescenta cada gravação automática ao diário local (DiarioAvaliacoes,
+em SATA_DIARIO), que é compactado no lugar quando dobra de tamanho desde a
+última compactação.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+from sata.armazenamento import CAMPOS_IDENTIFICACAO
+from sata.progresso import dados_backup, progresso_de_dados
+
+EXTENSAO_DIARIO = '.jsonl'
+
+# SATA_DIARIO vazio desliga o diário do app
+CAMINHO_PADRAO = os.environ.get('SATA_DIARIO', str(Path.home() / '.sata' / 'diario.jsonl')) or None
+# Tamanho a partir do qual o diário do app é compactado
+LIMITE_COMPACTACAO_PADRAO = int(os.environ.get('SATA_DIARIO_MB', 16)) * 1024 * 1024
+
+
+def registro_diario(estado, timestamp=None):
+    """Linha do diário (bytes, com a quebra de linha) com a avaliação estado, no formato de ler_progresso"""
+    dados = dados_backup(estado, timestamp)
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def escrever_diario(estados, destino):
+    """Grava as avaliações no arquivo binário destino, um registro por linha. Retorna quantas gravou"""
+    quantidade = 0
+    for estado in estados:
+        destino.write(registro_diario(estado))
+        quantidade += 1
+    return quantidade
+
+
+def acrescentar(caminho, estados):
+    """
+    Acrescenta as avaliações ao fim do diário em caminho (criado se não
+    existir). Retorna quantos registros gravou.
+    """
+    with open(caminho, 'a+b') as arquivo:
+        # Uma gravação interrompida deixa a última linha sem quebra; o registro
+        # novo começa em outra linha, e a incompleta é informada na leitura
+        if arquivo.tell():
+            arquivo.seek(-1, 2)
+            if arquivo.read(1) != b'\n':
+                arquivo.write(b'\n')
+        return escrever_diario(estados, arquivo)
+
+
+def _decodificar(linha):
+    """Registro decodificado da linha, ou a exceção se o JSON for inválido"""
+    try:
+        return json.loads(linha)
+    except ValueError as e:  # inclui UTF-8 inválido
+        return e
+
+
+def _chave(dados, numero):
+    """Identificação do grupo do registro; registros inválidos não se agrupam com nenhum outro"""
+    if not isinstance(dados, dict):
+        return ('linha', numero)
+    return tuple(str(dados.get(campo, '')) for campo in CAMPOS_IDENTIFICACAO)
+
+
+def _selecionado(dados, filtros):
+    # Registros inválidos passam pelo filtro para o erro ser informado
+    return not isinstance(dados, dict) or all(dados.get(campo) == valor for campo, valor in filtros.items())
+
+
+def _registros(arquivo):
+    """(número da linha, posição no arquivo, linha, registro decodificado) de cada linha não vazia"""
+    posicao = 0
+    for numero, linha in enumerate(arquivo, 1):
+        inicio, posicao = posicao, posicao + len(linha)
+        if linha.strip():
+            yield numero, inicio, linha, _decodificar(linha)
+
+
+def _selecionar(arquivo, somente_recentes, filtros):
+    """(número da linha, linha, registro decodificado) dos registros escolhidos, na ordem do arquivo"""
+    filtros = {campo: valor for campo, valor in filtros.items() if valor is not None}
+    if not somente_recentes:
+        for numero, _, linha, dados in _registros(arquivo):
+            if _selecionado(dados, filtros):
+                yield numero, linha, dados
+        return
+
+    ultimos = {}  # grupo -> (número da linha, posição) do registro mais recente
+    for numero, posicao, _, dados in _registros(arquivo):
+        if _selecionado(dados, filtros):
+            ultimos[_chave(dados, numero)] = (numero, posicao)
+    for numero, posicao in sorted(ultimos.values()):
+        arquivo.seek(posicao)
+        linha = arquivo.readline()
+        yield numero, linha, _decodificar(linha)
+
+
+def linhas_diario(arquivo, somente_recentes=True, **filtros):
+    """
+    Percorre (número da linha, linha em bytes) dos registros do diário aberto
+    em modo binário, sem validá-los. filtros (ex.: professor="...", pim="II")
+    deixam só os registros com esses valores. Com somente_recentes, só o
+    registro mais recente de cada grupo (o arquivo precisa permitir seek).
+    """
+    for numero, linha, _ in _selecionar(arquivo, somente_recentes, filtros):
+        yield numero, linha
+
+
+def _validados(arquivo, somente_recentes, falhas, filtros):
+    """(registro decodificado, avaliação no formato de ler_progresso) de cada registro válido"""
+    for numero, _, dados in _selecionar(arquivo, somente_recentes, filtros):
+        try:
+            if isinstance(dados, Exception):
+                raise ValueError(f"Registro inválido: JSON malformado ({dados})")
+            progresso = progresso_de_dados(dados)
+        except ValueError as e:
+            if falhas is None:
+                raise ValueError(f"Linha {numero}: {e}") from e
+            falhas.append((numero, str(e)))
+            continue
+        yield dados, progresso
+
+
+def ler_registros(arquivo, somente_recentes=True, falhas=None, **filtros):
+    """
+    Percorre as avaliações do diário aberto em modo binário, validadas e no
+    formato de ler_progresso, uma por vez (filtros e somente_recentes como em
+    linhas_diario). Um registro inválido levanta ValueError com o número da
+    linha; com uma lista em falhas, ele é anotado nela como (número, erro) e
+    a leitura continua.
+    """
+    for _, progresso in _validados(arquivo, somente_recentes, falhas, filtros):
+        yield progresso
+
+
+def ler_diario(caminho, somente_recentes=True, falhas=None, **filtros):
+    """ler_registros sobre o arquivo em caminho"""
+    with open(caminho, 'rb') as arquivo:
+        yield from ler_registros(arquivo, somente_recentes, falhas, **filtros)
+
+
+def compactar_diario(origem, destino, falhas=None):
+    """
+    Regrava o diário origem em destino (caminhos diferentes) só com o registro
+    mais recente de cada grupo, migrado para a versão atual do formato e com
+    o timestamp original. Registros inválidos ficam de fora como em
+    ler_registros. Retorna quantos registros gravou.
+    """
+    quantidade = 0
+    with open(origem, 'rb') as entrada, open(destino, 'wb') as saida:
+        for dados, progresso in _validados(entrada, True, falhas, {}):
+            saida.write(registro_diario(progresso, dados.get('timestamp')))
+            quantidade += 1
+    return quantidade
+
+
+class DiarioAvaliacoes:
+    """
+    Diário do app: cada gravação de um grupo acrescenta um registro. Quando o
+    arquivo passa de limite_compactacao e do dobro do tamanho que tinha após
+    a última compactação, é regravado no lugar só com o registro mais recente
+    de cada grupo (compactar_diario), e o custo da compactação se dilui entre
+    as gravações. Seguro para uso por várias threads.
+    """
+    def __init__(self, caminho=CAMINHO_PADRAO, limite_compactacao=LIMITE_COMPACTACAO_PADRAO):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.limite_compactacao = limite_compactacao
+        self._lock = threading.Lock()
+        self._compactar_em = limite_compactacao  # tamanho do arquivo que dispara a próxima compactação
+        self.falhas = []  # (linha, erro) dos registros inválidos descartados nas compactações
+
+    def registrar(self, estado):
+        """Acrescenta a avaliação estado (formato de ler_progresso), compactando o diário se passou do limite"""
+        with self._lock:
+            acrescentar(self.caminho, [estado])
+            if self.caminho.stat().st_size >= self._compactar_em:
+                self._compactar()
+
+    def _compactar(self):
+        """Chamar com o lock adquirido"""
+        temporario = self.caminho.with_suffix('.tmp')
+        compactar_diario(self.caminho, temporario, self.falhas)
+        os.replace(temporario, self.caminho)
+        self._compactar_em = max(self.limite_compactacao, 2 * self.caminho.stat().st_size)
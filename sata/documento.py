@@ -0,0 +1,163 @@
+"""
+Documento do relatório: o conteúdo de uma avaliação já organizado para exibição.
+
+A aba Relatório (espelho do PDF e tabela de notas), o PDF (sata.pdf) e o
+parecer resumido (sata.parecer) mostram as mesmas coisas em formatos
+diferentes: as dimensões na ordem da rubrica, com nota, observações e linhas
+do comentário, a tabela de avaliação, as notas calculadas, as recomendações e
+as notas adicionais. montar_documento percorre a avaliação uma única vez e
+guarda tudo isso em um DocumentoRelatorio; cada formato só o renderiza.
+
+documento_relatorio guarda os documentos montados pelo hash do conteúdo
+(sata.cache_pdf.chave_relatorio, a mesma chave do cache de PDFs): reruns do
+app sem mudança na avaliação reaproveitam o mesmo documento, e é ele que o app
+envia à fila de PDFs (sata.fila_pdf). Um DocumentoRelatorio vai para outro
+processo sem a rubrica, que lá é obtida pelo curso/PIM (já compilada no
+processo, como os modelos do PDF de cada rubrica).
+"""
+import functools
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+
+from sata.cache_pdf import chave_relatorio
+from sata.notas import calcular_notas
+from sata.rubrica import Rubrica, rubrica_de
+
+# Documentos guardados por documento_relatorio (os usados há mais tempo saem primeiro)
+LIMITE_DOCUMENTOS = 64
+
+JUSTIFICATIVA_ORAL_PADRAO = 'Grupo não realizou apresentação'
+
+
+@dataclass(frozen=True, slots=True)
+class SecaoDimensao:
+    dimensao: str
+    numero: int  # posição na rubrica, a partir de 1
+    titulo: str  # rubrica.titulos[dimensao]
+    titulo_tabela: str  # a dimensão sem o trecho entre parênteses
+    nota: float
+    nota_maxima: float
+    observacoes: tuple  # como gravadas, com os prefixos da Discussão ([Problema]/[Solução])
+    observacoes_parecer: tuple  # sem os prefixos
+    comentario: str  # como digitado
+    linhas_comentario: tuple  # linhas não vazias do comentário, sem espaços nas pontas
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentoRelatorio:
+    rubrica: Rubrica
+    curso: str
+    pim: str
+    lider: str
+    empresa: str
+    professor: str
+    data_avaliacao: str
+    secoes: tuple  # SecaoDimensao, na ordem da rubrica
+    nota_objetiva: float
+    nota_ponderada: float
+    parte_oral: float
+    justificativa_oral: str
+    recomendacoes: tuple
+    comentarios_adicionais: tuple  # linhas das notas adicionais (vazio se não há)
+
+    @property
+    def nota_total(self):
+        return self.nota_ponderada + self.parte_oral
+
+    @property
+    def nota_maxima_objetiva(self):
+        return sum(self.rubrica.dimensoes.values())
+
+    def __reduce__(self):
+        # Sem a rubrica (objeto grande e compartilhado, ver _documento_recebido)
+        return _documento_recebido, (tuple(getattr(self, campo.name) for campo in fields(self)
+                                           if campo.name != 'rubrica'),)
+
+
+def _documento_recebido(valores):
+    """DocumentoRelatorio recebido de outro processo, com a rubrica do curso/PIM deste processo"""
+    documento = DocumentoRelatorio(None, *valores)
+    return replace(documento, rubrica=rubrica_de({'curso': documento.curso, 'pim': documento.pim}))
+
+
+@functools.lru_cache(maxsize=16)
+def _estrutura(rubrica):
+    """
+    Parte de cada seção que só depende da rubrica, (dimensão, número, título,
+    título na tabela, nota máxima), e a função que tira os prefixos da Discussão
+    """
+    secoes = tuple(
+        (dimensao, numero, rubrica.titulos[dimensao],
+         dimensao if "(" not in dimensao else dimensao[:dimensao.index("(")].strip(), nota_maxima)
+        for numero, (dimensao, nota_maxima) in enumerate(rubrica.dimensoes.items(), 1)
+    )
+    prefixos = [prefixo for prefixo in rubrica.prefixos_discussao.values() if prefixo]
+    sem_prefixos = functools.partial(re.compile('|'.join(map(re.escape, prefixos))).sub, '') if prefixos else None
+    return secoes, sem_prefixos
+
+
+def montar_documento(dados):
+    """
+    DocumentoRelatorio de uma avaliação no formato de gerar_pdf_relatorio (ou
+    de ler_progresso; a identificação que faltar fica vazia)
+    """
+    rubrica = rubrica_de(dados)
+    estrutura, sem_prefixos = _estrutura(rubrica)
+    avaliacoes = dados.get('avaliacoes', {})
+
+    secoes = []
+    for dimensao, numero, titulo, titulo_tabela, nota_maxima in estrutura:
+        avaliacao = avaliacoes.get(dimensao, {})
+        observacoes = tuple(avaliacao.get('observacoes', ()))
+        comentario = avaliacao.get('comentario', '')
+        secoes.append(SecaoDimensao(
+            dimensao, numero, titulo, titulo_tabela, avaliacao.get('nota', 0), nota_maxima, observacoes,
+            tuple(map(sem_prefixos, observacoes)) if sem_prefixos and observacoes else observacoes,
+            comentario,
+            tuple(filter(None, map(str.strip, comentario.split('\n')))) if comentario else ()
+        ))
+
+    nota_objetiva, nota_ponderada = calcular_notas(dados.get('notas_tabela', {}), rubrica)
+    comentarios_adicionais = (dados.get('comentarios_adicionais') or '').strip()
+    return DocumentoRelatorio(
+        rubrica=rubrica,
+        curso=dados.get('curso', ''),
+        pim=dados.get('pim', ''),
+        lider=dados.get('lider', ''),
+        empresa=dados.get('empresa', ''),
+        professor=dados.get('professor', ''),
+        data_avaliacao=dados.get('data_avaliacao', ''),
+        secoes=tuple(secoes),
+        nota_objetiva=nota_objetiva,
+        nota_ponderada=nota_ponderada,
+        parte_oral=dados.get('parte_oral', 0.0),
+        justificativa_oral=dados.get('justificativa_oral', JUSTIFICATIVA_ORAL_PADRAO),
+        recomendacoes=tuple(dados.get('recomendacoes_selecionadas', [])),
+        comentarios_adicionais=tuple(comentarios_adicionais.split('\n')) if comentarios_adicionais else ()
+    )
+
+
+_documentos = OrderedDict()  # chave_relatorio -> DocumentoRelatorio, do uso mais antigo ao mais recente
+_lock = threading.Lock()
+
+
+def documento_relatorio(dados, chave=None):
+    """
+    DocumentoRelatorio dos dados (formato de gerar_pdf_relatorio), montado só
+    na primeira vez para o mesmo conteúdo. chave: chave_relatorio(dados), se
+    já calculada (ex.: para o cache de PDFs)
+    """
+    chave = chave or chave_relatorio(dados)
+    with _lock:
+        documento = _documentos.get(chave)
+        if documento is not None:
+            _documentos.move_to_end(chave)
+            return documento
+    documento = montar_documento(dados)
+    with _lock:
+        _documentos[chave] = documento
+        while len(_documentos) > LIMITE_DOCUMENTOS:
+            _documentos.popitem(last=False)
+    return documento
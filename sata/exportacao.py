@@ -0,0 +1,108 @@
+"""
+Exportação das notas finais em lote (CSV ou XLSX) para lançamento no sistema
+acadêmico, ou das avaliações completas em um diário JSON Lines (sata.diario).
+
+As avaliações chegam de um iterável (ex.: ArmazemAvaliacoes.iterar_avaliacoes)
+e cada uma vira uma linha gravada imediatamente no destino, então a memória
+usada não depende da quantidade de grupos. O XLSX usa o modo write_only do
+openpyxl, que também grava as linhas em disco à medida que chegam.
+"""
+import csv
+import io
+
+from sata.rubrica import obter_rubrica, rubrica_de
+from sata.notas import calcular_notas
+from sata.parecer import gerar_parecer_resumido
+
+FORMATOS_EXPORTACAO = ('csv', 'xlsx', 'jsonl')
+
+
+def colunas_exportacao(rubrica=None):
+    """
+    Cabeçalho da exportação, com as dimensões e o peso da parte escrita da
+    rubrica (a padrão, se None; as variantes de curso/PIM não mudam nenhum dos dois)
+    """
+    rubrica = rubrica or obter_rubrica()
+    return (
+        ['Professor', 'Curso', 'PIM', 'Empresa', 'Líder', 'Data da Avaliação']
+        + list(rubrica.dimensoes)
+        + ['Nota Objetiva', f"Nota Ponderada ({round(rubrica.fator_escrita * 100, 1):g}%)", 'Parte Oral', 'Nota Total',
+           'Justificativa Oral', 'Parecer Resumido']
+    )
+
+
+def linha_exportacao(estado):
+    """Valores de uma avaliação (formato de ler_progresso) na ordem de colunas_exportacao, com a rubrica do seu curso/PIM"""
+    rubrica = rubrica_de(estado)
+    notas_tabela = estado.get('notas_tabela', {})
+    nota_objetiva, nota_ponderada = calcular_notas(notas_tabela, rubrica)
+    parte_oral = estado.get('parte_oral', 0.0)
+    data_avaliacao = estado.get('data_avaliacao')
+
+    return (
+        [estado.get('professor', ''), estado.get('curso', ''), estado.get('pim', ''),
+         estado.get('empresa', ''), estado.get('lider', ''),
+         data_avaliacao.strftime("%d/%m/%Y") if data_avaliacao else '']
+        + [round(float(notas_tabela.get(dimensao, 0)), 2) for dimensao in rubrica.dimensoes]
+        + [round(nota_objetiva, 2), round(nota_ponderada, 2), round(parte_oral, 2),
+           round(nota_ponderada + parte_oral, 2),
+           estado.get('justificativa_oral', ''), gerar_parecer_resumido(estado)]
+    )
+
+
+def exportar_csv(avaliacoes, destino, separador=';'):
+    """
+    Grava as avaliações em CSV no arquivo texto destino (aberto com newline='').
+    Com o separador ';' (padrão do Excel em português) os decimais usam vírgula.
+    Retorna a quantidade de linhas gravadas.
+    """
+    escritor = csv.writer(destino, delimiter=separador)
+    escritor.writerow(colunas_exportacao())
+    decimal = ',' if separador == ';' else '.'
+
+    quantidade = 0
+    for estado in avaliacoes:
+        escritor.writerow([
+            f"{valor:.2f}".replace('.', decimal) if isinstance(valor, float) else valor
+            for valor in linha_exportacao(estado)
+        ])
+        quantidade += 1
+    return quantidade
+
+
+def exportar_xlsx(avaliacoes, destino):
+    """Grava as avaliações em uma planilha XLSX (caminho ou arquivo binário). Retorna a quantidade de linhas"""
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Notas")
+    aba.freeze_panes = 'A2'
+    aba.append(colunas_exportacao())
+
+    quantidade = 0
+    for estado in avaliacoes:
+        aba.append(linha_exportacao(estado))
+        quantidade += 1
+    planilha.save(destino)
+    return quantidade
+
+
+def exportar(avaliacoes, destino, formato='csv', separador=';'):
+    """
+    Grava as avaliações no arquivo binário destino: 'csv' (UTF-8 com BOM, para o
+    Excel reconhecer os acentos), 'xlsx' ou 'jsonl' (diário com as avaliações
+    completas, um registro por grupo). Retorna a quantidade de linhas.
+    """
+    if formato == 'xlsx':
+        return exportar_xlsx(avaliacoes, destino)
+    if formato == 'jsonl':
+        from sata.diario import escrever_diario
+        return escrever_diario(avaliacoes, destino)
+    if formato != 'csv':
+        raise ValueError(f"Formato de exportação inválido: {formato!r} (use {', '.join(FORMATOS_EXPORTACAO)})")
+
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    try:
+        return exportar_csv(avaliacoes, texto, separador)
+    finally:
+        texto.detach()  # grava o que falta sem fechar o destino
@@ -0,0 +1,143 @@
+"""
+Fila de grupos para retomar a correção a partir de vários backups de uma vez
+(vários .json/.json.gz, um .zip com vários ou um diário .jsonl, de
+sata.diario), com navegação anterior/próximo.
+
+Todos os backups são validados ao montar a fila (ler_progresso, que confere o
+esquema); os inválidos são informados um a um e ficam de fora. A fila guarda
+só o conteúdo original de cada backup, e preparar_vizinhos lê com antecedência
+o estado dos grupos anterior e seguinte ao atual, para que a troca de grupo
+não espere a leitura.
+
+Um grupo já aberto pela fila é gravado no banco local pelo autosalvar do app:
+ao voltar a ele, o estado vem do banco, com as alterações feitas, e não do backup.
+"""
+import zipfile
+from io import BytesIO
+
+from sata.diario import EXTENSAO_DIARIO, linhas_diario
+from sata.progresso import EXTENSOES_BACKUP, ler_progresso
+
+# Tamanho máximo de um backup dentro do .zip (os backups têm poucos KB)
+TAMANHO_MAXIMO_BACKUP = 10 * 1024 * 1024
+
+
+def _backups(arquivos, falhas):
+    """
+    (nome, conteúdo) de cada backup de arquivos, abrindo os .zip e separando
+    os registros dos diários (o mais recente de cada grupo, que é um backup
+    por si só); problemas com os .zip vão para falhas
+    """
+    for nome, conteudo in arquivos:
+        if nome.lower().endswith(EXTENSAO_DIARIO):
+            for numero, linha in linhas_diario(BytesIO(conteudo)):
+                yield f"{nome}:{numero}", linha
+            continue
+        if not nome.lower().endswith('.zip'):
+            yield nome, conteudo
+            continue
+        try:
+            with zipfile.ZipFile(BytesIO(conteudo)) as zf:
+                membros = [info for info in sorted(zf.infolist(), key=lambda info: info.filename)
+                           if info.filename.lower().endswith(EXTENSOES_BACKUP) and not info.is_dir()
+                           and not info.filename.startswith('__MACOSX/')]
+                if not membros:
+                    falhas.append((nome, "nenhum backup (.json ou .json.gz) dentro do .zip"))
+                for info in membros:
+                    if info.file_size > TAMANHO_MAXIMO_BACKUP:
+                        falhas.append((f"{nome}/{info.filename}", "arquivo grande demais para um backup"))
+                    else:
+                        yield f"{nome}/{info.filename}", zf.read(info)
+        except zipfile.BadZipFile as e:
+            falhas.append((nome, f"Arquivo .zip inválido: {e}"))
+
+
+class EntradaFila:
+    """Um backup da fila: nome do arquivo, conteúdo original, identificação do grupo e, depois de aberto, o id no banco"""
+    def __init__(self, nome, conteudo, progresso):
+        self.nome = nome
+        self.conteudo = conteudo
+        self.empresa = progresso['empresa']
+        self.lider = progresso['lider']
+        self.grupo_id = None
+
+    @property
+    def rotulo(self):
+        return f"{self.empresa or 'Sem empresa'} — {self.lider or 'Sem líder'}"
+
+
+class FilaGrupos:
+    """Grupos a corrigir, na ordem dos arquivos, com a posição do grupo aberto"""
+    def __init__(self, entradas):
+        self.entradas = list(entradas)
+        self.posicao = 0
+        self._preparados = {}  # posição -> estado (formato de ler_progresso) já lido
+
+    def __len__(self):
+        return len(self.entradas)
+
+    @property
+    def atual(self):
+        return self.entradas[self.posicao]
+
+    def tem_anterior(self):
+        return self.posicao > 0
+
+    def tem_proximo(self):
+        return self.posicao < len(self.entradas) - 1
+
+    def ler(self, posicao, armazem=None):
+        """Estado do grupo na posição: do banco, se já foi aberto e gravado, ou do backup"""
+        entrada = self.entradas[posicao]
+        if entrada.grupo_id is not None and armazem is not None:
+            return armazem.carregar(entrada.grupo_id)
+        return ler_progresso(entrada.conteudo)
+
+    def abrir(self, posicao, armazem=None, grupo_id_atual=None):
+        """
+        Vai para o grupo da posição e retorna (estado, grupo_id) para restaurar,
+        usando o estado preparado com antecedência, se houver. grupo_id_atual é
+        o id no banco do grupo que está sendo deixado, que passa a ser lido de
+        lá ao voltar a ele. Um backup aberto pela primeira vez cujo grupo já
+        está no banco (mesma identificação, ex.: a turma carregada de novo)
+        recebe o id desse grupo, para ser gravado nele e não em um grupo novo.
+        """
+        if grupo_id_atual is not None:
+            self.atual.grupo_id = grupo_id_atual
+        estado = self._preparados.pop(posicao, None)
+        if estado is None:
+            estado = self.ler(posicao, armazem)
+        self._preparados.pop(self.posicao, None)  # pode ter sido alterado desde que foi lido
+        self.posicao = posicao
+        if self.atual.grupo_id is None and armazem is not None:
+            self.atual.grupo_id = armazem.procurar_grupo(estado)
+        return estado, self.atual.grupo_id
+
+    def preparar_vizinhos(self, armazem=None):
+        """Lê o estado dos grupos anterior e seguinte, se ainda não lido; descarta os demais"""
+        vizinhos = [p for p in (self.posicao - 1, self.posicao + 1) if 0 <= p < len(self.entradas)]
+        self._preparados = {p: estado for p, estado in self._preparados.items() if p in vizinhos}
+        for p in vizinhos:
+            if p not in self._preparados:
+                self._preparados[p] = self.ler(p, armazem)
+
+
+def montar_fila(arquivos):
+    """
+    Valida os backups de arquivos, uma sequência de (nome, bytes) com .json,
+    .json.gz, .zip ou .jsonl, e monta a fila com os válidos, na ordem recebida.
+    Retorna (FilaGrupos, falhas), com falhas uma lista de (nome, erro).
+    """
+    entradas, estados, falhas = [], [], []
+    for nome, conteudo in _backups(arquivos, falhas):
+        try:
+            progresso = ler_progresso(conteudo)
+        except ValueError as e:
+            falhas.append((nome, str(e)))
+            continue
+        entradas.append(EntradaFila(nome, conteudo, progresso))
+        estados.append(progresso)
+    fila = FilaGrupos(entradas)
+    # Os dois primeiros já foram lidos na validação: o que será aberto e o seguinte
+    fila._preparados = dict(enumerate(estados[:2]))
+    return fila, falhas
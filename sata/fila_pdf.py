@@ -0,0 +1,191 @@
+"""
+Fila de geração de PDFs em segundo plano, compartilhada pelas sessões do app.
+
+Os relatórios são gerados em um pool de processos de tamanho fixo, fora da
+thread do script do Streamlit: o app só envia o trabalho e consulta o estado
+nos reruns seguintes. No máximo um trabalho por processo fica em execução;
+os demais esperam na fila, em ordem de chegada, com no máximo um trabalho
+aguardando por sessão (um novo pedido da mesma sessão substitui o anterior
+que ainda não começou). Assim nenhuma sessão ocupa o pool inteiro.
+
+Com um cache (sata.cache_pdf.CachePDF), cada PDF gerado com chave é guardado
+nele ao terminar, mesmo que a sessão que o pediu já tenha fechado.
+"""
+import copy
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+AGUARDANDO = 'aguardando'
+GERANDO = 'gerando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+
+PROCESSOS_PADRAO = int(os.environ.get('SATA_PROCESSOS_PDF', 2))
+
+
+def _renderizar(dados_pdf, documento=None):
+    """Gera o PDF no processo do pool (do documento já montado, se houver) e retorna os bytes"""
+    from sata.pdf import gerar_pdf_relatorio
+
+    pdf_buffer = BytesIO()
+    gerar_pdf_relatorio(dados_pdf, pdf_buffer, documento)
+    return pdf_buffer.getvalue()
+
+
+class TrabalhoPDF:
+    """Um pedido de PDF: estado, e os bytes (ou a mensagem de erro) quando termina"""
+    def __init__(self, trabalho_id, sessao, dados_pdf, chave, documento=None):
+        self.id = trabalho_id
+        self.sessao = sessao
+        self.dados_pdf = dados_pdf
+        self.documento = documento
+        self.chave = chave
+        self.estado = AGUARDANDO
+        self.pdf = None
+        self.erro = None
+        self.enviado_em = time.monotonic()
+        self.iniciado_em = None
+        self.concluido_em = None
+
+    @property
+    def terminado(self):
+        return self.estado in (CONCLUIDO, ERRO)
+
+
+class FilaPDF:
+    """
+    Fila justa de geração de PDFs sobre um pool de processos. Segura para uso
+    por várias threads (uma instância por servidor, via st.cache_resource).
+    """
+    def __init__(self, processos=PROCESSOS_PADRAO, max_concluidos=100, cache=None):
+        self.processos = max(1, processos)
+        self.max_concluidos = max_concluidos
+        self.cache = cache
+        # RLock: add_done_callback chama _concluir na hora se o futuro já terminou
+        self._lock = threading.RLock()
+        self._executor = None
+        self._ids = itertools.count(1)
+        self._trabalhos = {}
+        self._aguardando = OrderedDict()  # sessao -> trabalho, em ordem de chegada
+        self._em_execucao = 0
+        self._concluidos = OrderedDict()  # trabalho_id -> None, do mais antigo ao mais novo
+
+    def enviar(self, sessao, dados_pdf, chave=None, documento=None):
+        """
+        Coloca um PDF na fila e retorna o id do trabalho. Se a sessão já tem um
+        trabalho com a mesma chave aguardando ou em execução, retorna esse
+        trabalho; um trabalho diferente que ainda aguarda é substituído.
+        documento: o DocumentoRelatorio dos dados (sata.documento), se já
+        montado; o processo gera o PDF dele, sem montá-lo de novo.
+        """
+        with self._lock:
+            for trabalho in self._trabalhos.values():
+                if (trabalho.sessao == sessao and chave is not None and trabalho.chave == chave
+                        and not trabalho.terminado):
+                    return trabalho.id
+
+            anterior = self._aguardando.pop(sessao, None)
+            if anterior is not None:
+                del self._trabalhos[anterior.id]
+
+            # Cópia: o envio ao processo é assíncrono e o estado da sessão continua mudando.
+            # O documento não muda (imutável) e dispensa os dados.
+            if documento is None:
+                trabalho = TrabalhoPDF(next(self._ids), sessao, copy.deepcopy(dados_pdf), chave)
+            else:
+                trabalho = TrabalhoPDF(next(self._ids), sessao, None, chave, documento)
+            self._trabalhos[trabalho.id] = trabalho
+            self._aguardando[sessao] = trabalho
+            self._despachar()
+            return trabalho.id
+
+    def consultar(self, trabalho_id):
+        """O TrabalhoPDF, ou None se o id não existe mais (substituído ou descartado)"""
+        with self._lock:
+            return self._trabalhos.get(trabalho_id)
+
+    def posicao(self, trabalho_id):
+        """Quantos trabalhos estão à frente deste na fila (0 se já está em execução ou terminou)"""
+        with self._lock:
+            for posicao, trabalho in enumerate(self._aguardando.values()):
+                if trabalho.id == trabalho_id:
+                    return posicao + 1
+            return 0
+
+    def retirar(self, trabalho_id):
+        """Remove da fila um trabalho terminado e o retorna (None se não terminou)"""
+        with self._lock:
+            trabalho = self._trabalhos.get(trabalho_id)
+            if trabalho is None or not trabalho.terminado:
+                return None
+            del self._trabalhos[trabalho_id]
+            self._concluidos.pop(trabalho_id, None)
+            return trabalho
+
+    def situacao(self):
+        """(trabalhos em execução, trabalhos aguardando)"""
+        with self._lock:
+            return self._em_execucao, len(self._aguardando)
+
+    def encerrar(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _despachar(self):
+        """Envia ao pool os próximos trabalhos enquanto houver processo livre; chamar com o lock"""
+        while self._aguardando and self._em_execucao < self.processos:
+            _, trabalho = self._aguardando.popitem(last=False)
+            if self._executor is None:
+                # spawn: o servidor do Streamlit tem várias threads, e fork nesse caso não é seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processos, mp_context=multiprocessing.get_context('spawn')
+                )
+            trabalho.estado = GERANDO
+            trabalho.iniciado_em = time.monotonic()
+            self._em_execucao += 1
+            try:
+                futuro = self._executor.submit(_renderizar, trabalho.dados_pdf, trabalho.documento)
+            except BrokenProcessPool as e:
+                self._executor = None
+                futuro = Future()
+                futuro.set_exception(e)
+            futuro.add_done_callback(lambda f, t=trabalho: self._concluir(t, f))
+
+    def _concluir(self, trabalho, futuro):
+        try:
+            pdf, erro = futuro.result(), None
+        except Exception as e:
+            pdf, erro = None, e
+        # Fora do lock da fila: o cache pode gravar em disco
+        if pdf is not None and self.cache is not None and trabalho.chave is not None:
+            self.cache.guardar(trabalho.chave, pdf)
+
+        with self._lock:
+            self._em_execucao -= 1
+            trabalho.concluido_em = time.monotonic()
+            trabalho.dados_pdf = trabalho.documento = None
+            if erro is None:
+                trabalho.pdf = pdf
+                trabalho.estado = CONCLUIDO
+            else:
+                trabalho.erro = f"{type(erro).__name__}: {erro}"
+                trabalho.estado = ERRO
+                if isinstance(erro, BrokenProcessPool):
+                    self._executor = None  # um processo morreu; o próximo despacho cria outro pool
+
+            # Resultados não retirados (ex.: a sessão fechou) são descartados dos mais antigos
+            self._concluidos[trabalho.id] = None
+            while len(self._concluidos) > self.max_concluidos:
+                antigo, _ = self._concluidos.popitem(last=False)
+                self._trabalhos.pop(antigo, None)
+
+            self._despachar()
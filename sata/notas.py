@@ -0,0 +1,19 @@
+"""Cálculo das notas e recomendações a partir das notas por dimensão"""
+from sata.rubrica import obter_rubrica
+
+
+def calcular_notas(notas_tabela, rubrica=None):
+    rubrica = rubrica or obter_rubrica()
+    nota_objetiva = sum(notas_tabela.values())
+    nota_ponderada = nota_objetiva * rubrica.fator_escrita
+    return nota_objetiva, nota_ponderada
+
+
+def gerar_recomendacoes(notas_tabela, avaliacoes, rubrica=None):
+    """
+    Recomendações gerais para as notas e as sugestões marcadas (avaliacoes no
+    formato de ler_progresso), da mais para a menos relevante, pelas regras
+    da rubrica (sata.recomendacoes; para muitas avaliações, recomendar_em_lotes)
+    """
+    from sata.recomendacoes import motor_recomendacoes  # numpy só é importado quando usado
+    return motor_recomendacoes(rubrica).recomendar([{'notas_tabela': notas_tabela, 'avaliacoes': avaliacoes}])[0]
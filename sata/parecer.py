@@ -0,0 +1,49 @@
+"""Parecer resumido (texto para a plataforma do PIM)"""
+import functools
+
+from sata.documento import montar_documento
+
+
+@functools.lru_cache(maxsize=16)
+def _abertura_parecer(rubrica):
+    """Texto padrão do início do parecer, que só depende da rubrica (dimensões e pesos)"""
+    total = sum(rubrica.dimensoes.values())
+    criterios = [f"{rubrica.trechos_parecer[dimensao]} ({round(nota_maxima / total * 100, 1):g}%)"
+                 for dimensao, nota_maxima in rubrica.dimensoes.items()]
+    return (
+        "A construção de um trabalho acadêmico envolve variáveis normativas, aspectos formais de pesquisa "
+        "e adequação de conteúdos aos tópicos propostos pelo roteiro do Projeto Integrado Multidisciplinar. "
+        "Desse modo, a avaliação do PIM (parte escrita) serve ao propósito de contemplar a análise das seguintes "
+        f"dimensões e critérios de ponderação: {', '.join(criterios[:-1])} e {criterios[-1]}. "
+        "Para tanto, segue a distribuição dos pontos com o respectivo desempenho discente para cada uma das dimensões avaliadas: "
+    )
+
+
+def texto_parecer(documento):
+    """Parecer resumido de um DocumentoRelatorio (sata.documento)"""
+    rubrica = documento.rubrica
+    detalhes = []
+    for secao in documento.secoes:
+        # Observações sem as tags [Problema] e [Solução] e o comentário, separados por vírgulas
+        detalhes_obs = list(secao.observacoes_parecer)
+        if secao.comentario:
+            detalhes_obs.append(secao.comentario)
+        dimensao_texto = f"{secao.dimensao}: Nota {secao.nota:.1f}/{secao.nota_maxima:.1f}"
+        if detalhes_obs:
+            dimensao_texto += ". " + ", ".join(detalhes_obs) + "."
+        else:
+            dimensao_texto += "."
+        detalhes.append(dimensao_texto)
+
+    return _abertura_parecer(rubrica) + " ".join(detalhes) + (
+        f" Parte Escrita: Nota {documento.nota_ponderada:.1f}/{rubrica.nota_maxima_escrita:.1f}."
+        f" Parte Oral: Nota {documento.parte_oral:.1f}/{rubrica.nota_maxima_oral:.1f} ({documento.justificativa_oral})."
+        f" Nota Total: {documento.nota_total:.2f}/{rubrica.nota_maxima_escrita + rubrica.nota_maxima_oral:.1f}."
+    )
+
+
+def gerar_parecer_resumido(dados):
+    """
+    Gera parecer resumido automático combinando texto padrão com dados da avaliação
+    """
+    return texto_parecer(montar_documento(dados))
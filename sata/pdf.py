@@ -0,0 +1,473 @@
+"""
+Relatório de avaliação em PDF (ReportLab).
+
+Este é o único módulo do pacote que importa o ReportLab; importe-o apenas
+quando for de fato gerar um PDF.
+"""
+import functools
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import (
+    BaseDocTemplate, SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable, Frame,
+    PageTemplate
+)
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+from reportlab import rl_config
+
+from sata.documento import montar_documento
+from sata.parecer import texto_parecer
+from sata.rubrica import obter_rubrica
+
+# Caracteres de texto digitado por Paragraph: um texto maior vira vários, para que o
+# ReportLab não tenha de reparticionar um parágrafo enorme a cada página
+TAMANHO_BLOCO = 4000
+
+
+class NumberedCanvas(canvas.Canvas):
+    """
+    Canvas personalizado com números de página no rodapé.
+
+    O total de páginas só é conhecido no fim do documento. Em vez de guardar o
+    estado de cada página até o save(), cada rodapé referencia um formulário PDF
+    (Form XObject) com o total, que é desenhado uma única vez no save(). Assim
+    cada página é finalizada assim que termina. O ReportLab guarda o conteúdo
+    de cada página sem compressão até o save(); comprimi-lo ao fim da página
+    (com os mesmos filtros) deixa em memória só o tamanho final no arquivo.
+    """
+    FORM_TOTAL = "total_paginas"
+
+    def showPage(self):
+        self._desenhar_rodape()
+        canvas.Canvas.showPage(self)
+        self._comprimir_pagina()
+
+    def _comprimir_pagina(self):
+        pagina = self._doc.Pages.pages[-1]
+        if pagina.stream and pagina.compression:
+            filtros = [pdfdoc.PDFBase85Encode, pdfdoc.PDFZCompress] if rl_config.useA85 else [pdfdoc.PDFZCompress]
+            conteudo = pagina.stream
+            for filtro in reversed(filtros):
+                conteudo = filtro.encode(conteudo)
+            fluxo = pdfdoc.PDFStream(content=conteudo)
+            fluxo.dictionary['Filter'] = pdfdoc.PDFArray([pdfdoc.PDFName(f.pdfname) for f in filtros])
+            fluxo.__Comment__ = "page stream"
+            pagina.Contents = fluxo
+            pagina.stream = None
+
+    def _desenhar_rodape(self):
+        texto = f"Página {self._pageNumber} de "
+        self.saveState()
+        self.setFont("Helvetica", 8)
+        self.drawString(7.5 * inch, 0.5 * inch, texto)
+        self.translate(7.5 * inch + self.stringWidth(texto, "Helvetica", 8), 0.5 * inch)
+        self.doForm(self.FORM_TOTAL)
+        self.restoreState()
+
+    def save(self):
+        if len(self._code):
+            self.showPage()
+        total_pages = self._pageNumber - 1
+
+        self.beginForm(self.FORM_TOTAL)
+        self.setFont("Helvetica", 8)
+        self.drawString(0, 0, str(total_pages))
+        self.endForm()
+
+        canvas.Canvas.save(self)
+
+
+class ModeloRelatorio:
+    """
+    Parte fixa do relatório PDF: estilos, estilo e larguras da tabela de
+    avaliação, margens e textos que não dependem do grupo avaliado, só da
+    rubrica (títulos, notas máximas e pesos).
+    É montada uma única vez por rubrica (ver modelo_relatorio) e reaproveitada em todos os PDFs.
+    """
+    def __init__(self, rubrica):
+        styles = getSampleStyleSheet()
+
+        self.titulo_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=11,
+            textColor=colors.HexColor('#000000'),
+            spaceAfter=8,
+            spaceBefore=0,
+            alignment=0,
+            bold=True,
+            keepWithNext=True
+        )
+
+        self.section_style = ParagraphStyle(
+            'SectionTitle',
+            parent=styles['Heading2'],
+            fontSize=10,
+            textColor=colors.HexColor('#1a1a1a'),
+            spaceAfter=4,
+            spaceBefore=8,
+            bold=True,
+            keepWithNext=True
+        )
+
+        self.normal_style = ParagraphStyle(
+            'Normal',
+            parent=styles['Normal'],
+            fontSize=8,
+            spaceAfter=2,
+            leading=10
+        )
+
+        # Linhas de uma lista (observações, comentário, notas adicionais) antes da última:
+        # sem espaço depois, com a mesma aparência das linhas de um só parágrafo
+        self.linha_style = ParagraphStyle('Linha', parent=self.normal_style, spaceAfter=0)
+
+        self.margens = dict(
+            pagesize=A4,
+            topMargin=0.5*inch,
+            bottomMargin=1.0*inch,
+            leftMargin=0.6*inch,
+            rightMargin=0.6*inch
+        )
+
+        # Títulos numerados das dimensões ("II.1 APRESENTAÇÃO GERAL DO TRABALHO", ...)
+        self.titulos_dimensoes = [
+            escape(f"II.{num_dim} {titulo_dim_completo}")
+            for num_dim, titulo_dim_completo in enumerate(rubrica.titulos.values(), 1)
+        ]
+
+        # Tabela de avaliação: cabeçalho (as linhas vêm das seções do DocumentoRelatorio)
+        self.tabela_cabecalho = ["Dimensão Avaliada", "Nota Máxima", "Nota Atribuída"]
+        self.tabela_col_widths = [3.5*inch, 1.0*inch, 1.2*inch]
+        self.tabela_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#d3d3d3')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+            ('TOPPADDING', (0, 0), (-1, 0), 6),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#000000')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')]),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4)
+        ])
+
+        self.ident_template = """
+    <b>Curso:</b> {curso}<br/>
+    <b>PIM:</b> {pim}<br/>
+    <b>Líder:</b> {lider}<br/>
+    <b>Organização/Empresa:</b> {empresa}<br/>
+    <b>Professor responsável:</b> {professor}<br/>
+    <b>Data da avaliação:</b> {data_avaliacao}
+    """
+
+        objetiva = f"{sum(rubrica.dimensoes.values()):.1f}"
+        escrita, oral = rubrica.nota_maxima_escrita, rubrica.nota_maxima_oral
+        peso = f"{round(rubrica.fator_escrita * 100, 1):g}%"
+        self.notas_template = f"""
+    <b>Nota Objetiva:</b> {{nota_obj:.1f}}/{objetiva} (nota atribuída considerando o trabalho avaliado em uma escala de 0,0 a {objetiva.replace('.', ',')}).<br/>
+    <b>Nota Ponderada ({peso}):</b> {{nota_pond:.2f}}/{escrita:.1f} (esta nota considera a avaliação escrita, que corresponde a {peso} da nota total do PIM).<br/>
+    <b>Nota Oral:</b> {{parte_oral:.1f}}/{oral:.1f} (nota correspondente à avaliação da apresentação oral, via seminário ou feira acadêmica).<br/>
+    <b>Nota Total:</b> {{nota_total:.2f}}/{escrita + oral:.1f} (nota efetivamente lançada em sistema acadêmico).
+    """
+
+
+@functools.lru_cache(maxsize=16)
+def modelo_relatorio(rubrica=None):
+    """
+    Retorna o ModeloRelatorio compartilhado da rubrica, montado na primeira
+    chamada. Sem rubrica, o da rubrica padrão (margens e estilos são os mesmos em todas)
+    """
+    return ModeloRelatorio(rubrica or obter_rubrica())
+
+
+def _blocos(texto, tamanho=TAMANHO_BLOCO):
+    """
+    Partes de até tamanho caracteres do texto, cortadas de preferência no fim de
+    uma frase (ou em um espaço) da segunda metade de cada parte
+    """
+    blocos = []
+    while len(texto) > tamanho:
+        corte = texto.rfind('. ', tamanho // 2, tamanho) + 1 or texto.rfind(' ', tamanho // 2, tamanho)
+        if corte <= 0:
+            corte = tamanho
+        blocos.append(texto[:corte])
+        texto = texto[corte:].lstrip()
+    blocos.append(texto)
+    return blocos
+
+
+def _paragrafos(linhas, modelo, marcador=''):
+    """
+    Paragraphs das linhas de texto digitado (escapado, nunca interpretado como
+    marcação), um por bloco de cada linha, com o marcador no começo de cada
+    linha. Só o último tem o espaço depois do normal_style, como se as linhas
+    estivessem em um só parágrafo separadas por <br/>.
+    """
+    textos = []
+    for linha in linhas:
+        blocos = _blocos(linha)
+        # Linha em branco (notas adicionais): um espaço não separável, para ocupar a altura de uma linha
+        textos.append(marcador + escape(blocos[0]) if blocos[0].strip() or marcador else '&#160;')
+        textos.extend(escape(bloco) for bloco in blocos[1:])
+    return [Paragraph(texto, modelo.linha_style) for texto in textos[:-1]] + \
+        [Paragraph(texto, modelo.normal_style) for texto in textos[-1:]]
+
+
+def gerar_pdf_relatorio(dados, caminho_saida, documento=None):
+    """
+    Gera relatório de avaliação em PDF com paginação correta. documento: o
+    DocumentoRelatorio dos dados, se já montado (dados pode então ser None)
+    """
+    doc = SimpleDocTemplate(caminho_saida, **modelo_relatorio().margens)
+    doc.build(historia_relatorio(dados, documento), canvasmaker=NumberedCanvas)
+
+
+def historia_relatorio(dados, documento=None):
+    """
+    Flowables (seções I a V) do relatório de um grupo, usados no PDF individual
+    e no da turma. documento: o DocumentoRelatorio dos dados, se já montado
+    """
+    documento = documento or montar_documento(dados)
+    modelo = modelo_relatorio(documento.rubrica)
+    titulo_style = modelo.titulo_style
+    section_style = modelo.section_style
+    normal_style = modelo.normal_style
+
+    story = []
+    
+    # ========== CAPA ==========
+    story.append(Paragraph("RELATÓRIO DE AVALIAÇÃO DO PIM", titulo_style))
+    story.append(Spacer(1, 0.05*inch))
+    
+    # ========== SEÇÃO I - IDENTIFICAÇÃO ==========
+    story.append(Paragraph("I. Identificação", section_style))
+    
+    ident_text = modelo.ident_template.format(
+        curso=escape(str(documento.curso)),
+        pim=escape(str(documento.pim)),
+        lider=escape(str(documento.lider)),
+        empresa=escape(str(documento.empresa)),
+        professor=escape(str(documento.professor)),
+        data_avaliacao=escape(str(documento.data_avaliacao))
+    )
+    story.append(Paragraph(ident_text, normal_style))
+    story.append(Spacer(1, 0.08*inch))
+    
+    # ========== SEÇÃO II - DIMENSÕES DE AVALIAÇÃO ==========
+    story.append(Paragraph("II. Dimensões de Avaliação", section_style))
+    story.append(Spacer(1, 0.03*inch))
+    
+    for titulo_dim, secao in zip(modelo.titulos_dimensoes, documento.secoes):
+        story.append(Paragraph(titulo_dim, section_style))
+        
+        # Mostrar Observações
+        if secao.observacoes:
+            story.append(Paragraph(f"<b>Observações:</b>", normal_style))
+            story.extend(_paragrafos(secao.observacoes, modelo, "• "))
+        
+        # Mostrar Comentários do Professor
+        if secao.comentario:
+            story.append(Paragraph(f"<b>Comentários do Professor:</b>", normal_style))
+            story.extend(_paragrafos(secao.linhas_comentario, modelo, "• "))
+        
+        story.append(Spacer(1, 0.04*inch))
+    
+    # ========== SEÇÃO III - TABELA DE AVALIAÇÃO ==========
+    story.append(Paragraph("III. Tabela de Avaliação", section_style))
+    
+    table_data = [modelo.tabela_cabecalho]
+    
+    for secao in documento.secoes:
+        table_data.append([secao.titulo_tabela, str(secao.nota_maxima), f"{secao.nota:.1f}"])
+    
+    table_avaliacao = Table(table_data, colWidths=modelo.tabela_col_widths)
+    table_avaliacao.setStyle(modelo.tabela_style)
+    story.append(table_avaliacao)
+    story.append(Spacer(1, 0.08*inch))
+    
+    # ========== SEÇÃO IV - RECOMENDAÇÕES GERAIS ==========
+    if documento.recomendacoes or documento.comentarios_adicionais:
+        story.append(Paragraph("IV. Recomendações Gerais para Aprimoramento", section_style))
+        
+        for rec in documento.recomendacoes:
+            story.extend(_paragrafos([rec], modelo, "• "))
+        
+        if documento.comentarios_adicionais:
+            story.append(Spacer(1, 0.03*inch))
+            story.append(Paragraph("<b>Notas Adicionais:</b>", normal_style))
+            story.extend(_paragrafos(documento.comentarios_adicionais, modelo))
+        
+        story.append(Spacer(1, 0.08*inch))
+    
+    # ========== SEÇÃO IV - PARECER RESUMIDO ==========
+    story.append(Paragraph("IV. Parecer Resumido", section_style))
+    story.extend(_paragrafos([texto_parecer(documento)], modelo))
+    story.append(Spacer(1, 0.08*inch))
+    
+    # ========== SEÇÃO V - NOTAS ATRIBUÍDAS ==========
+    story.append(Paragraph("V. Notas Atribuídas", section_style))
+    
+    notas_resumo = modelo.notas_template.format(
+        nota_obj=documento.nota_objetiva,
+        nota_pond=documento.nota_ponderada,
+        parte_oral=documento.parte_oral,
+        nota_total=documento.nota_total
+    )
+    story.append(Paragraph(notas_resumo, normal_style))
+    return story
+
+
+class CanvasTurma(NumberedCanvas):
+    """
+    Canvas do PDF da turma (gerar_pdf_turma): as páginas do sumário têm a
+    numeração do documento e cada relatório a sua própria ("Página 2 de 3"),
+    como se fosse o PDF individual. A página em que cada relatório começa (no
+    sumário) e o total de páginas de cada um também só são conhecidos depois;
+    como o total do NumberedCanvas, viram formulários desenhados no save().
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._relatorio = None  # índice do relatório da página atual (None: sumário)
+        self._inicios = []  # página inicial de cada relatório
+
+    def iniciar_relatorio(self, titulo):
+        """Chamado (por _InicioRelatorio) na primeira página de cada relatório"""
+        self._relatorio = len(self._inicios)
+        self._inicios.append(self._pageNumber)
+        destino = f"relatorio_{self._relatorio}"
+        self.bookmarkPage(destino)
+        self.addOutlineEntry(titulo, destino, level=0)
+
+    def _desenhar_rodape(self):
+        if self._relatorio is None:
+            NumberedCanvas._desenhar_rodape(self)
+            return
+        texto = f"Página {self._pageNumber - self._inicios[self._relatorio] + 1} de "
+        self.saveState()
+        self.setFont("Helvetica", 8)
+        self.drawString(7.5 * inch, 0.5 * inch, texto)
+        self.translate(7.5 * inch + self.stringWidth(texto, "Helvetica", 8), 0.5 * inch)
+        self.doForm(f"total_relatorio_{self._relatorio}")
+        self.restoreState()
+
+    def save(self):
+        if len(self._code):
+            self.showPage()
+        proxima = self._pageNumber  # uma depois da última
+        for indice, inicio in enumerate(self._inicios):
+            fim = self._inicios[indice + 1] if indice + 1 < len(self._inicios) else proxima
+            self._formulario_numero(f"total_relatorio_{indice}", fim - inicio)
+            self._formulario_numero(f"inicio_relatorio_{indice}", inicio)
+        NumberedCanvas.save(self)
+
+    def _formulario_numero(self, nome, numero):
+        self.beginForm(nome)
+        self.setFont("Helvetica", 8)
+        self.drawString(0, 0, str(numero))
+        self.endForm()
+
+
+class _InicioRelatorio(Flowable):
+    """Marcador sem tamanho no começo de cada relatório do PDF da turma"""
+    def __init__(self, titulo):
+        super().__init__()
+        self.titulo = titulo
+        self.width = self.height = 0
+
+    def wrap(self, largura_disponivel, altura_disponivel):
+        return 0, 0
+
+    def draw(self):
+        self.canv.iniciar_relatorio(self.titulo)
+
+
+class _LinhaSumario(Flowable):
+    """Linha do sumário: título do relatório e página inicial, com link para ela"""
+    ALTURA = 14
+
+    def __init__(self, indice, titulo):
+        super().__init__()
+        self.indice = indice
+        self.titulo = titulo
+
+    def wrap(self, largura_disponivel, altura_disponivel):
+        self.width = largura_disponivel
+        return self.width, self.ALTURA
+
+    def draw(self):
+        canv = self.canv
+        coluna_pagina = self.width - 0.5 * inch
+        titulo = f"{self.indice + 1}. {self.titulo}"
+        while len(titulo) > 4 and canv.stringWidth(titulo, "Helvetica", 8) > coluna_pagina - 8:
+            titulo = titulo[:-2] + "…"
+        canv.setFont("Helvetica", 8)
+        canv.drawString(0, 4, titulo)
+        canv.drawString(coluna_pagina, 4, "p.")
+        canv.saveState()
+        canv.translate(coluna_pagina + canv.stringWidth("p. ", "Helvetica", 8), 4)
+        canv.doForm(f"inicio_relatorio_{self.indice}")
+        canv.restoreState()
+        canv.linkRect("", f"relatorio_{self.indice}", (0, 0, self.width, self.ALTURA), relative=1)
+
+
+def titulo_relatorio(dados):
+    """Título de um relatório no sumário do PDF da turma"""
+    return f"{dados.get('empresa') or 'N/A'} — {dados.get('lider', '')} ({dados.get('curso', '')}, PIM {dados.get('pim', '')})"
+
+
+class _DocumentoTurma(BaseDocTemplate):
+    """Documento de uma página-modelo que recebe a história aos pedaços (um relatório por vez)"""
+    def construir(self, partes, canvasmaker):
+        quadro = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        self.addPageTemplates([PageTemplate(id='Pagina', frames=quadro, pagesize=self.pagesize)])
+        self._startBuild(canvasmaker=canvasmaker)
+        self.canv._doctemplate = self
+        try:
+            for historia in partes:
+                # Mesmo laço de BaseDocTemplate.build, mas cada parte é descartada ao terminar
+                while historia:
+                    self.clean_hanging()
+                    self.handle_flowable(historia)
+        finally:
+            del self.canv._doctemplate
+        self._endBuild()
+
+
+def gerar_pdf_turma(abrir_relatorios, caminho_saida, titulo="Relatórios de Avaliação do PIM"):
+    """
+    Gera um único PDF com os relatórios de vários grupos, precedidos de um sumário.
+
+    abrir_relatorios é uma função sem argumentos que retorna um iterável novo
+    de dicionários no formato de gerar_pdf_relatorio; é percorrido duas vezes:
+    a primeira só para montar o sumário. Cada relatório é montado, paginado e
+    descartado antes do próximo, e cada página é comprimida assim que termina:
+    o que cresce com a quantidade de grupos é só o próprio PDF, que o
+    ReportLab monta inteiro no save(). Retorna a quantidade de relatórios.
+    """
+    modelo = modelo_relatorio()
+    titulos = [titulo_relatorio(dados) for dados in abrir_relatorios()]
+
+    def partes():
+        sumario = [Paragraph(escape(titulo), modelo.titulo_style),
+                   Paragraph(f"Sumário ({len(titulos)} relatórios)", modelo.section_style)]
+        sumario.extend(_LinhaSumario(indice, t) for indice, t in enumerate(titulos))
+        yield sumario
+        gerados = 0
+        for dados in abrir_relatorios():
+            if gerados == len(titulos):
+                break
+            yield [PageBreak(), _InicioRelatorio(titulos[gerados]), *historia_relatorio(dados)]
+            gerados += 1
+        if gerados < len(titulos):
+            raise ValueError(f"abrir_relatorios retornou {gerados} relatórios na segunda passada, e não {len(titulos)}")
+
+    doc = _DocumentoTurma(caminho_saida, title=titulo, **modelo.margens)
+    doc.construir(partes(), canvasmaker=CanvasTurma)
+    return len(titulos)
@@ -0,0 +1,273 @@
+"""
+Backup JSON do progresso da avaliação (botões Salvar/Continuar Trabalho).
+
+Formato v3: JSON sem indentação; as observações do banco de sugestões são
+gravadas pelo identificador (Rubrica.ids, da rubrica do curso/PIM do
+backup) em vez do texto completo, e notas_tabela, que repete as notas das
+dimensões, não é gravada.
+Opcionalmente compactado com gzip. ler_progresso lê também os backups v2.1
+e confere cada backup contra o esquema (validar_progresso) antes de lê-lo.
+"""
+import gzip
+import json
+from datetime import datetime
+
+from sata.rubrica import rubrica_de
+
+VERSAO_BACKUP = '3'
+
+# Extensões dos arquivos de backup (o .json.gz é o backup compactado)
+EXTENSOES_BACKUP = ('.json', '.json.gz')
+
+_GZIP_MAGICO = b'\x1f\x8b'
+
+# Esquema do backup: tipos aceitos de cada campo. Todos são opcionais (os
+# ausentes assumem o padrão de ler_progresso); sugestoes é só do v3 e
+# notas_tabela, só do v2.1.
+ESQUEMA_BACKUP = {
+    'versao': (str, int, float),
+    'timestamp': str,
+    'curso': str,
+    'lider': str,
+    'pim': str,
+    'empresa': str,
+    'professor': str,
+    'data_avaliacao': (str, type(None)),
+    'avaliacoes': dict,
+    'notas_tabela': dict,
+    'recomendacoes_selecionadas': list,
+    'comentarios_adicionais': str,
+    'parte_oral': (int, float),
+    'justificativa_oral': str,
+    'tipo_discussao': str
+}
+ESQUEMA_AVALIACAO = {
+    'nota': (int, float),
+    'comentario': str,
+    'observacoes': list,
+    'sugestoes': list
+}
+_NOMES_TIPOS = {str: 'texto', int: 'número', float: 'número', dict: 'objeto', list: 'lista', type(None): 'null'}
+
+
+def _confere_tipo(valor, tipos):
+    # bool é int em Python, mas true/false não é número no JSON
+    return isinstance(valor, tipos) and not isinstance(valor, bool)
+
+
+def _erro_tipo(campo, tipos):
+    nomes = dict.fromkeys(_NOMES_TIPOS[tipo] for tipo in (tipos if isinstance(tipos, tuple) else (tipos,)))
+    return f"{campo}: esperado {' ou '.join(nomes)}"
+
+
+def _erros_avaliacao(dimensao, item, rubrica):
+    """Erros de uma dimensão de avaliacoes (v3 ou v2.1)"""
+    if dimensao not in rubrica.dimensoes:
+        return [f"avaliacoes: dimensão desconhecida: {dimensao}"]
+    if not isinstance(item, dict):
+        return [f"avaliacoes.{dimensao}: esperado objeto"]
+    erros = [_erro_tipo(f"avaliacoes.{dimensao}.{campo}", tipos)
+             for campo, tipos in ESQUEMA_AVALIACAO.items()
+             if campo in item and not _confere_tipo(item[campo], tipos)]
+    nota = item.get('nota', 0)
+    if _confere_tipo(nota, (int, float)) and not 0 <= nota <= rubrica.dimensoes[dimensao]:
+        erros.append(f"avaliacoes.{dimensao}.nota: {nota} fora da faixa 0 a {rubrica.dimensoes[dimensao]}")
+    for campo in ('observacoes', 'sugestoes'):
+        if isinstance(item.get(campo), list) and not all(isinstance(texto, str) for texto in item[campo]):
+            erros.append(f"avaliacoes.{dimensao}.{campo}: esperado lista de textos")
+    if isinstance(item.get('sugestoes'), list):
+        erros.extend(f"avaliacoes.{dimensao}.sugestoes: sugestão desconhecida: {id_sugestao}"
+                     for id_sugestao in item['sugestoes']
+                     if isinstance(id_sugestao, str) and id_sugestao not in rubrica.por_id)
+    return erros
+
+
+def validar_progresso(dados):
+    """
+    Confere um backup já decodificado (resultado do json.loads) contra o
+    esquema: tipos dos campos (ESQUEMA_BACKUP e ESQUEMA_AVALIACAO), dimensões
+    e sugestões conhecidas e notas dentro da faixa (pela rubrica do curso/PIM
+    do backup) e data em formato ISO.
+    Retorna a lista de erros, vazia se o backup for válido.
+    """
+    if not isinstance(dados, dict):
+        return ["o backup não é um objeto JSON"]
+    erros = [_erro_tipo(campo, tipos) for campo, tipos in ESQUEMA_BACKUP.items()
+             if campo in dados and not _confere_tipo(dados[campo], tipos)]
+    rubrica = rubrica_de(dados)
+
+    if isinstance(dados.get('avaliacoes'), dict):
+        for dimensao, item in dados['avaliacoes'].items():
+            erros.extend(_erros_avaliacao(dimensao, item, rubrica))
+    if isinstance(dados.get('recomendacoes_selecionadas'), list):
+        if not all(isinstance(texto, str) for texto in dados['recomendacoes_selecionadas']):
+            erros.append("recomendacoes_selecionadas: esperado lista de textos")
+    parte_oral = dados.get('parte_oral', 0.0)
+    if _confere_tipo(parte_oral, (int, float)) and not 0 <= parte_oral <= rubrica.nota_maxima_oral:
+        erros.append(f"parte_oral: {parte_oral} fora da faixa 0 a {rubrica.nota_maxima_oral}")
+    if isinstance(dados.get('data_avaliacao'), str) and dados['data_avaliacao']:
+        try:
+            datetime.fromisoformat(dados['data_avaliacao'])
+        except ValueError:
+            erros.append(f"data_avaliacao: data inválida: {dados['data_avaliacao']}")
+    return erros
+
+
+def _avaliacoes_v3(avaliacoes, rubrica):
+    """Avaliações por dimensão no formato v3 (sugestões por identificador, campos vazios omitidos)"""
+    compactas = {}
+    for dimensao, avaliacao in avaliacoes.items():
+        item = {'nota': avaliacao.get('nota', 0)}
+        sugestoes, outras = [], []
+        for obs in avaliacao.get('observacoes', []):
+            id_sugestao = rubrica.ids.get((dimensao, obs))
+            if id_sugestao is None:
+                outras.append(obs)  # texto fora do banco atual (ex.: backup antigo)
+            else:
+                sugestoes.append(id_sugestao)
+        if sugestoes:
+            item['sugestoes'] = sugestoes
+        if outras:
+            item['observacoes'] = outras
+        if avaliacao.get('comentario'):
+            item['comentario'] = avaliacao['comentario']
+        compactas[dimensao] = item
+    return compactas
+
+
+def _avaliacoes_de_v3(compactas, rubrica):
+    """Inverso de _avaliacoes_v3: observações com o texto completo"""
+    avaliacoes = {}
+    for dimensao, item in compactas.items():
+        observacoes = []
+        for id_sugestao in item.get('sugestoes', []):
+            if id_sugestao not in rubrica.por_id:
+                raise ValueError(f"Sugestão desconhecida no backup: {id_sugestao}")
+            observacoes.append(rubrica.por_id[id_sugestao][1])
+        observacoes.extend(item.get('observacoes', []))
+        avaliacoes[dimensao] = {
+            'nota': item.get('nota', 0),
+            'comentario': item.get('comentario', ''),
+            'observacoes': observacoes
+        }
+    return avaliacoes
+
+
+def dados_backup(estado, timestamp=None):
+    """
+    Dicionário do backup (formato v3) com o progresso da avaliação, antes de
+    virar JSON. estado é qualquer mapeamento com os campos da avaliação
+    (ex.: st.session_state); timestamp (ISO) é o momento da gravação, agora se omitido.
+    """
+    data_avaliacao = estado.get('data_avaliacao', datetime.now())
+    return {
+        'versao': VERSAO_BACKUP,
+        'timestamp': timestamp or datetime.now().isoformat(),
+        'curso': estado.get('curso', ''),
+        'lider': estado.get('lider', ''),
+        'pim': estado.get('pim', ''),
+        'empresa': estado.get('empresa', ''),
+        'professor': estado.get('professor', ''),
+        'data_avaliacao': data_avaliacao.isoformat() if data_avaliacao else None,
+        'avaliacoes': _avaliacoes_v3(estado.get('avaliacoes', {}), rubrica_de(estado)),
+        'recomendacoes_selecionadas': estado.get('recomendacoes_selecionadas', []),
+        'comentarios_adicionais': estado.get('comentarios_adicionais', ''),
+        'parte_oral': estado.get('parte_oral', 0.0),
+        'justificativa_oral': estado.get('justificativa_oral', ''),
+        'tipo_discussao': estado.get('tipo_discussao', 'Problema (PIM I ou II)')
+    }
+
+
+def serializar_progresso(estado, compactar=False):
+    """
+    Exporta todo o progresso da avaliação em JSON (formato v3), em uma linha só.
+    estado é qualquer mapeamento com os campos da avaliação (ex.: st.session_state).
+    Retorna str, ou bytes gzip com compactar=True.
+    """
+    texto = json.dumps(dados_backup(estado), ensure_ascii=False, separators=(',', ':'))
+    if compactar:
+        return gzip.compress(texto.encode('utf-8'), mtime=0)
+    return texto
+
+
+def ler_progresso(json_data):
+    """
+    Lê um backup JSON (str ou bytes, v3 ou v2.1, compactado com gzip ou não) e
+    retorna os campos da avaliação com os valores padrão preenchidos.
+    data_avaliacao vem como datetime, ou None se o backup não a tiver.
+    Levanta ValueError se o backup for inválido (fora do esquema, ver
+    validar_progresso) ou de uma versão mais nova.
+    """
+    if isinstance(json_data, (bytes, bytearray)) and json_data[:2] == _GZIP_MAGICO:
+        try:
+            json_data = gzip.decompress(json_data)
+        except (OSError, EOFError) as e:
+            raise ValueError(f"Backup compactado inválido: {e}") from e
+    try:
+        dados = json.loads(json_data)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Backup inválido: JSON malformado ({e})") from e
+    return progresso_de_dados(dados)
+
+
+def progresso_de_dados(dados):
+    """
+    Parte de ler_progresso que vem depois do JSON: confere a versão e o
+    esquema do backup já decodificado e migra os campos para o formato atual
+    (o de ler_progresso). Usada também para cada registro do diário (sata.diario).
+    """
+    if not isinstance(dados, dict):
+        raise ValueError("Backup inválido: o conteúdo não é um objeto JSON")
+
+    versao = str(dados.get('versao', '2.1'))
+    if versao != VERSAO_BACKUP and versao.split('.')[0] not in ('1', '2'):
+        raise ValueError(f"Versão de backup não suportada: {versao}")
+    erros = validar_progresso(dados)
+    if erros:
+        raise ValueError("Backup inválido: " + "; ".join(erros))
+
+    if versao == VERSAO_BACKUP:
+        avaliacoes = _avaliacoes_de_v3(dados.get('avaliacoes', {}), rubrica_de(dados))
+        notas_tabela = {dimensao: avaliacao['nota'] for dimensao, avaliacao in avaliacoes.items()}
+    else:
+        avaliacoes = dados.get('avaliacoes', {})
+        notas_tabela = dados.get('notas_tabela', {})
+
+    data_avaliacao = None
+    if dados.get('data_avaliacao'):
+        data_avaliacao = datetime.fromisoformat(dados['data_avaliacao'])
+
+    return {
+        'curso': dados.get('curso', ''),
+        'lider': dados.get('lider', ''),
+        'pim': dados.get('pim', ''),
+        'empresa': dados.get('empresa', ''),
+        'professor': dados.get('professor', ''),
+        'data_avaliacao': data_avaliacao,
+        'avaliacoes': avaliacoes,
+        'notas_tabela': notas_tabela,
+        'recomendacoes_selecionadas': dados.get('recomendacoes_selecionadas', []),
+        'comentarios_adicionais': dados.get('comentarios_adicionais', ''),
+        'parte_oral': dados.get('parte_oral', 0.0),
+        'justificativa_oral': dados.get('justificativa_oral', ''),
+        'tipo_discussao': dados.get('tipo_discussao', 'Problema (PIM I ou II)')
+    }
+
+
+def dados_pdf_de_progresso(progresso):
+    """Converte o resultado de ler_progresso no dicionário esperado por gerar_pdf_relatorio"""
+    data_avaliacao = progresso['data_avaliacao']
+    return {
+        'curso': progresso['curso'],
+        'lider': progresso['lider'],
+        'pim': progresso['pim'],
+        'empresa': progresso['empresa'],
+        'professor': progresso['professor'],
+        'data_avaliacao': data_avaliacao.strftime("%d/%m/%Y") if data_avaliacao else '',
+        'avaliacoes': progresso['avaliacoes'],
+        'notas_tabela': progresso['notas_tabela'],
+        'recomendacoes_selecionadas': progresso['recomendacoes_selecionadas'],
+        'comentarios_adicionais': progresso['comentarios_adicionais'],
+        'parte_oral': progresso['parte_oral'],
+        'justificativa_oral': progresso['justificativa_oral'] or 'Grupo não realizou apresentação'
+    }
@@ -0,0 +1,168 @@
+"""
+Motor de recomendações: das notas por dimensão e das sugestões marcadas às
+recomendações gerais, em ordem de relevância.
+
+As regras vêm da rubrica (regras_recomendacao, sata.rubrica). Cada regra é de
+uma dimensão e dispara quando a nota fica abaixo de abaixo_de e/ou quando
+alguma das sugestões listadas está marcada (se tiver as duas condições, as
+duas precisam valer). Os pontos que ela dá a cada uma das suas recomendações são
+
+    peso × (1 + déficit relativo da nota, se tiver abaixo_de)
+         × (quantidade de sugestões suas marcadas, se tiver sugestoes)
+
+com déficit relativo = (abaixo_de - nota) / abaixo_de. As recomendações são
+ordenadas pela soma dos pontos (no empate, pela ordem das regras) e cortadas
+em max_recomendacoes; se nenhuma regra disparar, fica a recomendacao_padrao.
+
+As regras de cada rubrica são compiladas uma única vez em matrizes
+(motor_recomendacoes), e um lote de avaliações é avaliado de uma vez: as
+notas (avaliação x dimensão) e as sugestões marcadas (avaliação x catálogo)
+viram pontos (avaliação x recomendação) em poucas operações numpy, sem laço
+por avaliação nem por regra.
+"""
+import functools
+from itertools import islice
+
+import numpy as np
+
+from sata.rubrica import obter_rubrica, rubrica_de
+
+# Avaliações por lote em recomendar_em_lotes (memória: lote x catálogo x 4 bytes)
+TAMANHO_LOTE = 4096
+
+
+class MotorRecomendacoes:
+    """Regras de recomendação de uma rubrica compiladas em matrizes; só leitura, pode ser compartilhado"""
+    def __init__(self, rubrica):
+        self.rubrica = rubrica
+        self._dimensoes = list(rubrica.dimensoes)
+        indice_dimensao = {dimensao: i for i, dimensao in enumerate(self._dimensoes)}
+
+        # Coluna de cada sugestão na matriz de seleções: a posição no catálogo. Em
+        # cada dimensão as sugestões estão em sequência, na ordem dos bits da seleção.
+        self._coluna, self._inicio, self._colunas_dimensao = {}, {}, {}
+        for coluna, (dimensao, _, observacao) in enumerate(rubrica.catalogo):
+            self._coluna[(dimensao, observacao)] = coluna
+            self._inicio.setdefault(dimensao, coluna)
+            self._colunas_dimensao.setdefault(dimensao, {})[observacao] = coluna
+
+        # Colunas dos pontos: as recomendações das regras, na ordem em que aparecem
+        # (o desempate), e depois as demais recomendações gerais
+        self.recomendacoes = list(dict.fromkeys(
+            [rec for *_, recomendacoes in rubrica.regras for rec in recomendacoes] + rubrica.recomendacoes_gerais
+        ))
+        # Opções para a escolha manual: as gerais, na ordem da rubrica, e as que só as regras têm
+        self.opcoes = list(dict.fromkeys(rubrica.recomendacoes_gerais + self.recomendacoes))
+        indice_recomendacao = {rec: i for i, rec in enumerate(self.recomendacoes)}
+
+        regras = rubrica.regras
+        self._dimensao = np.array([indice_dimensao[dimensao] for dimensao, *_ in regras], dtype=np.intp)
+        self._limiar = np.array([np.nan if limiar is None else limiar for _, limiar, *_ in regras])
+        self._tem_limiar = ~np.isnan(self._limiar)
+        self._peso = np.array([peso for _, _, _, peso, _ in regras])
+        self._gatilhos = np.zeros((len(rubrica.catalogo), len(regras)), dtype=np.float32)  # sugestão x regra
+        self._recomenda = np.zeros((len(regras), len(self.recomendacoes)))  # regra x recomendação
+        for r, (dimensao, _, sugestoes, _, recomendacoes) in enumerate(regras):
+            for observacao in sugestoes:
+                self._gatilhos[self._coluna[(dimensao, observacao)], r] = 1
+            for rec in recomendacoes:
+                self._recomenda[r, indice_recomendacao[rec]] = 1
+        self._tem_gatilho = self._gatilhos.any(axis=0)
+
+    # ---------- entrada ----------
+
+    def matrizes(self, estados):
+        """
+        (notas, seleções) das avaliações no formato de ler_progresso: arrays
+        avaliação x dimensão e avaliação x catálogo. Observações fora do
+        catálogo da rubrica não entram.
+        """
+        estados = list(estados)
+        linhas_notas, linhas, colunas = [], [], []
+        vazio = {}
+        for i, estado in enumerate(estados):
+            notas_tabela = estado.get('notas_tabela') or vazio
+            linhas_notas.append([float(notas_tabela.get(dimensao) or 0) for dimensao in self._dimensoes])
+            for dimensao, avaliacao in (estado.get('avaliacoes') or vazio).items():
+                coluna_de = self._colunas_dimensao.get(dimensao, vazio)
+                marcadas = [coluna_de[obs] for obs in avaliacao.get('observacoes', ()) if obs in coluna_de]
+                colunas += marcadas
+                linhas += [i] * len(marcadas)
+        notas = np.array(linhas_notas, dtype=float).reshape(len(estados), len(self._dimensoes))
+        selecoes = np.zeros((len(estados), len(self._coluna)), dtype=np.float32)
+        selecoes[linhas, colunas] = 1  # uma atribuição só, em vez de uma por sugestão marcada
+        return notas, selecoes
+
+    # ---------- avaliação das regras ----------
+
+    def pontuar(self, notas, selecoes):
+        """Pontos de cada recomendação (avaliação x self.recomendacoes) para as matrizes de matrizes()"""
+        nota_regra = np.asarray(notas, dtype=float)[:, self._dimensao]  # avaliação x regra
+        with np.errstate(invalid='ignore'):
+            abaixo = nota_regra < self._limiar  # regras sem limiar: comparação com nan, sempre False
+        marcadas = np.asarray(selecoes, dtype=np.float32) @ self._gatilhos  # sugestões marcadas de cada regra
+        dispara = (abaixo | ~self._tem_limiar) & ((marcadas > 0) | ~self._tem_gatilho)
+        deficit = np.where(self._tem_limiar, (self._limiar - nota_regra) / self._limiar, 0.0)
+        pontos_regra = np.where(dispara, self._peso * (1 + deficit) * np.where(self._tem_gatilho, marcadas, 1), 0.0)
+        return pontos_regra @ self._recomenda
+
+    def ranquear(self, notas, selecoes):
+        """Recomendações de cada avaliação das matrizes, da mais para a menos relevante"""
+        pontos = self.pontuar(notas, selecoes)
+        limite = min(self.rubrica.max_recomendacoes, len(self.recomendacoes))
+        ordem = np.argsort(-pontos, axis=1, kind='stable')[:, :limite]
+        positivas = np.take_along_axis(pontos, ordem, axis=1) > 0
+        padrao = [self.rubrica.recomendacao_padrao]
+        return [
+            [self.recomendacoes[j] for j, positiva in zip(linha, marcas) if positiva] or list(padrao)
+            for linha, marcas in zip(ordem.tolist(), positivas.tolist())
+        ]
+
+    def recomendar(self, estados):
+        """Recomendações de cada avaliação (formato de ler_progresso), na mesma ordem"""
+        return self.ranquear(*self.matrizes(estados))
+
+    def recomendar_avaliacao(self, avaliacoes):
+        """Recomendações de uma avaliação no modelo compacto ({dimensão: AvaliacaoDimensao}, sata.avaliacao)"""
+        notas = np.zeros((1, len(self._dimensoes)))
+        selecoes = np.zeros((1, len(self._coluna)), dtype=np.float32)
+        for j, dimensao in enumerate(self._dimensoes):
+            avaliacao = avaliacoes.get(dimensao)
+            if avaliacao is None:
+                continue
+            notas[0, j] = avaliacao.nota
+            inicio, quantidade = self._inicio.get(dimensao, 0), len(self.rubrica.sugestoes_dimensao[dimensao])
+            for bit in avaliacao.bits():
+                if bit < quantidade:
+                    selecoes[0, inicio + bit] = 1
+        return self.ranquear(notas, selecoes)[0]
+
+
+@functools.lru_cache(maxsize=16)
+def _motor(rubrica):
+    return MotorRecomendacoes(rubrica)
+
+
+def motor_recomendacoes(rubrica=None):
+    """MotorRecomendacoes da rubrica (a padrão, se None), compilado uma vez e compartilhado"""
+    return _motor(rubrica or obter_rubrica())
+
+
+def recomendar_em_lotes(estados, tamanho=TAMANHO_LOTE):
+    """
+    Percorre (estado, recomendações) de cada avaliação de estados (formato de
+    ler_progresso), na mesma ordem. estados pode ser um iterador longo (ex.:
+    sata.diario.ler_diario de um semestre): as avaliações são lidas e
+    avaliadas em lotes de até tamanho, separadas pela rubrica do curso/PIM.
+    """
+    estados = iter(estados)
+    while lote := list(islice(estados, tamanho)):
+        por_rubrica = {}
+        for i, estado in enumerate(lote):
+            por_rubrica.setdefault(rubrica_de(estado), []).append(i)
+        resultado = [None] * len(lote)
+        for rubrica, indices in por_rubrica.items():
+            recomendacoes = motor_recomendacoes(rubrica).recomendar(lote[i] for i in indices)
+            for i, recs in zip(indices, recomendacoes):
+                resultado[i] = recs
+        yield from zip(lote, resultado)
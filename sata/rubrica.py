@@ -0,0 +1,430 @@
+"""
+Rubrica de avaliação do PIM: dimensões, pesos, sugestões e regras de recomendação.
+
+A rubrica vem dos arquivos JSON da pasta rubricas/ (ou da indicada em
+SATA_RUBRICAS). padrao.json é a rubrica completa; os demais arquivos são
+variantes por curso e/ou PIM ("aplica_a"), que alteram só o que declaram:
+nota máxima, título, descrição e sugestões extras das dimensões, regras de
+recomendação e recomendações gerais. Sobre o padrão são aplicadas, nesta
+ordem, as variantes só do PIM, só do curso e do curso e PIM. Há um exemplo
+de variante em rubricas/exemplos/ (subpastas não são lidas).
+
+As dimensões e os grupos da Discussão são sempre os do padrão carregado na
+importação (as abas e os widgets do app dependem deles), e as sugestões
+extras entram depois das do padrão: o identificador de cada sugestão
+(ID_SUGESTOES, gravado no backup) é a sua posição, e assim não muda.
+
+Cada combinação de arquivos é compilada uma única vez em uma Rubrica (mapas
+de identificadores, bits das sugestões, pesos e regras), compartilhada por
+todas as sessões. obter_rubrica confere, no máximo uma vez a cada
+INTERVALO_VERIFICACAO segundos, se algum arquivo da pasta mudou (data de
+modificação e tamanho) e só então relê os arquivos. Se o arquivo alterado for
+inválido, a versão anterior continua em uso e o erro fica em erro_rubrica().
+
+SUGESTOES_BANCO, DIMENSOES, CATALOGO_SUGESTOES etc. são os da rubrica padrão
+carregada na importação; para a versão atual ou a de um curso/PIM, use
+obter_rubrica (ou rubrica_de, a partir de uma avaliação).
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+DIRETORIO_RUBRICAS = Path(os.environ.get('SATA_RUBRICAS', Path(__file__).resolve().parent.parent / 'rubricas'))
+ARQUIVO_PADRAO = 'padrao.json'
+INTERVALO_VERIFICACAO = 1.0
+
+# O que uma variante pode alterar, no geral e em cada dimensão
+_CAMPOS_VARIANTE = {'nome', 'aplica_a', 'dimensoes', 'regras_recomendacao', 'recomendacoes_gerais',
+                    'recomendacao_padrao', 'max_recomendacoes'}
+_CAMPOS_DIMENSAO_VARIANTE = {'nota_maxima', 'titulo', 'descricao', 'parecer', 'sugestoes_extras'}
+
+
+def _slug(texto):
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-')
+
+
+def _numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _lista_textos(valor):
+    return isinstance(valor, list) and all(isinstance(texto, str) for texto in valor)
+
+
+def _validar_regras(regras, dimensoes, onde):
+    if not isinstance(regras, list):
+        raise ValueError(f"{onde}: regras_recomendacao deve ser uma lista")
+    for regra in regras:
+        if not (isinstance(regra, dict) and regra.get('dimensao') in dimensoes
+                and ('abaixo_de' in regra or 'sugestoes' in regra)
+                and _numero(regra.get('abaixo_de', 1)) and regra.get('abaixo_de', 1) > 0
+                and _lista_textos(regra.get('sugestoes', [])) and _lista_textos(regra.get('recomendacoes'))
+                and _numero(regra.get('peso', 1)) and regra.get('peso', 1) > 0
+                and not set(regra) - {'dimensao', 'abaixo_de', 'sugestoes', 'peso', 'recomendacoes'}):
+            raise ValueError(f"{onde}: regra de recomendação inválida: {regra!r} (esperado dimensao, "
+                             "abaixo_de e/ou sugestoes, recomendacoes e, opcionalmente, peso)")
+
+
+def _validar_padrao(dados):
+    """Confere a estrutura de padrao.json; levanta ValueError com o problema encontrado"""
+    onde = ARQUIVO_PADRAO
+    if not isinstance(dados, dict) or not isinstance(dados.get('dimensoes'), list) or not dados['dimensoes']:
+        raise ValueError(f"{onde}: esperado um objeto com a lista de dimensoes")
+    nomes = set()
+    for dimensao in dados['dimensoes']:
+        nome = dimensao.get('nome') if isinstance(dimensao, dict) else None
+        if not isinstance(nome, str) or nome in nomes:
+            raise ValueError(f"{onde}: dimensão sem nome ou repetida: {nome!r}")
+        nomes.add(nome)
+        if not (_numero(dimensao.get('nota_maxima')) and dimensao['nota_maxima'] > 0):
+            raise ValueError(f"{onde}: {nome}: nota_maxima deve ser um número positivo")
+        for campo in ('titulo', 'descricao', 'parecer'):
+            if not isinstance(dimensao.get(campo), str):
+                raise ValueError(f"{onde}: {nome}: {campo} deve ser um texto")
+        if 'grupos' in dimensao:
+            grupos = dimensao['grupos']
+            if not isinstance(grupos, list) or not grupos or not all(
+                    isinstance(g, dict) and isinstance(g.get('nome'), str) and isinstance(g.get('prefixo'), str)
+                    and _lista_textos(g.get('sugestoes')) for g in grupos):
+                raise ValueError(f"{onde}: {nome}: grupos devem ter nome, prefixo e sugestoes")
+        elif not _lista_textos(dimensao.get('sugestoes')):
+            raise ValueError(f"{onde}: {nome}: sugestoes deve ser uma lista de textos (ou use grupos)")
+    if not (_numero(dados.get('fator_escrita')) and 0 < dados['fator_escrita'] <= 1):
+        raise ValueError(f"{onde}: fator_escrita deve estar entre 0 e 1")
+    if not (_numero(dados.get('nota_maxima_oral')) and dados['nota_maxima_oral'] >= 0):
+        raise ValueError(f"{onde}: nota_maxima_oral deve ser um número")
+    _validar_comuns(dados, nomes, onde)
+    for campo in ('regras_recomendacao', 'recomendacoes_gerais', 'recomendacao_padrao', 'max_recomendacoes'):
+        if campo not in dados:
+            raise ValueError(f"{onde}: falta {campo}")
+
+
+def _validar_comuns(dados, dimensoes, onde):
+    """Campos que o padrão e as variantes têm em comum"""
+    if 'nome' in dados and not isinstance(dados['nome'], str):
+        raise ValueError(f"{onde}: nome deve ser um texto")
+    if 'regras_recomendacao' in dados:
+        _validar_regras(dados['regras_recomendacao'], dimensoes, onde)
+    if 'recomendacoes_gerais' in dados and not _lista_textos(dados['recomendacoes_gerais']):
+        raise ValueError(f"{onde}: recomendacoes_gerais deve ser uma lista de textos")
+    if 'recomendacao_padrao' in dados and not isinstance(dados['recomendacao_padrao'], str):
+        raise ValueError(f"{onde}: recomendacao_padrao deve ser um texto")
+    if 'max_recomendacoes' in dados and not (isinstance(dados['max_recomendacoes'], int)
+                                             and dados['max_recomendacoes'] > 0):
+        raise ValueError(f"{onde}: max_recomendacoes deve ser um inteiro positivo")
+
+
+def _validar_variante(nome_arquivo, dados, padrao):
+    """Confere uma variante em relação ao padrão (só campos e dimensões que ela pode alterar)"""
+    onde = nome_arquivo
+    if not isinstance(dados, dict):
+        raise ValueError(f"{onde}: esperado um objeto JSON")
+    desconhecidos = set(dados) - _CAMPOS_VARIANTE
+    if desconhecidos:
+        raise ValueError(f"{onde}: campos que uma variante não pode alterar: {', '.join(sorted(desconhecidos))}")
+    aplica_a = dados.get('aplica_a')
+    if not (isinstance(aplica_a, dict) and aplica_a and set(aplica_a) <= {'curso', 'pim'}
+            and all(isinstance(valor, str) for valor in aplica_a.values())):
+        raise ValueError(f"{onde}: aplica_a deve indicar o curso e/ou o PIM da variante")
+    dimensoes_padrao = {d['nome']: d for d in padrao['dimensoes']}
+    _validar_comuns(dados, dimensoes_padrao, onde)
+    dimensoes = dados.get('dimensoes', {})
+    if not isinstance(dimensoes, dict):
+        raise ValueError(f"{onde}: dimensoes deve ser um objeto {{dimensão: alterações}}")
+    for nome, alteracoes in dimensoes.items():
+        if nome not in dimensoes_padrao:
+            raise ValueError(f"{onde}: dimensão desconhecida: {nome}")
+        if not isinstance(alteracoes, dict) or set(alteracoes) - _CAMPOS_DIMENSAO_VARIANTE:
+            raise ValueError(f"{onde}: {nome}: só podem ser alterados {', '.join(sorted(_CAMPOS_DIMENSAO_VARIANTE))}")
+        if 'nota_maxima' in alteracoes and not (_numero(alteracoes['nota_maxima']) and alteracoes['nota_maxima'] > 0):
+            raise ValueError(f"{onde}: {nome}: nota_maxima deve ser um número positivo")
+        extras = alteracoes.get('sugestoes_extras', [])
+        if 'grupos' in dimensoes_padrao[nome]:
+            grupos = {g['nome'] for g in dimensoes_padrao[nome]['grupos']}
+            if not (isinstance(extras, dict) and set(extras) <= grupos and all(map(_lista_textos, extras.values()))):
+                raise ValueError(f"{onde}: {nome}: sugestoes_extras deve ser {{grupo: [sugestões]}} com grupos do padrão")
+        elif not _lista_textos(extras):
+            raise ValueError(f"{onde}: {nome}: sugestoes_extras deve ser uma lista de textos")
+
+
+class Rubrica:
+    """
+    Rubrica compilada: o padrão com as variantes de um curso/PIM já aplicadas.
+    Não deve ser alterada; a mesma instância é compartilhada pelas sessões.
+    """
+    def __init__(self, definicao, arquivos):
+        self.nome = definicao['nome']
+        self.arquivos = tuple(arquivos)  # do padrão à variante mais específica
+        canonico = json.dumps(definicao, sort_keys=True, ensure_ascii=False)
+        self.versao = hashlib.sha256(canonico.encode('utf-8')).hexdigest()[:12]
+
+        self.fator_escrita = definicao['fator_escrita']
+        self.nota_maxima_oral = definicao['nota_maxima_oral']
+        self.dimensoes = {d['nome']: d['nota_maxima'] for d in definicao['dimensoes']}
+        self.titulos = {d['nome']: d['titulo'] for d in definicao['dimensoes']}
+        self.descricoes = {d['nome']: d['descricao'] for d in definicao['dimensoes']}
+        self.trechos_parecer = {d['nome']: d['parecer'] for d in definicao['dimensoes']}
+        self.nota_maxima_escrita = sum(self.dimensoes.values()) * self.fator_escrita
+        self.recomendacoes_gerais = list(definicao['recomendacoes_gerais'])
+        self.recomendacao_padrao = definicao['recomendacao_padrao']
+        self.max_recomendacoes = definicao['max_recomendacoes']
+
+        # sugestoes: formato de SUGESTOES_BANCO (lista, ou {grupo: lista} na Discussão), com as extras no fim.
+        # Bits de cada dimensão (AvaliacaoDimensao.selecao): as sugestões do padrão, na ordem
+        # dos grupos, e depois as extras, para que um bit não mude de sugestão entre variantes.
+        self.sugestoes, self.prefixos_discussao = {}, {}
+        self.bits_grupos = {}  # {(dimensão, grupo ou None): bits das sugestões da lista do grupo, em ordem}
+        catalogo, self.ids = [], {}
+        for d in definicao['dimensoes']:
+            nome = d['nome']
+            grupos = d['grupos'] if 'grupos' in d else [{'nome': None, 'prefixo': '', 'sugestoes': d['sugestoes'],
+                                                          'extras': d.get('extras', [])}]
+            ordem = [(g, s) for g in grupos for s in g['sugestoes']] + [(g, s) for g in grupos for s in g['extras']]
+            bits = {}
+            for bit, (g, sugestao) in enumerate(ordem):
+                bits.setdefault(g['nome'], []).append(bit)
+                catalogo.append((nome, g['nome'], g['prefixo'] + sugestao))
+            for g in grupos:
+                itens = g['sugestoes'] + g['extras']
+                self.bits_grupos[(nome, g['nome'])] = tuple(bits.get(g['nome'], ()))
+                prefixo_id = _slug(nome) + (f".{_slug(g['nome'].split(' (')[0])}" if g['nome'] else '')
+                for i, sugestao in enumerate(itens):
+                    self.ids[(nome, g['prefixo'] + sugestao)] = f"{prefixo_id}.{i}"
+                if g['nome'] is not None:
+                    self.sugestoes.setdefault(nome, {})[g['nome']] = itens
+                    self.prefixos_discussao[g['nome']] = g['prefixo']
+                else:
+                    self.sugestoes[nome] = itens
+
+        # Todas as sugestões, em ordem: (dimensão, grupo da Discussão ou None, observação
+        # exatamente como é gravada na avaliação); em cada dimensão, na ordem dos bits
+        self.catalogo = tuple(catalogo)
+        self.sugestoes_dimensao = {nome: tuple(obs for dim, _, obs in catalogo if dim == nome)
+                                   for nome in self.dimensoes}
+        self.bit_observacao = {nome: {obs: bit for bit, obs in enumerate(observacoes)}
+                               for nome, observacoes in self.sugestoes_dimensao.items()}
+        self.por_id = {id_sugestao: chave for chave, id_sugestao in self.ids.items()}
+
+        # Regras de recomendação (sata.recomendacoes), na ordem do arquivo: (dimensão,
+        # nota abaixo da qual vale ou None, observações que a disparam, peso, recomendações)
+        regras = []
+        for r in definicao['regras_recomendacao']:
+            desconhecidas = [obs for obs in r.get('sugestoes', []) if obs not in self.bit_observacao[r['dimensao']]]
+            if desconhecidas:
+                raise ValueError(f"regra de recomendação com sugestão que não está em {r['dimensao']}: {desconhecidas[0]}")
+            limiar = float(r['abaixo_de']) if 'abaixo_de' in r else None
+            regras.append((r['dimensao'], limiar, tuple(r.get('sugestoes', ())), float(r.get('peso', 1)),
+                           tuple(r['recomendacoes'])))
+        self.regras = tuple(regras)
+
+    def __repr__(self):
+        return f"<Rubrica {self.nome!r} {self.versao} ({', '.join(self.arquivos)})>"
+
+
+def _aplicar_variante(definicao, variante):
+    """Definição (JSON do padrão, com 'extras' em cada grupo) com a variante aplicada"""
+    definicao = copy.deepcopy(definicao)
+    for campo in ('nome', 'regras_recomendacao', 'recomendacoes_gerais', 'recomendacao_padrao', 'max_recomendacoes'):
+        if campo in variante:
+            definicao[campo] = variante[campo]
+    dimensoes = {d['nome']: d for d in definicao['dimensoes']}
+    for nome, alteracoes in variante.get('dimensoes', {}).items():
+        dimensao = dimensoes[nome]
+        for campo in ('nota_maxima', 'titulo', 'descricao', 'parecer'):
+            if campo in alteracoes:
+                dimensao[campo] = alteracoes[campo]
+        extras = alteracoes.get('sugestoes_extras', [])
+        if 'grupos' in dimensao:
+            for grupo in dimensao['grupos']:
+                grupo['extras'] = grupo['extras'] + extras.get(grupo['nome'], [])
+        else:
+            dimensao['extras'] = dimensao['extras'] + extras
+    return definicao
+
+
+def _compilar(padrao, variantes):
+    """Rubrica do padrão com as variantes [(nome do arquivo, dados)] aplicadas em ordem"""
+    definicao = copy.deepcopy(padrao)
+    for dimensao in definicao['dimensoes']:
+        for grupo in dimensao.get('grupos', []):
+            grupo['extras'] = []
+        dimensao.setdefault('extras', [])
+    total = sum(d['nota_maxima'] for d in definicao['dimensoes'])
+    for nome_arquivo, variante in variantes:
+        definicao = _aplicar_variante(definicao, variante)
+        if abs(sum(d['nota_maxima'] for d in definicao['dimensoes']) - total) > 1e-9:
+            raise ValueError(f"{nome_arquivo}: a soma das notas máximas das dimensões deve continuar {total:g}")
+    arquivos = [ARQUIVO_PADRAO] + [nome for nome, _ in variantes]
+    try:
+        return Rubrica(definicao, arquivos)
+    except ValueError as e:
+        raise ValueError(f"{arquivos[-1]}: {e}") from e
+
+
+def _ordem_variante(item):
+    """Ordem de aplicação: só PIM, só curso, curso e PIM (e, no empate, pelo nome do arquivo)"""
+    nome, dados = item
+    aplica_a = dados['aplica_a']
+    return len(aplica_a), 'curso' in aplica_a, nome
+
+
+class _Rubricas:
+    """Arquivos lidos da pasta e rubricas já compiladas, recarregados quando a pasta muda"""
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._verificado_em = None
+        self._padrao = None
+        self._variantes = {}  # nome do arquivo -> dados
+        self._compiladas = {}  # (curso, pim) -> Rubrica; curso e pim que nenhuma variante cita viram None
+        self._citados = {'curso': frozenset(), 'pim': frozenset()}  # valores de aplica_a das variantes
+        self._anteriores = {}  # compiladas antes da última recarga, usadas se a nova versão for inválida
+        self._erros = {}  # origem (arquivo ou (curso, pim)) -> mensagem
+        self._base = None  # (dimensões, grupos, quantidade de sugestões) do padrão da primeira carga
+
+    def _assinar(self):
+        with os.scandir(self.diretorio) as entradas:
+            return tuple(sorted((e.name, e.stat().st_mtime_ns, e.stat().st_size)
+                                for e in entradas if e.name.endswith('.json') and e.is_file()))
+
+    def _ler(self, nome):
+        try:
+            with open(self.diretorio / nome, encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"{nome}: {e}") from e
+
+    def _conferir_base(self, padrao):
+        """O padrão recarregado mantém as dimensões, os grupos e as sugestões da primeira carga"""
+        base = (
+            [d['nome'] for d in padrao['dimensoes']],
+            [[g['nome'] for g in d.get('grupos', [])] for d in padrao['dimensoes']],
+            [[len(g['sugestoes']) for g in d.get('grupos', [d])] for d in padrao['dimensoes']],
+        )
+        if self._base is None:
+            self._base = base
+            return
+        if base[:2] != self._base[:2]:
+            raise ValueError(f"{ARQUIVO_PADRAO}: as dimensões e os grupos da Discussão só mudam reiniciando o app")
+        if any(n < m for atual, antes in zip(base[2], self._base[2]) for n, m in zip(atual, antes)):
+            raise ValueError(f"{ARQUIVO_PADRAO}: sugestões não podem ser removidas (o identificador é a posição)")
+
+    def _recarregar(self):
+        try:
+            padrao = self._ler(ARQUIVO_PADRAO)
+            _validar_padrao(padrao)
+            self._conferir_base(padrao)
+        except ValueError as e:
+            if self._padrao is None:
+                raise
+            self._erros[ARQUIVO_PADRAO] = str(e)  # continua com a versão anterior de tudo
+            return
+        self._erros = {}
+        variantes = {}
+        for nome, _, _ in self._assinatura:
+            if nome == ARQUIVO_PADRAO:
+                continue
+            try:
+                dados = self._ler(nome)
+                _validar_variante(nome, dados, padrao)
+                variantes[nome] = dados
+            except ValueError as e:
+                self._erros[nome] = str(e)
+                if nome in self._variantes:
+                    variantes[nome] = self._variantes[nome]
+        self._padrao, self._variantes = padrao, variantes
+        self._citados = {campo: frozenset(v['aplica_a'][campo] for v in variantes.values() if campo in v['aplica_a'])
+                         for campo in ('curso', 'pim')}
+        self._anteriores = {**self._anteriores, **self._compiladas}
+        self._compiladas = {}
+
+    def _verificar(self):
+        agora = time.monotonic()
+        if self._verificado_em is not None and agora - self._verificado_em < INTERVALO_VERIFICACAO:
+            return
+        self._verificado_em = agora
+        assinatura = self._assinar()
+        if assinatura != self._assinatura:
+            self._assinatura = assinatura
+            self._recarregar()
+
+    def _compilar_para(self, curso, pim):
+        variantes = sorted(
+            (item for item in self._variantes.items()
+             if all({'curso': curso, 'pim': pim}[campo] == valor for campo, valor in item[1]['aplica_a'].items())),
+            key=_ordem_variante
+        )
+        if not variantes and (curso, pim) != (None, None):  # a mesma Rubrica do padrão, não uma cópia
+            if (None, None) not in self._compiladas:
+                self._compiladas[(None, None)] = self._compilar_para(None, None)
+            return self._compiladas[(None, None)]
+        try:
+            return _compilar(self._padrao, variantes)
+        except ValueError as e:
+            self._erros[(curso, pim)] = str(e)
+            anterior = self._anteriores.get((curso, pim))
+            return anterior if anterior is not None else _compilar(self._padrao, [])
+
+    def obter(self, curso, pim):
+        with self._lock:
+            self._verificar()
+            # Curso e PIM vêm também de backups enviados: um valor que nenhuma variante
+            # cita usa a mesma rubrica que None, e o cache não cresce com eles
+            curso = curso if curso in self._citados['curso'] else None
+            pim = pim if pim in self._citados['pim'] else None
+            rubrica = self._compiladas.get((curso, pim))
+            if rubrica is None:
+                rubrica = self._compiladas[(curso, pim)] = self._compilar_para(curso, pim)
+            return rubrica
+
+    def erro(self):
+        with self._lock:
+            return "; ".join(self._erros.values()) or None
+
+
+_RUBRICAS = _Rubricas(DIRETORIO_RUBRICAS)
+
+
+def obter_rubrica(curso=None, pim=None):
+    """Rubrica compilada para o curso e o PIM (o padrão com as variantes que se aplicam), recarregada se os arquivos mudarem"""
+    return _RUBRICAS.obter(curso, pim)
+
+
+def rubrica_de(estado):
+    """obter_rubrica para o curso e o PIM de uma avaliação (qualquer mapeamento com 'curso' e 'pim')"""
+    curso, pim = estado.get('curso'), estado.get('pim')
+    return obter_rubrica(curso if isinstance(curso, str) else None, pim if isinstance(pim, str) else None)
+
+
+def erro_rubrica():
+    """Mensagem do último problema ao recarregar os arquivos de rubrica (a versão anterior segue em uso), ou None"""
+    return _RUBRICAS.erro()
+
+
+RUBRICA_PADRAO = obter_rubrica()
+
+SUGESTOES_BANCO = RUBRICA_PADRAO.sugestoes
+DIMENSOES = RUBRICA_PADRAO.dimensoes
+DIMENSOES_TITULOS = RUBRICA_PADRAO.titulos
+RECOMENDACOES_GERAIS = RUBRICA_PADRAO.recomendacoes_gerais
+
+# Prefixo gravado nas observações da Discussão, conforme o grupo escolhido
+PREFIXOS_DISCUSSAO = RUBRICA_PADRAO.prefixos_discussao
+
+# Todas as sugestões do banco, em ordem: (dimensão, grupo da Discussão ou None,
+# observação exatamente como é gravada na avaliação)
+CATALOGO_SUGESTOES = RUBRICA_PADRAO.catalogo
+
+# Identificador estável de cada sugestão ("introducao.4", "discussao.problema.2"),
+# usado no backup v3. É a posição na lista: corrigir o texto de uma sugestão não
+# invalida backups antigos, mas sugestões novas devem entrar no fim da lista.
+ID_SUGESTOES = RUBRICA_PADRAO.ids
+SUGESTOES_POR_ID = RUBRICA_PADRAO.por_id
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+# Banco, diário e cache de PDFs do app só dos testes
+os.environ.setdefault('SATA_BANCO', str(Path(tempfile.mkdtemp()) / 'testes.db'))
+os.environ.setdefault('SATA_DIARIO', str(Path(tempfile.mkdtemp()) / 'testes.jsonl'))
+os.environ.setdefault('SATA_CACHE_PDF', '')
@@ -0,0 +1,20 @@
+"""Diário local do app (sata.diario.DiarioAvaliacoes)"""
+from sata.diario import DiarioAvaliacoes, ler_diario
+
+
+def _estado(empresa, parte_oral):
+    return {'professor': "Prof", 'curso': "Marketing", 'pim': "II", 'empresa': empresa, 'lider': "Caio",
+            'avaliacoes': {}, 'parte_oral': parte_oral, 'comentarios_adicionais': "x" * 200}
+
+
+def test_diario_compactado_com_o_registro_mais_recente_de_cada_grupo(tmp_path):
+    caminho = tmp_path / 'diario.jsonl'
+    diario = DiarioAvaliacoes(caminho, limite_compactacao=4096)
+    for vez in range(40):
+        diario.registrar(_estado(f"Empresa {vez % 3}", vez / 20))
+
+    linhas = caminho.read_bytes().count(b'\n')
+    assert linhas < 40  # compactado ao menos uma vez
+    recentes = {estado['empresa']: estado['parte_oral'] for estado in ler_diario(caminho)}
+    assert recentes == {"Empresa 0": 1.95, "Empresa 1": 1.85, "Empresa 2": 1.9}
+    assert not diario.falhas
@@ -0,0 +1,60 @@
+"""Gravação automática dos grupos no banco: Nova Correção e backups carregados de novo"""
+from streamlit.testing.v1 import AppTest
+
+from conftest import RAIZ
+from sata.armazenamento import ArmazemAvaliacoes
+from sata.fila_grupos import montar_fila
+from sata.progresso import serializar_progresso
+
+
+def _rodar(at, aba="📄 Apresentação", elemento=None):
+    at.session_state['aba'] = aba  # o AppTest não devolve a aba aberta, como o navegador
+    (elemento or at).run()
+    assert not at.exception
+    return at
+
+
+def _grupos(armazem, empresa):
+    return [grupo for grupo in armazem.listar_grupos() if grupo['empresa'] == empresa]
+
+
+def test_nova_correcao_nao_altera_o_grupo_anterior():
+    at = _rodar(AppTest.from_file(str(RAIZ / 'pim_avaliador.py'), default_timeout=120))
+    at.text_input(key="empresa").set_value("ACME Nova Correção")
+    at.text_input(key="lider").set_value("Ana")
+    at.number_input(key="nota_Apresentação Geral").set_value(0.8)
+    _rodar(at)
+    grupo_id = at.session_state['grupo_id']
+
+    botao = next(botao for botao in at.button if botao.label == "🔄 Nova Correção")
+    _rodar(at, elemento=botao.click())
+    assert at.session_state['grupo_id'] is None
+    # A barra lateral continua preenchida: o próximo grupo só troca o que foi corrigido
+    _rodar(at, "📖 Introdução")
+    _rodar(at, "📖 Introdução", at.checkbox(key="sug_Introdução_1").check())
+
+    armazem = ArmazemAvaliacoes()
+    grupos = _grupos(armazem, "ACME Nova Correção")
+    assert len(grupos) == 2
+    assert at.session_state['grupo_id'] not in (None, grupo_id)
+    anterior = armazem.carregar(grupo_id)
+    assert anterior['avaliacoes']['Apresentação Geral']['nota'] == 0.8
+    assert anterior['avaliacoes']['Introdução']['observacoes'] == []
+
+
+def test_backup_carregado_de_novo_grava_no_mesmo_grupo(tmp_path):
+    armazem = ArmazemAvaliacoes(tmp_path / 'avaliacoes.db')
+    estado = {'professor': "Prof", 'curso': "Gestão RH", 'pim': "I", 'empresa': "ACME Backup", 'lider': "Bia",
+              'avaliacoes': {}, 'parte_oral': 1.5}
+    grupo_id, _ = armazem.salvar(None, estado)
+    backup = serializar_progresso(armazem.carregar(grupo_id)).encode('utf-8')
+
+    fila, falhas = montar_fila([('grupo.json', backup)])
+    assert not falhas
+    estado_fila, grupo_fila = fila.abrir(0, armazem)
+    assert grupo_fila == grupo_id
+    assert armazem.salvar(grupo_fila, estado_fila)[0] == grupo_id
+    assert len(_grupos(armazem, "ACME Backup")) == 1
+
+    # Sem empresa nem líder não há como saber se é o mesmo grupo
+    assert armazem.procurar_grupo(dict(estado, empresa='', lider='')) is None